@@ -0,0 +1,182 @@
+"""JSON job search API.
+
+`GET /api/jobs/` takes the query parameters of the job filter page and
+returns a page of jobs:
+
+    {"count": 25, "count_is_exact": true, "next": "/api/jobs/?...&cursor=...", "previous": null, "results": [...]}
+
+`count` is estimated for large results; `count_is_exact` is false then.
+
+`?fields=id,title,city` limits the fields of every job (sparse fieldsets),
+`?limit=` sets the page size and `?cursor=` follows `next`/`previous`.
+
+With `?format=ndjson` every matching job is streamed instead, one JSON
+object per line. Rows are read with a server-side cursor and serialised in
+chunks, so a dump of the whole requisition table runs in constant memory.
+"""
+
+import json
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views import View
+
+from common.utils.pagination import CursorPaginator
+from employer.models import CompanyProfile, JobRequisition
+from JobFilter.filters import distance_zip_codes, filter_jobs, job_ordering
+from JobFilter.forms import JobFilterForm
+from JobFilter.search import get_search_backend
+
+# Public name of every column field and the column it is read from.
+COLUMN_FIELDS = {
+    'id': 'id',
+    'slug': 'slug',
+    'title': 'custom_job_title',
+    'industry': 'industry__category',
+    'department': 'department',
+    'city': 'city',
+    'state': 'state',
+    'zip_code': 'zip_code',
+    'job_type': 'job_type',
+    'work_arrangement': 'work_arrangement_preference',
+    'salary_type': 'salary_type',
+    'min_salary': 'min_salary_amount',
+    'max_salary': 'max_salary_amount',
+    'min_experience': 'min_experience',
+    'description': 'job_description',
+    'created': 'created',
+    'updated': 'updated',
+}
+# Fields loaded for a whole page or chunk of jobs with one query each.
+RELATED_FIELDS = ('job_titles', 'skills', 'company', 'url')
+
+DEFAULT_FIELDS = ('id', 'slug', 'title', 'job_titles', 'industry', 'company', 'city', 'state',
+                  'job_type', 'work_arrangement', 'created', 'url')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+EXPORT_CHUNK_SIZE = 2000
+
+
+def serialize_jobs(rows, fields):
+    """JSON-ready dicts of `fields` for `rows` of column values.
+
+    `rows` must hold the 'id' and 'user_id' columns besides the columns of
+    `fields`; related fields cost one query each for all rows.
+    """
+    ids = [row['id'] for row in rows]
+    related = {}
+    if 'job_titles' in fields:
+        related['job_titles'] = _grouped(JobRequisition.job_title.through.objects.filter(
+            jobrequisition_id__in=ids).values_list('jobrequisition_id', 'position__position'))
+    if 'skills' in fields:
+        related['skills'] = _grouped(JobRequisition.required_skills.through.objects.filter(
+            jobrequisition_id__in=ids).values_list('jobrequisition_id', 'skill__skill'))
+    companies = {}
+    if 'company' in fields:
+        companies = {user_id: profile.company_name for user_id, profile in
+                     CompanyProfile.first_profiles({row['user_id'] for row in rows}).items()}
+
+    jobs = []
+    for row in rows:
+        job = {}
+        for field in fields:
+            if field in COLUMN_FIELDS:
+                job[field] = row[COLUMN_FIELDS[field]]
+            elif field == 'company':
+                job[field] = companies.get(row['user_id'])
+            elif field == 'url':
+                job[field] = reverse('JobFilter:job_jobFilter_detail', kwargs={'slug': row['slug']})
+            else:
+                job[field] = related[field].get(row['id'], [])
+        jobs.append(job)
+    return jobs
+
+
+def _grouped(pairs):
+    groups = {}
+    for key, value in pairs:
+        groups.setdefault(key, []).append(value)
+    return groups
+
+
+class JobSearchAPIView(LoginRequiredMixin, View):
+    raise_exception = True
+
+    def get(self, request):
+        form = JobFilterForm(request.GET)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        fields = self.get_fields()
+        if fields is None:
+            return JsonResponse({'errors': {'fields': [
+                f"Choose from: {', '.join([*COLUMN_FIELDS, *RELATED_FIELDS])}."]}}, status=400)
+
+        filters = form.cleaned_data
+        zip_codes = None
+        if filters.get('distance'):
+            zip_codes = distance_zip_codes(request.user, filters['distance'])[1]
+        jobs = filter_jobs(JobRequisition.objects.all(), filters, get_search_backend(), zip_codes)
+        ordering = job_ordering(filters, jobs)
+        columns = {'id', 'user_id', 'slug', *(COLUMN_FIELDS[field] for field in fields if field in COLUMN_FIELDS)}
+
+        if request.GET.get('format') == 'ndjson':
+            response = StreamingHttpResponse(
+                self.stream(jobs.order_by(*ordering).values(*columns), fields),
+                content_type='application/x-ndjson',
+            )
+            response['Content-Disposition'] = 'attachment; filename="jobs.ndjson"'
+            return response
+
+        paginator = CursorPaginator(
+            jobs.values(*columns, *(field.lstrip('-') for field in ordering)),
+            self.get_limit(), ordering=ordering, count='approximate',
+        )
+        page = paginator.get_page(request.GET.get('cursor'))
+        return JsonResponse({
+            'count': page.count,
+            'count_is_exact': page.count_is_exact,
+            'next': self.cursor_url(page.next_cursor),
+            'previous': self.cursor_url(page.previous_cursor),
+            'results': serialize_jobs(page.object_list, fields),
+        })
+
+    def get_fields(self):
+        """Requested fields in the order asked for, None when one is unknown."""
+        requested = [field.strip() for field in self.request.GET.get('fields', '').split(',') if field.strip()]
+        if not requested:
+            return list(DEFAULT_FIELDS)
+        if any(field not in COLUMN_FIELDS and field not in RELATED_FIELDS for field in requested):
+            return None
+        return list(dict.fromkeys(requested))
+
+    def get_limit(self):
+        try:
+            return min(max(int(self.request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return DEFAULT_LIMIT
+
+    def cursor_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return f"{self.request.path}?{query.urlencode()}"
+
+    def stream(self, rows, fields):
+        chunk = []
+        for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            chunk.append(row)
+            if len(chunk) == EXPORT_CHUNK_SIZE:
+                yield self.ndjson(chunk, fields)
+                chunk = []
+        if chunk:
+            yield self.ndjson(chunk, fields)
+
+    @staticmethod
+    def ndjson(rows, fields):
+        return ''.join(
+            json.dumps(job, cls=DjangoJSONEncoder) + '\n' for job in serialize_jobs(rows, fields)
+        )
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class JobfilterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'JobFilter'
+
+    def ready(self):
+        import JobFilter.signals  # Import the signals module
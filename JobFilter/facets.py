@@ -0,0 +1,105 @@
+"""Facet counts of the job search page.
+
+For every facet the count of an option is the number of jobs the search
+would return with that option chosen instead of the current one, i.e. all
+other filters apply but the facet's own does not.
+
+The scalar facets (industry, state, job type, work arrangement) come from
+one grouped query: jobs matching the other filters are grouped by the
+combination of the four columns, and a single pass over the combinations
+adds each group to every facet whose other filters it satisfies. Job
+titles live in an M2M table and are grouped by a second query. The result
+is cached per normalised filter set and jobs generation.
+"""
+
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from common.utils.chooseConstant import JOB_TYPES, WORK_ARRANGEMENT_CHOICES
+from employee.models import Category, Position
+from employer.models import JobRequisition
+from JobFilter.filters import FACETS, filter_jobs, filter_key
+
+FACET_TIMEOUT = 60 * 15
+
+# Facets stored in a column of JobRequisition, and that column.
+SCALAR_FACETS = {
+    'industry': 'industry_id',
+    'state': 'state',
+    'job_type': 'job_type',
+    'work_arrangement_preference': 'work_arrangement_preference',
+}
+
+
+def _facet_value(name, value):
+    if value in (None, ''):
+        return None
+    if hasattr(value, 'pk'):
+        return value.pk
+    if name == 'state':
+        # The state filter is case-insensitive.
+        return value.upper()
+    return value
+
+
+def count_facets(data, search_backend, zip_codes=None):
+    """Option counts of every facet as {facet: {value: count}}."""
+    jobs = JobRequisition.objects.all()
+    chosen = {name: _facet_value(name, data.get(name)) for name in SCALAR_FACETS}
+
+    counts = {name: Counter() for name in FACETS}
+    groups = (
+        filter_jobs(jobs, data, search_backend, zip_codes, exclude=SCALAR_FACETS)
+        .order_by().values(*SCALAR_FACETS.values()).annotate(jobs=Count('id'))
+    )
+    for group in groups:
+        values = {name: _facet_value(name, group[column]) for name, column in SCALAR_FACETS.items()}
+        mismatched = [name for name, value in chosen.items() if value is not None and values[name] != value]
+        if len(mismatched) > 1:
+            continue
+        for name in mismatched or SCALAR_FACETS:
+            counts[name][values[name]] += group['jobs']
+
+    titles = (
+        filter_jobs(jobs, data, search_backend, zip_codes, exclude=('job_title',))
+        .filter(job_title__isnull=False)
+        .order_by().values('job_title').annotate(jobs=Count('id'))
+    )
+    for group in titles:
+        counts['job_title'][group['job_title']] = group['jobs']
+
+    return {name: dict(counter) for name, counter in counts.items()}
+
+
+def facet_labels(counts):
+    """Display names of the counted options as {facet: {value: label}}."""
+    return {
+        'industry': dict(Category.objects.filter(id__in=counts['industry']).values_list('id', 'category')),
+        'job_title': dict(Position.objects.filter(id__in=counts['job_title']).values_list('id', 'position')),
+        'state': {state: state for state in counts['state']},
+        'job_type': dict(JOB_TYPES),
+        'work_arrangement_preference': dict(WORK_ARRANGEMENT_CHOICES),
+    }
+
+
+def get_facets(data, search_backend, zip_codes=None, home_zip_code=None):
+    """Facet counts and labels of the filters in `data`, from the cache when possible.
+
+    Returns {facet: [(value, label, count), ...]}, most frequent first.
+    """
+    key = filter_key('facets', data, home_zip_code)
+    facets = cache.get(key)
+    if facets is None:
+        counts = count_facets(data, search_backend, zip_codes)
+        labels = facet_labels(counts)
+        facets = {
+            name: sorted(
+                ((value, labels[name].get(value, value), count) for value, count in counts[name].items() if count),
+                key=lambda option: (-option[2], str(option[1])),
+            )
+            for name in FACETS
+        }
+        cache.set(key, facets, FACET_TIMEOUT)
+    return facets
@@ -0,0 +1,134 @@
+"""Filters of the job search page.
+
+`filter_jobs` applies the cleaned data of a `JobFilterForm` to a job
+queryset. Results derived from the filtered jobs (ordered ids, facet
+counts) are cached under `filter_key`, which normalises the filters and
+includes the jobs generation: any change to a job bumps the generation, so
+entries of older generations are simply never read again.
+"""
+
+import hashlib
+import json
+
+from django.core.cache import cache
+
+from common.utils.geo import get_zip_index
+from common.utils.pagination import DEFAULT_ORDERING
+from common.utils.versions import bump_version, get_version
+from employee.models import BasicInformation
+
+# Filters that are shown as facets, with a count next to each option.
+FACETS = ('industry', 'job_title', 'state', 'job_type', 'work_arrangement_preference')
+
+JOBS_GENERATION_KEY = 'JobFilter:jobs_generation'
+
+RESULTS_TIMEOUT = 60 * 5
+# Larger result sets are paginated straight from the database.
+MAX_CACHED_RESULTS = 5000
+
+
+def jobs_generation():
+    return get_version(JOBS_GENERATION_KEY)
+
+
+def bump_jobs_generation():
+    """Invalidate everything cached under a `filter_key`."""
+    bump_version(JOBS_GENERATION_KEY)
+
+
+def normalized_filters(data, home_zip_code=None):
+    """The active filters of `data` as plain, comparable values."""
+    filters = {}
+    for name, value in data.items():
+        if value in (None, '') or name == 'sorting':
+            continue
+        if hasattr(value, 'pk'):
+            value = value.pk
+        elif isinstance(value, str):
+            value = ' '.join(value.lower().split())
+        filters[name] = value
+    if 'distance' in filters:
+        # Distances are measured from the user's own ZIP code.
+        filters['home_zip_code'] = home_zip_code
+    return filters
+
+
+def filter_key(prefix, data, home_zip_code=None):
+    """Cache key of `prefix` for the filters in `data`, at the current jobs generation."""
+    filters = json.dumps(normalized_filters(data, home_zip_code), sort_keys=True, default=str)
+    digest = hashlib.sha1(filters.encode()).hexdigest()
+    return f"JobFilter:{prefix}:{jobs_generation()}:{digest}"
+
+
+def filter_jobs(queryset, data, search_backend, zip_codes=None, exclude=()):
+    """Apply the cleaned `data` of a JobFilterForm to `queryset`.
+
+    `zip_codes` are the ZIP codes within the chosen distance, if any.
+    Filters named in `exclude` are skipped, which is how facet counts
+    ignore their own dimension.
+    """
+    def active(name):
+        return name not in exclude and data.get(name)
+
+    if active('industry'):
+        queryset = queryset.filter(industry=data['industry'])
+    if active('job_title'):
+        queryset = queryset.filter(job_title=data['job_title'])
+    if active('city'):
+        queryset = search_backend.filter_city(queryset, data['city'])
+    if active('state'):
+        queryset = queryset.filter(state__iexact=data['state'])
+    if active('min_experience'):
+        queryset = queryset.filter(min_experience__gte=data['min_experience'])
+    if active('job_type'):
+        queryset = queryset.filter(job_type=data['job_type'])
+    if active('work_arrangement_preference'):
+        queryset = queryset.filter(work_arrangement_preference=data['work_arrangement_preference'])
+    if active('distance') and zip_codes:
+        queryset = queryset.filter(zip_code__in=zip_codes)
+    if active('search'):
+        queryset = search_backend.search(queryset, data['search'])
+    return queryset
+
+
+def distance_zip_codes(user, distance):
+    """The home ZIP code of `user` and the ZIP codes within `distance` miles of it.
+
+    The home ZIP code is the one of the user's latest basic information;
+    the list is empty when it is missing or unknown.
+    """
+    home = BasicInformation.objects.filter(user=user).order_by('-id').first()
+    if home is None:
+        return None, []
+    return home.zip_code, get_zip_index().within(home.zip_code, distance)
+
+
+def job_ordering(data, queryset):
+    """Ordering of the filtered `queryset`, ending with a unique field."""
+    sorting = data.get('sorting')
+    if sorting:
+        if sorting == 'newest':
+            return ('-created', '-id')
+        # Add more sorting options as needed
+    elif 'search_rank' in queryset.query.annotations:
+        # Full-text search results, most relevant first
+        return ('-search_rank', '-id')
+    return DEFAULT_ORDERING
+
+
+def cached_results(queryset, data, ordering, home_zip_code=None):
+    """The ordering values of every job of `queryset`, from the cache when possible.
+
+    Returns a list of dicts of the `ordering` fields, sorted by `ordering`,
+    or None when there are too many results to cache.
+    """
+    key = filter_key(f"results:{','.join(ordering)}", data, home_zip_code)
+    rows = cache.get(key)
+    if rows is None:
+        fields = [field.lstrip('-') for field in ordering]
+        rows = list(queryset.order_by(*ordering).values(*fields)[:MAX_CACHED_RESULTS + 1])
+        if len(rows) > MAX_CACHED_RESULTS:
+            # Remembered as False so the next request skips the query.
+            rows = False
+        cache.set(key, rows, RESULTS_TIMEOUT)
+    return None if rows is False else rows
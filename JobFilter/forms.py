@@ -4,6 +4,7 @@ from common.utils.chooseConstant import (
     ACTION_TYPES, DEGREE_TYPE_CHOICES, 
     JOB_TYPES, RELOCATION, SALARY_TYPES, 
     WORK_ARRANGEMENT_CHOICES,SORT_CHOICES,
+    DISTANCE_CHOICES,
 )
 
 class JobFilterForm(forms.Form):
@@ -47,6 +48,15 @@ class JobFilterForm(forms.Form):
         label='Work Arrangement Preference'
     )
     
+    distance = forms.TypedChoiceField(
+        choices=DISTANCE_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control form-control-sm my-2'}),
+        label='Distance from my ZIP code'
+    )
+    
     search = forms.CharField(
         max_length=255,
         required=False,
@@ -58,3 +68,17 @@ class JobFilterForm(forms.Form):
         required=False,
         label='Sort',
     )
+
+    def show_facet_counts(self, facets):
+        """Append the number of matching jobs to the options of the facet fields."""
+        for name, options in facets.items():
+            counts = {str(value): count for value, label, count in options}
+            field = self.fields[name]
+            if isinstance(field, forms.ModelChoiceField):
+                field.label_from_instance = (
+                    lambda obj, counts=counts: f"{obj} ({counts.get(str(obj.pk), 0):,})")
+            elif isinstance(field, forms.ChoiceField):
+                field.choices = [
+                    (value, f"{label} ({counts.get(str(value), 0):,})" if value else label)
+                    for value, label in field.choices
+                ]
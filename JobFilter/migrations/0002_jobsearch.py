@@ -0,0 +1,87 @@
+from django.db import migrations
+
+# The search table is maintained with raw SQL by JobFilter.search; its layout
+# depends on the database, so it is not a model.
+POSTGRES_SQL = """
+    CREATE TABLE jobfilter_jobsearch (
+        job_id bigint PRIMARY KEY REFERENCES employer_jobrequisition (id) ON DELETE CASCADE,
+        document tsvector NOT NULL,
+        location tsvector NOT NULL
+    );
+    CREATE INDEX jobfilter_jobsearch_document ON jobfilter_jobsearch USING gin (document);
+    CREATE INDEX jobfilter_jobsearch_location ON jobfilter_jobsearch USING gin (location);
+"""
+SQLITE_SQL = """
+    CREATE VIRTUAL TABLE jobfilter_jobsearch USING fts5(
+        title, skills, company, description, location, tokenize = 'porter unicode61'
+    );
+"""
+
+
+def create_search_table(apps, schema_editor):
+    sql = {'postgresql': POSTGRES_SQL, 'sqlite': SQLITE_SQL}.get(schema_editor.connection.vendor)
+    if sql:
+        schema_editor.execute(sql)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute('DROP TABLE jobfilter_jobsearch')
+
+
+# The search documents of the existing jobs, built in SQL like
+# JobFilter.search.job_documents does, so the migration does not depend on
+# the current models. `{concat}` aggregates the position and skill names;
+# the company is the employer's first profile, see CompanyProfile.first_profiles.
+DOCUMENTS_SQL = """
+    SELECT
+        j.id,
+        trim(coalesce((
+            SELECT {concat}(p.position, ' ') FROM employer_jobrequisition_job_title t
+            JOIN employee_position p ON p.id = t.position_id WHERE t.jobrequisition_id = j.id
+        ), '') || ' ' || coalesce(j.custom_job_title, '')) AS title,
+        trim(coalesce((
+            SELECT {concat}(s.skill, ' ') FROM employer_jobrequisition_required_skills r
+            JOIN employee_skill s ON s.id = r.skill_id WHERE r.jobrequisition_id = j.id
+        ), '') || ' ' || coalesce(j.custom_required_skills, '')) AS skills,
+        coalesce((
+            SELECT c.company_name FROM employer_companyprofile c WHERE c.user_id = j.user_id
+            ORDER BY c.id LIMIT 1
+        ), '') AS company,
+        coalesce(j.job_description, '') AS description,
+        trim(coalesce(j.city, '') || ' ' || coalesce(j.state, '')) AS location
+    FROM employer_jobrequisition j
+"""
+POSTGRES_FILL_SQL = f"""
+    INSERT INTO jobfilter_jobsearch (job_id, document, location)
+    SELECT
+        id,
+        setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', skills), 'B')
+        || setweight(to_tsvector('english', company), 'C') || setweight(to_tsvector('english', description), 'D'),
+        to_tsvector('simple', location)
+    FROM ({DOCUMENTS_SQL.format(concat='string_agg')}) AS documents
+"""
+SQLITE_FILL_SQL = f"""
+    INSERT INTO jobfilter_jobsearch (rowid, title, skills, company, description, location)
+    {DOCUMENTS_SQL.format(concat='group_concat')}
+"""
+
+
+def fill_search_table(apps, schema_editor):
+    # `manage.py rebuild_job_search_index` refills the table later on.
+    sql = {'postgresql': POSTGRES_FILL_SQL, 'sqlite': SQLITE_FILL_SQL}.get(schema_editor.connection.vendor)
+    if sql:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('JobFilter', '0001_initial'),
+        ('employer', '0025_alter_jobrequisition_zip_code'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+        migrations.RunPython(fill_search_table, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,12 @@
 from django.db import models
 from common.utils.chooseConstant import STATUS_CHOICES
-from common.utils.text import unique_slug
+from common.models import SlugModel
 from employer.models import JobRequisition
 from jobDoggApp import settings
 
 
 #AppliedJobHistory
-class AppliedSearchJobHistory(models.Model):
+class AppliedSearchJobHistory(SlugModel):
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     Search_job = models.ForeignKey(JobRequisition, on_delete=models.CASCADE)
@@ -18,11 +18,8 @@ class AppliedSearchJobHistory(models.Model):
     updated = models.DateTimeField(auto_now=True)
     
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.user.username}"
 
     def __str__(self):
         return f"{self.user.username} - {self.Search_job}"
\ No newline at end of file
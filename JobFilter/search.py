@@ -0,0 +1,192 @@
+"""Ranked full-text search over job requisitions.
+
+The searchable text of a job (titles, skills, company name, description and
+location) is kept in a shadow table next to `employer_jobrequisition`:
+
+* PostgreSQL: weighted `tsvector` columns with GIN indexes.
+* SQLite: an FTS5 virtual table whose rowid is the job id.
+
+The tables are created by the JobFilter migrations and kept in sync by the
+signals in `JobFilter.signals`; `manage.py rebuild_job_search_index`
+refills them. Other databases fall back to `icontains` lookups.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from employer.models import CompanyProfile, JobRequisition
+
+SEARCH_TABLE = 'jobfilter_jobsearch'
+JOB_TABLE = JobRequisition._meta.db_table
+
+# JobRequisition fields that end up in the search documents.
+INDEXED_FIELDS = {
+    'user', 'custom_job_title', 'job_description', 'custom_required_skills', 'city', 'state',
+}
+
+WORD_RE = re.compile(r'\w+')
+
+
+def job_documents(job_ids):
+    """Searchable text of `job_ids` as {job_id: {column: text}}, in four queries."""
+    jobs = list(
+        JobRequisition.objects.filter(id__in=job_ids).values_list(
+            'id', 'user_id', 'custom_job_title', 'job_description', 'custom_required_skills', 'city', 'state',
+        )
+    )
+    ids = [job[0] for job in jobs]
+    titles = {}
+    for job_id, position in JobRequisition.job_title.through.objects.filter(
+            jobrequisition_id__in=ids).values_list('jobrequisition_id', 'position__position'):
+        titles.setdefault(job_id, []).append(position)
+    skills = {}
+    for job_id, skill in JobRequisition.required_skills.through.objects.filter(
+            jobrequisition_id__in=ids).values_list('jobrequisition_id', 'skill__skill'):
+        skills.setdefault(job_id, []).append(skill)
+    companies = {user_id: profile.company_name for user_id, profile in
+                 CompanyProfile.first_profiles({job[1] for job in jobs}).items()}
+
+    return {
+        job_id: {
+            'title': ' '.join(titles.get(job_id, []) + [custom_title or '']).strip(),
+            'skills': ' '.join(skills.get(job_id, []) + [custom_skills or '']).strip(),
+            'company': companies.get(user_id, ''),
+            'description': description or '',
+            'location': f"{city or ''} {state or ''}".strip(),
+        }
+        for job_id, user_id, custom_title, description, custom_skills, city, state in jobs
+    }
+
+
+class SearchBackend:
+    """Fallback without a search index: plain `icontains` lookups."""
+
+    def index_jobs(self, job_ids):
+        pass
+
+    def remove_jobs(self, job_ids):
+        pass
+
+    def rebuild(self, batch_size=500):
+        job_ids = list(JobRequisition.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(job_ids), batch_size):
+            self.index_jobs(job_ids[start:start + batch_size])
+        return len(job_ids)
+
+    def search(self, queryset, text):
+        """Filter `queryset` by `text`.
+
+        Indexed backends also annotate the relevance as `search_rank`,
+        higher being better.
+        """
+        return queryset.filter(Q(job_description__icontains=text) | Q(custom_job_title__icontains=text))
+
+    def filter_city(self, queryset, city):
+        return queryset.filter(city__icontains=city)
+
+
+class PostgresSearchBackend(SearchBackend):
+    UPSERT_SQL = f"""
+        INSERT INTO {SEARCH_TABLE} (job_id, document, location) VALUES (
+            %s,
+            setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B')
+            || setweight(to_tsvector('english', %s), 'C') || setweight(to_tsvector('english', %s), 'D'),
+            to_tsvector('simple', %s)
+        )
+        ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document, location = EXCLUDED.location
+    """
+
+    def index_jobs(self, job_ids):
+        documents = job_documents(job_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(self.UPSERT_SQL, [
+                (job_id, doc['title'], doc['skills'], doc['company'], doc['description'], doc['location'])
+                for job_id, doc in documents.items()
+            ])
+
+    def remove_jobs(self, job_ids):
+        # Rows of deleted jobs go away through ON DELETE CASCADE.
+        pass
+
+    def search(self, queryset, text):
+        query = "websearch_to_tsquery('english', %s)"
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT job_id FROM {SEARCH_TABLE} WHERE document @@ {query}", (text,)),
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT ts_rank_cd(document, {query}) FROM {SEARCH_TABLE} WHERE job_id = {JOB_TABLE}.id",
+                (text,),
+            ),
+        )
+
+    def filter_city(self, queryset, city):
+        words = WORD_RE.findall(city.lower())
+        if not words:
+            return queryset
+        # Every word of the city, as a prefix, like the former icontains.
+        query = ' & '.join(f"{word}:*" for word in words)
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT job_id FROM {SEARCH_TABLE} WHERE location @@ to_tsquery('simple', %s)", (query,)))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    COLUMNS = ('title', 'skills', 'company', 'description', 'location')
+    # bm25 weights of the columns above; location is only used by filter_city.
+    RANK = f"-bm25({SEARCH_TABLE}, 10.0, 5.0, 2.0, 1.0, 0.0)"
+
+    def index_jobs(self, job_ids):
+        documents = job_documents(job_ids)
+        with connection.cursor() as cursor:
+            self._delete(cursor, job_ids)
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(self.COLUMNS)}) VALUES (%s, %s, %s, %s, %s, %s)",
+                [(job_id, *(doc[column] for column in self.COLUMNS)) for job_id, doc in documents.items()],
+            )
+
+    def remove_jobs(self, job_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, job_ids)
+
+    def _delete(self, cursor, job_ids):
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(job_id,) for job_id in job_ids])
+
+    @staticmethod
+    def _match(columns, words, prefix=False):
+        # Every word quoted, so user input never reaches the FTS5 query syntax.
+        terms = ' '.join('"{}"{}'.format(word.replace('"', '""'), '*' if prefix else '') for word in words)
+        return f"{{{' '.join(columns)}}} : ({terms})"
+
+    def search(self, queryset, text):
+        words = WORD_RE.findall(text)
+        if not words:
+            return queryset
+        match = self._match(self.COLUMNS[:-1], words)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", (match,)),
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT {self.RANK} FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND rowid = {JOB_TABLE}.id",
+                (match,),
+            ),
+        )
+
+    def filter_city(self, queryset, city):
+        words = WORD_RE.findall(city)
+        if not words:
+            return queryset
+        match = self._match(['location'], words, prefix=True)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", (match,)))
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend():
+    return BACKENDS.get(connection.vendor, SearchBackend)()
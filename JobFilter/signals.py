@@ -0,0 +1,53 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from employer.models import CompanyProfile, JobRequisition
+from JobFilter.filters import bump_jobs_generation
+from JobFilter.search import INDEXED_FIELDS, get_search_backend
+
+
+# Filter results also match skills and company names.
+@receiver(post_save, sender=JobRequisition)
+@receiver(post_delete, sender=JobRequisition)
+@receiver(post_save, sender=CompanyProfile)
+@receiver(post_delete, sender=CompanyProfile)
+def invalidate_filter_results(sender, **kwargs):
+    bump_jobs_generation()
+
+
+@receiver(m2m_changed, sender=JobRequisition.job_title.through)
+@receiver(m2m_changed, sender=JobRequisition.required_skills.through)
+def invalidate_filter_results_on_m2m_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_jobs_generation()
+
+
+@receiver(post_save, sender=JobRequisition)
+def index_job(sender, instance, update_fields=None, **kwargs):
+    # Saves touching only unindexed fields (e.g. counters) keep the document.
+    if update_fields and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    get_search_backend().index_jobs([instance.pk])
+
+
+@receiver(post_delete, sender=JobRequisition)
+def remove_job(sender, instance, **kwargs):
+    get_search_backend().remove_jobs([instance.pk])
+
+
+@receiver(m2m_changed, sender=JobRequisition.job_title.through)
+@receiver(m2m_changed, sender=JobRequisition.required_skills.through)
+def reindex_job_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    job_ids = pk_set if reverse else [instance.pk]
+    if job_ids:
+        get_search_backend().index_jobs(list(job_ids))
+
+
+@receiver(post_save, sender=CompanyProfile)
+@receiver(post_delete, sender=CompanyProfile)
+def reindex_company_jobs(sender, instance, **kwargs):
+    job_ids = list(JobRequisition.objects.filter(user_id=instance.user_id).values_list('id', flat=True))
+    if job_ids:
+        get_search_backend().index_jobs(job_ids)
@@ -1,3 +1,176 @@
+import datetime
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from common.utils.pagination import DEFAULT_ORDERING
+from employee.models import Category, Position, Skill
+from employer.models import CompanyProfile, JobRequisition
+from JobFilter import api
+from JobFilter.api import serialize_jobs
+from JobFilter.filters import cached_results, filter_jobs, filter_key
+from JobFilter.search import get_search_backend
+from JobFilter.views import FilteredJobListView
+
+User = get_user_model()
+
+
+def make_job(user, industry, titles=(), skills=(), **fields):
+    job = JobRequisition.objects.create(**{
+        'user': user, 'industry': industry, 'department': 'Engineering', 'min_experience': 0,
+        'min_degree_requirements': 'bachelor_of_science', 'job_type': 'Permanent', 'salary_type': 'annual',
+        'min_salary_amount': Decimal('10000'), 'max_salary_amount': Decimal('90000'), 'relocatable': 'Yes',
+        'city': 'Austin', 'state': 'TX', 'zip_code': '73301', 'address1': '1 Main St', 'star_rating': 3,
+        'contact_person': 'Jane', 'contact_email': 'jane@example.com',
+        'from_date': datetime.date(2024, 1, 1), 'to_date': datetime.date(2024, 12, 31),
+        'start_time': datetime.time(9), 'end_time': datetime.time(17), 'job_description': 'A job',
+        **fields,
+    })
+    job.job_title.set(titles)
+    job.required_skills.set(skills)
+    return job
+
+
+def make_company(user, name):
+    return CompanyProfile.objects.create(
+        user=user, company_name=name, headquarters_address='1 Main St', industry='Tech',
+        representative_full_name='Jane Doe', email='jane@example.com',
+    )
+
+
+class JobData(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tech = Category.objects.create(category='Tech')
+        cls.position = Position.objects.create(
+            position='Developer', category=cls.tech, skill_test_link='https://example.com/test')
+        cls.skill = Skill.objects.create(skill='Python')
+        cls.employer = User.objects.create_user('employer', 'employer@example.com', user_type='employer')
+
+
+class CompanyNameTests(JobData):
+    def test_jobs_are_listed_and_searched_under_the_first_profile(self):
+        first = make_company(self.employer, 'Firstco')
+        make_company(self.employer, 'Secondco')
+        job = make_job(self.employer, self.tech)
+
+        self.assertEqual(CompanyProfile.first_profiles([self.employer.pk]), {self.employer.pk: first})
+        self.assertEqual(FilteredJobListView.attach_company_profiles([job])[0].company_profile, first)
+        self.assertEqual(serialize_jobs([{'id': job.pk, 'user_id': self.employer.pk}], ['company']),
+                         [{'company': 'Firstco'}])
+        search = get_search_backend().search
+        self.assertEqual(list(search(JobRequisition.objects.all(), 'Firstco')), [job])
+        self.assertEqual(list(search(JobRequisition.objects.all(), 'Secondco')), [])
+
+    def test_deleting_the_first_profile_reindexes_the_jobs(self):
+        first = make_company(self.employer, 'Firstco')
+        make_company(self.employer, 'Secondco')
+        job = make_job(self.employer, self.tech)
+        first.delete()
+        self.assertEqual(list(get_search_backend().search(JobRequisition.objects.all(), 'Secondco')), [job])
+
+
+class CachedResultsTests(JobData):
+    def setUp(self):
+        cache.clear()
+
+    def results(self, data):
+        jobs = filter_jobs(JobRequisition.objects.all(), data, get_search_backend())
+        return [row['id'] for row in cached_results(jobs, data, DEFAULT_ORDERING)]
+
+    def test_equivalent_filters_share_a_key(self):
+        key = filter_key('results', {'state': 'TX', 'search': '  Python   Developer', 'city': ''})
+        self.assertEqual(key, filter_key('results', {'search': 'python developer', 'state': 'tx', 'sorting': 'newest'}))
+        self.assertEqual(filter_key('results', {'industry': self.tech}),
+                         filter_key('results', {'industry': self.tech.pk}))
+        self.assertNotEqual(key, filter_key('results', {'state': 'TX'}))
+
+    def test_job_save_replaces_the_cached_results(self):
+        job = make_job(self.employer, self.tech)
+        self.assertEqual(self.results({}), [job.pk])
+        # bulk_create sends no signals; the cached results stay as they are.
+        JobRequisition.objects.bulk_create([JobRequisition(**{
+            field.attname: getattr(job, field.attname)
+            for field in JobRequisition._meta.concrete_fields if field.name not in ('id', 'slug', 'created')
+        })])
+        self.assertEqual(self.results({}), [job.pk])
+        job.save()
+        self.assertEqual(len(self.results({})), 2)
+
+    def test_skill_change_replaces_the_cached_results(self):
+        job = make_job(self.employer, self.tech, skills=[self.skill])
+        self.assertEqual(self.results({'search': 'rust'}), [])
+        job.required_skills.add(Skill.objects.create(skill='Rust'))
+        self.assertEqual(self.results({'search': 'rust'}), [job.pk])
+
+    def test_company_change_replaces_the_cached_results(self):
+        job = make_job(self.employer, self.tech)
+        self.assertEqual(self.results({'search': 'acme'}), [])
+        profile = make_company(self.employer, 'Acme')
+        self.assertEqual(self.results({'search': 'acme'}), [job.pk])
+        profile.delete()
+        self.assertEqual(self.results({'search': 'acme'}), [])
+
+
+class JobSearchAPITests(JobData):
+    url = reverse('JobFilter:api-jobs')
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        make_company(cls.employer, 'Acme')
+        cls.jobs = [
+            make_job(cls.employer, cls.tech, [cls.position], [cls.skill], custom_job_title=f'Developer {i}')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.employer)
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_default_fields(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(list(data['results'][0]), list(api.DEFAULT_FIELDS))
+        newest = data['results'][0]
+        self.assertEqual(newest['id'], self.jobs[-1].pk)
+        self.assertEqual((newest['company'], newest['job_titles']), ('Acme', ['Developer']))
+
+    def test_sparse_fields(self):
+        data = self.client.get(self.url, {'fields': ' title, skills,id,title ,'}).json()
+        self.assertEqual(data['results'][0], {'title': 'Developer 2', 'skills': ['Python'], 'id': self.jobs[-1].pk})
+
+    def test_invalid_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,salary'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json()['errors'])
+
+    def test_limit_is_clamped(self):
+        page = self.client.get(self.url, {'limit': '0'}).json()
+        self.assertEqual(len(page['results']), 1)
+        next_page = self.client.get(page['next']).json()
+        self.assertEqual(next_page['results'][0]['id'], self.jobs[1].pk)
+        self.assertIsNotNone(next_page['previous'])
+
+        with mock.patch.object(api, 'MAX_LIMIT', 2):
+            self.assertEqual(len(self.client.get(self.url, {'limit': '1000'}).json()['results']), 2)
+        self.assertEqual(len(self.client.get(self.url, {'limit': 'many'}).json()['results']), 3)
 
-# Create your tests here.
+    def test_ndjson_export(self):
+        with mock.patch.object(api, 'EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get(self.url, {'format': 'ndjson', 'fields': 'id,company'})
+            content = b''.join(response.streaming_content).decode()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertEqual(
+            [json.loads(line) for line in content.splitlines()],
+            [{'id': job.pk, 'company': 'Acme'} for job in reversed(self.jobs)],
+        )
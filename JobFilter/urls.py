@@ -1,5 +1,6 @@
 from django.urls import path
 
+from JobFilter.api import JobSearchAPIView
 from JobFilter.views import ApplyJobFromSearchView, FilteredJobListView, FilteredJobDetailView
 
 
@@ -9,4 +10,5 @@ urlpatterns = [
     path('jobFilter/', FilteredJobListView.as_view(), name='filtered-job-list'),
     path('jobFilter/ApplySearchJobView/<slug:slug>/apply/', ApplyJobFromSearchView.as_view(), name='apply-search-job'),
     path('jobFilter/<slug:slug>/detail/', FilteredJobDetailView.as_view(), name='job_jobFilter_detail'),
+    path('api/jobs/', JobSearchAPIView.as_view(), name='api-jobs'),
 ]
\ No newline at end of file
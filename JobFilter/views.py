@@ -4,11 +4,13 @@ from django.views.generic import (TemplateView,ListView, CreateView,
 from django.shortcuts import redirect
 from django.views import View
 from django.contrib import messages
-from django.core.paginator import Paginator
 from JobFilter.forms import JobFilterForm
 from employer.models import CompanyProfile, JobRequisition
 from JobFilter.models import AppliedSearchJobHistory
-from django.db.models import Q
+from JobFilter.facets import get_facets
+from JobFilter.filters import FACETS, cached_results, distance_zip_codes, filter_jobs, job_ordering
+from JobFilter.search import get_search_backend
+from common.utils.pagination import CursorPaginator
 
 
 class FilteredJobListView(LoginRequiredMixin, TemplateView):
@@ -18,67 +20,76 @@ class FilteredJobListView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         form = JobFilterForm(self.request.GET)
-        applied_jobs = AppliedSearchJobHistory.objects.filter(user=self.request.user)
+        applied_jobs = AppliedSearchJobHistory.objects.filter(
+            user=self.request.user).select_related('Search_job__industry')
         
-        # Filtered job queryset
-        filtered_jobs = JobRequisition.objects.all()
-        
-        for job in filtered_jobs:
-            job.company_profile = CompanyProfile.objects.filter(user=job.user).first()
-
-        if form.is_valid():
-            industry = form.cleaned_data['industry']
-            job_title = form.cleaned_data['job_title']
-            city = form.cleaned_data['city']
-            state = form.cleaned_data['state']
-            min_experience = form.cleaned_data['min_experience']
-            job_type = form.cleaned_data.get('job_type')  # Get job_type from the form
-            work_arrangement_preference = form.cleaned_data.get('work_arrangement_preference')  # Get work_arrangement_preference from the form
-
-            if industry:
-                filtered_jobs = filtered_jobs.filter(industry=industry)
-            if job_title:
-                filtered_jobs = filtered_jobs.filter(job_title=job_title)
-            if city:
-                filtered_jobs = filtered_jobs.filter(city__icontains=city)
-            if state:
-                filtered_jobs = filtered_jobs.filter(state__iexact=state)
-            if min_experience:
-                filtered_jobs = filtered_jobs.filter(min_experience__gte=min_experience)
-            
-            # Apply additional filters
-            if job_type:
-                filtered_jobs = filtered_jobs.filter(job_type=job_type)
-            if work_arrangement_preference:
-                filtered_jobs = filtered_jobs.filter(work_arrangement_preference=work_arrangement_preference)
-                
-            # Sorting
-            sorting = form.cleaned_data.get('sorting')
-            if sorting:
-                if sorting == 'newest':
-                    filtered_jobs = filtered_jobs.order_by('-created')
-                    # Add more sorting options as needed
-                    
-            # Add search functionality using Q objects
-            search = form.cleaned_data['search']
-            if search:
-                query = Q(
-                    Q(job_description__icontains=search) |
-                    Q(custom_job_title__icontains=search)
-                    # Add more Q conditions as needed for other fields
-                )
-                filtered_jobs = filtered_jobs.filter(query) 
-
-        paginator = Paginator(filtered_jobs, self.paginate_by)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Filtered job queryset; industries and job titles are loaded for the
+        # paginated page only
+        filtered_jobs = JobRequisition.objects.select_related('industry').prefetch_related('job_title')
+
+        search_backend = get_search_backend()
+        filters = form.cleaned_data if form.is_valid() else {}
+        zip_codes = home_zip_code = None
+
+        # Distance from the ZIP code of the user's basic information
+        if filters.get('distance'):
+            home_zip_code, zip_codes = distance_zip_codes(self.request.user, filters['distance'])
+            if not zip_codes:
+                messages.info(self.request, "Add a valid ZIP code to your basic information to filter jobs by distance.")
+
+        filtered_jobs = filter_jobs(filtered_jobs, filters, search_backend, zip_codes)
+        ordering = job_ordering(filters, filtered_jobs)
+
+        # Option counts of every facet, shown next to the filters
+        facets = get_facets(filters, search_backend, zip_codes, home_zip_code)
+        form.show_facet_counts(facets)
+
+        # Pages of common searches come from the cached ordered ids and are
+        # loaded with one id__in query; very large results use the database.
+        results = cached_results(filtered_jobs, filters, ordering, home_zip_code)
+        if results is None:
+            paginator = CursorPaginator(filtered_jobs, self.paginate_by, ordering=ordering, count='approximate')
+            page_obj = paginator.get_page(self.request.GET.get('cursor'))
+            jobs = list(page_obj.object_list)
+        else:
+            paginator = CursorPaginator(results, self.paginate_by, ordering=ordering, count='exact')
+            page_obj = paginator.get_page(self.request.GET.get('cursor'))
+            found = JobRequisition.objects.select_related('industry').prefetch_related('job_title').in_bulk(
+                [row['id'] for row in page_obj.object_list])
+            # Jobs deleted since the ids were cached are skipped.
+            jobs = [found[row['id']] for row in page_obj.object_list if row['id'] in found]
+        page_obj.object_list = self.attach_company_profiles(jobs)
 
         context['jobs'] = page_obj
         context['form'] = form
         context['applied_jobs'] = applied_jobs
+        context['facets'] = self.facet_links(facets)
 
         return context
 
+    def facet_links(self, facets, limit=10):
+        """The most frequent options of each facet with the URL choosing them."""
+        links = []
+        for name in FACETS:
+            options = []
+            for value, label, count in facets[name][:limit]:
+                query = self.request.GET.copy()
+                query.pop('cursor', None)
+                query[name] = value
+                options.append({'label': label, 'count': count, 'url': f"?{query.urlencode()}",
+                                'active': self.request.GET.get(name, '').lower() == str(value).lower()})
+            if options:
+                links.append({'name': name, 'label': JobFilterForm.base_fields[name].label, 'options': options})
+        return links
+
+    @staticmethod
+    def attach_company_profiles(jobs):
+        """Set `company_profile` on `jobs` with a single query."""
+        profiles = CompanyProfile.first_profiles({job.user_id for job in jobs})
+        for job in jobs:
+            job.company_profile = profiles.get(job.user_id)
+        return jobs
+
 class FilteredJobDetailView(LoginRequiredMixin, DetailView):
     model = JobRequisition
     context_object_name = 'job' 
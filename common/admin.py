@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.utils import timezone
+
+from common.models import Task
 
 # Register your models here.
 admin.site.index_title = 'Home'
@@ -12,3 +15,17 @@ class DjangoJokesAdmin(admin.ModelAdmin):
     save_as = True
     
 
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    model = Task
+    list_display = ('name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'updated')
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    readonly_fields = ('created', 'updated')
+    actions = ['requeue']
+
+    @admin.action(description='Requeue selected tasks')
+    def requeue(self, request, queryset):
+        queryset.update(status=Task.QUEUED, attempts=0, run_at=timezone.now(), locked_at=None, locked_by='')
@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from common.utils.tasks import claim_tasks, purge_finished_tasks, requeue_stale_tasks
+from common.utils.worker import execute, init_process
+
+# Seconds between releasing tasks of dead workers and purging finished ones.
+MAINTENANCE_INTERVAL = 300
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks in a pool of worker processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Number of tasks run in parallel (default: 1).')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait between polls of an empty queue (default: 1).')
+        parser.add_argument('--keep-done-days', type=int, default=7,
+                            help='Delete finished tasks older than this many days (default: 7).')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no task is due instead of waiting for more.')
+
+    def handle(self, *args, **options):
+        concurrency = max(options['concurrency'], 1)
+        poll_interval = options['poll_interval']
+        keep_done = timedelta(days=options['keep_done_days'])
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.stdout.write(f"Worker {worker} started with concurrency {concurrency}.")
+        # Spawned rather than forked processes, so no database connection of
+        # this process ends up shared with the pool.
+        pool = ProcessPoolExecutor(
+            max_workers=concurrency,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_process,
+        )
+        running = set()
+        maintained_at = float('-inf')
+        with pool:
+            while not self.stopping:
+                if time.monotonic() - maintained_at > MAINTENANCE_INTERVAL:
+                    requeue_stale_tasks()
+                    purge_finished_tasks(keep_done)
+                    maintained_at = time.monotonic()
+
+                free = concurrency - len(running)
+                claimed = claim_tasks(worker, free) if free else []
+                running.update(pool.submit(execute, task_id) for task_id in claimed)
+                if not running:
+                    if options['burst']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                self.report(done)
+            done, _ = wait(running)
+            self.report(done)
+        self.stdout.write(f"Worker {worker} stopped.")
+
+    def stop(self, signum, frame):
+        self.stdout.write('Finishing running tasks before exiting...')
+        self.stopping = True
+
+    def report(self, futures):
+        for future in futures:
+            error = future.exception()
+            if error is not None:
+                self.stderr.write(f"Task crashed the worker process: {error!r}")
@@ -0,0 +1,77 @@
+from django.db import models
+from django.utils import timezone
+from common.utils.chooseConstant import TASK_STATUS_CHOICES
+from common.utils.text import assign_slugs, save_with_unique_slug
+
+
+#SlugModel
+class SlugQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        self.model.prepare_batch(objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class SlugModel(models.Model):
+    """Abstract base of the models with a `slug` derived from their fields.
+
+    Before a row is written, `prepare()` fills derived fields and, on
+    insert, the slug is made of `slug_source()`. Both also run for every
+    object passed to `objects.bulk_create()`, so bulk inserts store the
+    same rows as `save()`.
+    """
+    objects = SlugQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def slug_source(self):
+        """The string the slug is made of."""
+        return str(self)
+
+    def prepare(self):
+        """Set derived fields; called before every save and bulk insert."""
+
+    @classmethod
+    def prepare_batch(cls, objs):
+        for obj in objs:
+            obj.prepare()
+        assign_slugs(objs, lambda obj: obj.slug_source())
+
+    def save(self, *args, **kwargs):
+        self.prepare()
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            save_with_unique_slug(self, self.slug_source(), lambda: super(SlugModel, self).save(*args, **kwargs))
+
+
+#Task
+class Task(models.Model):
+    """A unit of background work picked up by `manage.py run_worker`."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=TASK_STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='common_task_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
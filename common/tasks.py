@@ -0,0 +1,15 @@
+from django.core.mail import send_mail
+
+from common.utils.tasks import task
+
+
+@task
+def send_mail_task(subject, message, from_email, recipient_list, html_message=None):
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipient_list=recipient_list,
+        fail_silently=False,
+        html_message=html_message,
+    )
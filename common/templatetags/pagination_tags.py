@@ -0,0 +1,13 @@
+from django import template
+
+register = template.Library()
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor=None):
+    """Query string of the current request at `cursor`, or at the first page without one."""
+    query = context['request'].GET.copy()
+    query.pop('page', None)
+    query.pop('cursor', None)
+    if cursor:
+        query['cursor'] = cursor
+    return f"?{query.urlencode()}"
@@ -1,3 +1,261 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from common.models import Task
+from common.utils import tasks
+from common.utils.pagination import CursorPaginator, InvalidCursor, decode_cursor, encode_cursor
+from common.utils.tasks import claim_tasks, enqueue, requeue_stale_tasks, run_task, task
+from common.utils.text import assign_slugs
+from common.utils.versions import VersionedValue, bump_version
+from employee.models import Category, Position
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(max_attempts=2)
+def fail(value):
+    raise RuntimeError(f"failed {value}")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_stores_a_queued_task(self):
+        queued = record.delay(1)
+        self.assertEqual((queued.name, queued.args, queued.status), ('common.tests.record', [1], Task.QUEUED))
+        self.assertEqual(calls, [])
+
+    @override_settings(TASKS_ALWAYS_EAGER=True)
+    def test_delay_runs_inline_when_eager(self):
+        self.assertIsNone(record.delay(2))
+        self.assertEqual(calls, [2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_unique_task_is_queued_once(self):
+        first = enqueue('common.tests.record', [1], unique=True)
+        self.assertEqual(enqueue('common.tests.record', [1], unique=True), first)
+        enqueue('common.tests.record', [2], unique=True)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def assert_claims_due_tasks_once(self):
+        due = record.delay(1)
+        later = record.delay(2)
+        Task.objects.filter(pk=later.pk).update(run_at=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(claim_tasks('worker-1', 10), [due.pk])
+        self.assertEqual(claim_tasks('worker-2', 10), [])
+        due.refresh_from_db()
+        self.assertEqual((due.status, due.attempts, due.locked_by), (Task.RUNNING, 1, 'worker-1'))
+
+    def test_claim_with_compare_and_set(self):
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', False):
+            self.assert_claims_due_tasks_once()
+
+    def test_claim_with_skip_locked(self):
+        with mock.patch.object(connection.features, 'has_select_for_update_skip_locked', True):
+            self.assert_claims_due_tasks_once()
+
+    def test_claim_respects_limit_and_order(self):
+        first, second, third = (record.delay(value) for value in range(3))
+        self.assertEqual(claim_tasks('worker', 2), [first.pk, second.pk])
+        self.assertEqual(claim_tasks('worker', 2), [third.pk])
+
+    def test_successful_task_is_done(self):
+        queued = record.delay(3)
+        claim_tasks('worker', 1)
+        self.assertTrue(run_task(queued.pk))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.locked_by, queued.last_error), (Task.DONE, '', ''))
+        self.assertEqual(calls, [3])
+
+    def test_failed_task_is_retried_with_backoff(self):
+        queued = fail.delay(1)
+        claim_tasks('worker', 1)
+        before = timezone.now()
+        self.assertFalse(run_task(queued.pk))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertIn('RuntimeError: failed 1', queued.last_error)
+        self.assertGreaterEqual(queued.run_at, before + timedelta(seconds=tasks.RETRY_BASE_DELAY))
+        # Not due yet.
+        self.assertEqual(claim_tasks('worker', 1), [])
+
+    def test_task_fails_after_max_attempts(self):
+        queued = fail.delay(1)
+        for attempt in range(fail.max_attempts):
+            Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+            self.assertEqual(claim_tasks('worker', 1), [queued.pk])
+            run_task(queued.pk)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Task.FAILED, 2))
+        self.assertEqual(claim_tasks('worker', 1), [])
+
+    def test_retry_delay_doubles_up_to_the_maximum(self):
+        self.assertEqual(tasks.retry_delay(1), timedelta(seconds=tasks.RETRY_BASE_DELAY))
+        self.assertEqual(tasks.retry_delay(2), timedelta(seconds=tasks.RETRY_BASE_DELAY * 2))
+        self.assertEqual(tasks.retry_delay(50), timedelta(seconds=tasks.RETRY_MAX_DELAY))
+
+    def test_stale_tasks_are_requeued_or_failed(self):
+        retried, exhausted = record.delay(1), record.delay(2)
+        claim_tasks('dead-worker', 2)
+        Task.objects.update(locked_at=timezone.now() - tasks.STALE_TASK_TIMEOUT - timedelta(minutes=1))
+        Task.objects.filter(pk=exhausted.pk).update(attempts=exhausted.max_attempts)
+
+        requeue_stale_tasks()
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retried.status, retried.locked_by), (Task.QUEUED, ''))
+        self.assertEqual(exhausted.status, Task.FAILED)
+
+
+class CursorPaginatorTests(TestCase):
+    ordering = ('-run_at', '-id')
+
+    def setUp(self):
+        now = timezone.now()
+        # Pairs of tasks due at the same time, so the id breaks the ties.
+        for minutes in (0, 0, 1, 1, 2, 2, 3):
+            Task.objects.create(name='task', run_at=now + timedelta(minutes=minutes))
+        self.expected = list(Task.objects.order_by(*self.ordering).values_list('pk', flat=True))
+
+    @staticmethod
+    def ids(page):
+        return [item['id'] if isinstance(item, dict) else item.pk for item in page]
+
+    def walk(self, paginator):
+        """Ids of every page going forward, then of every page going back."""
+        pages = [paginator.page(None)]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        forward = [self.ids(page) for page in pages]
+
+        backward = [forward[-1]]
+        page = pages[-1]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.insert(0, self.ids(page))
+        return forward, backward, pages
+
+    def test_queryset_pages_forward_and_back(self):
+        forward, backward, pages = self.walk(CursorPaginator(Task.objects.all(), 3, ordering=self.ordering))
+        self.assertEqual(forward, [self.expected[:3], self.expected[3:6], self.expected[6:]])
+        self.assertEqual(backward, forward)
+        self.assertFalse(pages[0].has_previous())
+        self.assertFalse(pages[-1].has_next())
+
+    def test_list_pages_forward_and_back(self):
+        rows = list(Task.objects.order_by(*self.ordering).values('id', 'run_at'))
+        forward, backward, _ = self.walk(CursorPaginator(rows, 2, ordering=self.ordering))
+        self.assertEqual(sum(forward, []), self.expected)
+        self.assertEqual(backward, forward)
+
+    def test_mixed_directions(self):
+        ordering = ('run_at', '-id')
+        expected = list(Task.objects.order_by(*ordering).values_list('pk', flat=True))
+        forward, backward, _ = self.walk(CursorPaginator(Task.objects.all(), 3, ordering=ordering))
+        self.assertEqual(sum(forward, []), expected)
+        self.assertEqual(backward, forward)
+
+    def test_counts(self):
+        queryset = Task.objects.all()
+        self.assertIsNone(CursorPaginator(queryset, 3, ordering=self.ordering).page(None).count)
+        page = CursorPaginator(queryset, 3, ordering=self.ordering, count='approximate').page(None)
+        # Small results are counted exactly.
+        self.assertEqual((page.count, page.count_is_exact), (7, True))
+
+    def test_cursor_round_trip(self):
+        values = [timezone.now(), 3]
+        self.assertEqual(decode_cursor(encode_cursor(values)), ('n', values))
+
+    def test_invalid_cursor_falls_back_to_the_first_page(self):
+        paginator = CursorPaginator(Task.objects.all(), 3, ordering=self.ordering)
+        with self.assertRaises(InvalidCursor):
+            paginator.page('not a cursor')
+        with self.assertRaises(InvalidCursor):
+            paginator.page(encode_cursor([1]))
+        self.assertEqual(self.ids(paginator.get_page('not a cursor')), self.expected[:3])
+
+
+class VersionedValueTests(TestCase):
+    key = 'common:tests:version'
+
+    def setUp(self):
+        cache.delete(self.key)
+        self.builds = []
+
+    def build(self, version):
+        self.builds.append(version)
+        return len(self.builds)
+
+    def test_version_is_checked_after_the_interval(self):
+        value = VersionedValue(self.key, self.build, check_interval=60)
+        self.assertEqual(value.get(), 1)
+        bump_version(self.key)
+        self.assertEqual(value.get(), 1)
+        value.checked -= 60
+        self.assertEqual(value.get(), 2)
+        self.assertEqual(value.get(), 2)
+
+    def test_invalidate_rebuilds_at_once(self):
+        value = VersionedValue(self.key, self.build, check_interval=60)
+        value.get()
+        value.invalidate()
+        self.assertEqual(value.get(), 2)
+        self.assertEqual(self.builds[1], cache.get(self.key))
+
+    def test_rebuilt_after_max_age(self):
+        value = VersionedValue(self.key, self.build, check_interval=0, max_age=60)
+        value.get()
+        self.assertEqual(value.get(), 1)
+        value.built -= 60
+        self.assertEqual(value.get(), 2)
+
+
+class SlugTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(category='Tech')
+
+    def position(self, **fields):
+        return Position(position='Developer', category=self.category, skill_test_link='https://example.com', **fields)
+
+    def suffixes(self, *values):
+        return mock.patch('common.utils.text.slug_suffix', side_effect=values)
+
+    def test_save_retries_a_taken_slug(self):
+        with self.suffixes('aaa', 'aaa', 'bbb'):
+            first, second = self.position(), self.position()
+            first.save()
+            second.save()
+        self.assertEqual((first.slug, second.slug), ('developer-aaa', 'developer-bbb'))
+        self.assertEqual(Position.objects.count(), 2)
+
+    def test_save_does_not_retry_a_given_slug(self):
+        self.position(slug='developer').save()
+        with self.assertRaises(IntegrityError):
+            self.position(slug='developer').save()
+
+    def test_assign_slugs_are_unique_within_the_batch(self):
+        positions = [self.position(), self.position(), self.position(slug='kept')]
+        with self.suffixes('aaa', 'aaa', 'bbb'):
+            assign_slugs(positions, lambda position: position.position)
+        self.assertEqual([position.slug for position in positions], ['developer-aaa', 'developer-bbb', 'kept'])
+
+    def test_assign_slugs_skip_existing_slugs(self):
+        self.position(slug='developer-aaa').save()
+        with self.suffixes('aaa', 'bbb', 'aaa', 'ccc'):
+            positions = Position.objects.bulk_create([self.position(), self.position()])
+        # The first slug is taken, and so is the next one it draws.
+        self.assertEqual([position.slug for position in positions], ['developer-ccc', 'developer-bbb'])
+        self.assertEqual(Position.objects.count(), 3)
@@ -178,6 +178,14 @@ SORT_CHOICES = (
         ('newest', 'Newly Posted'),
         # Add more sorting choices here as needed
 )
+#Distance filter choices (miles from the user's ZIP code)
+DISTANCE_CHOICES = (
+        ('', 'Any distance'),
+        ('10', 'Within 10 miles'),
+        ('25', 'Within 25 miles'),
+        ('50', 'Within 50 miles'),
+        ('100', 'Within 100 miles'),
+)
 # Location preference choices
 LOCATION_CHOICES = [
         ('home_proximity', 'Proximity to Home/Family'),
@@ -292,4 +300,12 @@ TIME_CARD_STATUS =[
     ('complete','complete'),
 ]
 
-TARGET_AUDIENCE  = (('employee', 'employee'),('employer', 'employer'),)
\ No newline at end of file
+TARGET_AUDIENCE  = (('employee', 'employee'),('employer', 'employer'),)
+
+#Task queue
+TASK_STATUS_CHOICES = (
+    ('queued', 'Queued'),
+    ('running', 'Running'),
+    ('done', 'Done'),
+    ('failed', 'Failed'),
+)
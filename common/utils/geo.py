@@ -0,0 +1,109 @@
+"""Distances between US ZIP codes.
+
+`common/data/zip_centroids.csv.gz` holds the centroid of every US ZIP code
+(exported from the MIT licensed `zipcodes` package). It is loaded once per
+process into NumPy arrays sorted by ZIP code, so looking up many ZIP codes is
+a single binary search and distances are computed with a vectorised
+haversine over the points inside the bounding box of the search radius only.
+"""
+
+import gzip
+import re
+from pathlib import Path
+
+import numpy as np
+
+ZIP_CENTROIDS_PATH = Path(__file__).resolve().parent.parent / 'data' / 'zip_centroids.csv.gz'
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE = 69.17
+
+ZIP_CODE_RE = re.compile(r'^\s*(\d{5})(?:-\d{4})?\s*$')
+
+_zip_index = None
+
+
+def zip_to_int(zip_code):
+    """Numeric 5-digit ZIP code of '12345' or '12345-6789', -1 for anything else."""
+    match = ZIP_CODE_RE.match(zip_code or '')
+    return int(match.group(1)) if match else -1
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """Great-circle distance in miles; all arguments broadcast element-wise."""
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def within_radius(latitude, longitude, miles, latitudes, longitudes):
+    """Boolean mask of the points (`latitudes`, `longitudes`) within `miles`.
+
+    A cheap bounding box comparison drops most points first; the haversine
+    distance is only computed for the points inside the box. Points with NaN
+    coordinates never match.
+    """
+    lat_delta = miles / MILES_PER_DEGREE
+    lon_delta = miles / (MILES_PER_DEGREE * max(np.cos(np.radians(latitude)), 1e-6))
+    with np.errstate(invalid='ignore'):
+        mask = (np.abs(latitudes - latitude) <= lat_delta) & (np.abs(longitudes - longitude) <= lon_delta)
+    candidates = np.flatnonzero(mask)
+    mask[candidates] = haversine_miles(
+        latitude, longitude, latitudes[candidates], longitudes[candidates]) <= miles
+    return mask
+
+
+class ZipIndex:
+    """Centroids of US ZIP codes in arrays sorted by ZIP code."""
+
+    def __init__(self, zip_codes, latitudes, longitudes):
+        order = np.argsort(zip_codes, kind='stable')
+        self.zip_codes = np.asarray(zip_codes, dtype=np.int32)[order]
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)[order]
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)[order]
+
+    def __len__(self):
+        return len(self.zip_codes)
+
+    @classmethod
+    def load(cls, path=ZIP_CENTROIDS_PATH):
+        with gzip.open(path, 'rt') as f:
+            data = np.loadtxt(f, delimiter=',', skiprows=1, ndmin=2)
+        return cls(data[:, 0].astype(np.int32), data[:, 1], data[:, 2])
+
+    def locate(self, zip_codes):
+        """Latitudes and longitudes of numeric `zip_codes`, NaN where unknown."""
+        zip_codes = np.asarray(zip_codes, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.zip_codes, zip_codes), len(self) - 1)
+        found = self.zip_codes[positions] == zip_codes
+        latitudes = np.where(found, self.latitudes[positions], np.nan)
+        longitudes = np.where(found, self.longitudes[positions], np.nan)
+        return latitudes, longitudes
+
+    def coordinates(self, zip_code):
+        """(latitude, longitude) of a ZIP code string, None when unknown."""
+        latitudes, longitudes = self.locate([zip_to_int(zip_code)])
+        if np.isnan(latitudes[0]):
+            return None
+        return float(latitudes[0]), float(longitudes[0])
+
+    def within(self, zip_code, miles):
+        """5-digit ZIP code strings within `miles` of `zip_code`, nearest first.
+
+        Returns an empty list when `zip_code` is unknown.
+        """
+        center = self.coordinates(zip_code)
+        if center is None:
+            return []
+        mask = within_radius(center[0], center[1], miles, self.latitudes, self.longitudes)
+        distances = haversine_miles(center[0], center[1], self.latitudes[mask], self.longitudes[mask])
+        return [f"{zip_code:05d}" for zip_code in self.zip_codes[mask][np.argsort(distances, kind='stable')]]
+
+
+def get_zip_index():
+    """Return the process-wide ZipIndex, loading the bundled dataset on first use."""
+    global _zip_index
+    if _zip_index is None:
+        _zip_index = ZipIndex.load()
+    return _zip_index
@@ -0,0 +1,107 @@
+"""Full-page cache of public pages for anonymous visitors.
+
+`AnonymousPageCacheMixin` stores the rendered body of a GET by an
+anonymous visitor in the shared cache, keyed by path and `page_version()`,
+and serves later visits from it without running the view or its template.
+Every cached page carries an ETag (a hash of the body) and, unless it has
+forms, a Last-Modified date, so browsers revalidate it and get a 304 while
+it is unchanged.
+
+The CSRF tokens of forms are personal: they are swapped for a placeholder
+in the cached body and filled in with the visitor's token when served. As
+a token only works with the cookie it was issued for, the ETag of such a
+page also depends on the visitor's CSRF cookie.
+
+Logged in visitors, other methods and requests with pending messages go
+through the view as usual.
+"""
+
+import hashlib
+import re
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+CSRF_PLACEHOLDER = b'__page_cache_csrf_token__'
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+class AnonymousPageCacheMixin:
+    """Page cache for View subclasses, see the module docstring.
+
+    `page_version()` is part of the cache key, so pages showing database
+    content can invalidate themselves; `page_last_modified()` is the
+    Last-Modified date of the page, by default the time it was rendered.
+    """
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def page_version(self):
+        return ''
+
+    def page_last_modified(self):
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD') or request.user.is_authenticated
+                or len(messages.get_messages(request))):
+            return super().dispatch(request, *args, **kwargs)
+
+        path = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+        key = f"pages:page:{self.page_version()}:{path}"
+        entry = cache.get(key)
+        if entry is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+            content, forms = CSRF_INPUT_RE.subn(rb'\1' + CSRF_PLACEHOLDER + rb'\2', response.content)
+            last_modified = self.page_last_modified() or timezone.now()
+            entry = {
+                'content': content,
+                'content_type': response['Content-Type'],
+                'etag': hashlib.sha1(content).hexdigest()[:16],
+                'last_modified': int(last_modified.timestamp()),
+                'csrf': bool(forms),
+            }
+            cache.set(key, entry, self.page_cache_timeout)
+        return self.serve_cached_page(request, entry)
+
+    def serve_cached_page(self, request, entry):
+        etag, last_modified = entry['etag'], entry['last_modified']
+        cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+        if entry['csrf']:
+            # The secret of the cookie this response sets, which is a new
+            # one on the first visit; the next request sends it back.
+            token = get_token(request)
+            secret = request.META['CSRF_COOKIE']
+            etag = f"{etag}-{hashlib.sha1(secret.encode()).hexdigest()[:8]}"
+            last_modified = None
+        etag = quote_etag(etag)
+
+        response = None
+        if not entry['csrf'] or cookie:
+            # Without a cookie, the tokens of the page the browser holds
+            # are useless; it always gets a new one.
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            content = entry['content']
+            if entry['csrf']:
+                content = content.replace(CSRF_PLACEHOLDER, token.encode())
+            response = HttpResponse(content, content_type=entry['content_type'])
+        response.headers['ETag'] = etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+        if entry['csrf']:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
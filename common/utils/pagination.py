@@ -0,0 +1,241 @@
+"""Keyset (cursor) pagination.
+
+Unlike Django's `Paginator`, which counts the whole result and skips
+`OFFSET` rows for every page, a `CursorPaginator` page starts right after
+the ordering values of the row it was reached from:
+
+    WHERE (created, id) < (<created>, <id>) ORDER BY created DESC, id DESC LIMIT n + 1
+
+so every page costs the same indexed range scan however deep it is. The
+position travels in an opaque, URL-safe cursor string instead of a page
+number. Total counts are optional and may be estimated.
+
+Querysets and already sorted lists (of model instances or dicts) can be
+paginated the same way; the ordering must end with a unique field.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+DEFAULT_ORDERING = ('-created', '-id')
+# Estimated counts below this are small enough to count exactly.
+EXACT_COUNT_LIMIT = 1000
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    # JSON keeps numbers and strings; other ordering values are tagged so
+    # they decode back to the same type.
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'dec': str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+        if 'dec' in value:
+            return Decimal(value['dec'])
+        raise InvalidCursor('Unknown cursor value.')
+    return value
+
+
+def encode_cursor(values, direction=NEXT):
+    data = json.dumps([direction, [_encode_value(value) for value in values]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(direction, values) of `cursor`; raises InvalidCursor when malformed."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, values = json.loads(data)
+        if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+            raise InvalidCursor('Malformed cursor.')
+        return direction, [_decode_value(value) for value in values]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as error:
+        raise InvalidCursor(str(error)) from error
+
+
+def approximate_count(queryset):
+    """(count, exact) of `queryset`, the count estimated by the PostgreSQL planner.
+
+    Counting a large filtered set exactly scans all of it; the planner's
+    estimate is good enough for "about N results". Sets estimated below
+    EXACT_COUNT_LIMIT rows, and other databases, are counted exactly.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count(), True
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    if estimate < EXACT_COUNT_LIMIT:
+        return queryset.count(), True
+    return estimate, False
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor, count, count_is_exact=True):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+        self.count_is_exact = count_is_exact
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Paginate `object_list` by the values of `ordering`.
+
+    `object_list` is a queryset, which gets ordered by `ordering`, or a list
+    already sorted by it. With `count='exact'` or `count='approximate'` the
+    pages carry the total number of items, which `count_is_exact` tells apart
+    from an estimate; by default nothing is counted.
+    """
+
+    def __init__(self, object_list, per_page, ordering=DEFAULT_ORDERING, count=None):
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.descending = [field.startswith('-') for field in self.ordering]
+        if isinstance(object_list, QuerySet):
+            object_list = object_list.order_by(*self.ordering)
+        self.object_list = object_list
+        self.per_page = per_page
+        self.count_mode = count
+
+    def get_page(self, cursor):
+        """Page at `cursor`; the first page for a missing or invalid cursor."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def page(self, cursor):
+        direction, values = decode_cursor(cursor) if cursor else (NEXT, None)
+        if values is not None and len(values) != len(self.fields):
+            raise InvalidCursor('Cursor does not match the ordering.')
+        forward = direction == NEXT
+
+        rows = self._fetch(values, forward)
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+
+        # Moving forward there is a previous page whenever a cursor was
+        # given; moving back there is always a next page.
+        if forward:
+            has_next, has_previous = more, values is not None
+        else:
+            has_next, has_previous = True, more
+        next_cursor = encode_cursor(self._values(rows[-1]), NEXT) if rows and has_next else None
+        previous_cursor = encode_cursor(self._values(rows[0]), PREVIOUS) if rows and has_previous else None
+        return CursorPage(rows, self, next_cursor, previous_cursor, *self.count())
+
+    def count(self):
+        """(count, exact) of the items; the count is None when not counted."""
+        if self.count_mode is None:
+            return None, True
+        if not isinstance(self.object_list, QuerySet):
+            return len(self.object_list), True
+        if self.count_mode == 'approximate':
+            return approximate_count(self.object_list)
+        return self.object_list.count(), True
+
+    def _values(self, item):
+        if isinstance(item, dict):
+            return [item[field] for field in self.fields]
+        return [getattr(item, field) for field in self.fields]
+
+    def _fetch(self, values, forward):
+        if isinstance(self.object_list, QuerySet):
+            queryset = self.object_list
+            if values is not None:
+                queryset = queryset.filter(self._after(values, forward))
+            if not forward:
+                queryset = queryset.reverse()
+            return list(queryset[:self.per_page + 1])
+
+        items = self.object_list if forward else self.object_list[::-1]
+        if values is not None:
+            items = [item for item in items if self._follows(self._values(item), values, forward)]
+        return list(items[:self.per_page + 1])
+
+    def _after(self, values, forward):
+        """Q of the rows after (or before) `values` in the ordering.
+
+        (a, b) > (x, y) is expanded to `a > x OR (a = x AND b > y)`, which
+        also works when the fields are sorted in different directions.
+        """
+        condition = Q()
+        equal = {}
+        for field, descending, value in zip(self.fields, self.descending, values):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def _follows(self, item_values, values, forward):
+        for item_value, value, descending in zip(item_values, values, self.descending):
+            if item_value != value:
+                return (item_value < value) == (descending == forward)
+        return False
+
+
+class CursorPaginationMixin:
+    """Cursor pagination for ListView subclasses.
+
+    Set `paginate_by` as usual; `cursor_ordering` orders the pages and
+    `cursor_count` ('exact' or 'approximate') adds a total to them.
+    """
+    cursor_ordering = DEFAULT_ORDERING
+    cursor_count = None
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, ordering=self.cursor_ordering, count=self.cursor_count)
+        page = paginator.get_page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
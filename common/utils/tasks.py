@@ -0,0 +1,152 @@
+"""Database-backed background tasks.
+
+Functions decorated with `task` get a `delay()` method which stores a
+``common.Task`` row instead of running the function; ``manage.py run_worker``
+claims due rows and runs them in a process pool. Task arguments are stored as
+JSON, so pass ids rather than model instances.
+
+Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the database
+supports it, so several workers can poll the same table without blocking each
+other. Other backends (SQLite) claim every row with a conditional UPDATE that
+only one worker can win.
+"""
+
+import functools
+import importlib
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from common.models import Task
+
+# A failed task is retried after RETRY_BASE_DELAY seconds, doubled on every
+# further failure and capped at RETRY_MAX_DELAY.
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 60 * 60
+
+# Running tasks not finished within this time belong to a worker that died.
+STALE_TASK_TIMEOUT = timedelta(minutes=30)
+
+_registry = {}
+
+
+class BackgroundTask:
+    """A function that can be run now or queued with `delay()`."""
+
+    def __init__(self, func, name, max_attempts, unique):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.unique = unique
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Queue a call of the task, or run it inline when TASKS_ALWAYS_EAGER is set."""
+        if settings.TASKS_ALWAYS_EAGER:
+            self.func(*args, **kwargs)
+            return None
+        return enqueue(self.name, args, kwargs, max_attempts=self.max_attempts, unique=self.unique)
+
+
+def task(func=None, *, name=None, max_attempts=5, unique=False):
+    """Register `func` as a background task.
+
+    With `unique=True` a call is not queued again while an identical one is
+    still waiting to run.
+    """
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        background_task = BackgroundTask(func, task_name, max_attempts, unique)
+        _registry[task_name] = background_task
+        return background_task
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def get_task(name):
+    """Return the registered task `name`, importing its module on first use."""
+    if name not in _registry:
+        importlib.import_module(name.rpartition('.')[0])
+    return _registry[name]
+
+
+def enqueue(name, args=(), kwargs=None, run_at=None, max_attempts=5, unique=False):
+    fields = {'name': name, 'args': list(args), 'kwargs': kwargs or {}}
+    if unique:
+        queued = Task.objects.filter(status=Task.QUEUED, **fields).first()
+        if queued is not None:
+            return queued
+    return Task.objects.create(
+        run_at=run_at or timezone.now(), max_attempts=max_attempts, **fields)
+
+
+def claim_tasks(worker, limit):
+    """Mark up to `limit` due tasks as running for `worker` and return their ids."""
+    now = timezone.now()
+    due = Task.objects.filter(status=Task.QUEUED, run_at__lte=now).order_by('run_at', 'id')
+    claim = {
+        'status': Task.RUNNING,
+        'attempts': F('attempts') + 1,
+        'locked_at': now,
+        'locked_by': worker,
+        'updated': now,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Task.objects.filter(id__in=ids).update(**claim)
+        return ids
+
+    # Without SKIP LOCKED every row is claimed by a compare-and-set UPDATE;
+    # rows another worker got first update nothing and are skipped.
+    ids = []
+    for pk in due.values_list('id', flat=True)[:limit]:
+        if Task.objects.filter(id=pk, status=Task.QUEUED).update(**claim):
+            ids.append(pk)
+    return ids
+
+
+def requeue_stale_tasks():
+    """Release tasks of crashed workers, failing those out of attempts."""
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=now - STALE_TASK_TIMEOUT)
+    stale.filter(attempts__lt=F('max_attempts')).update(
+        status=Task.QUEUED, locked_at=None, locked_by='', updated=now)
+    stale.update(status=Task.FAILED, last_error='Worker stopped before the task finished.', updated=now)
+
+
+def purge_finished_tasks(older_than):
+    return Task.objects.filter(status=Task.DONE, updated__lt=timezone.now() - older_than).delete()
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+def run_task(task_id):
+    """Run a claimed task and record the outcome; return True on success."""
+    task = Task.objects.get(pk=task_id)
+    try:
+        get_task(task.name).func(*task.args, **task.kwargs)
+    except Exception:
+        now = timezone.now()
+        outcome = {'locked_at': None, 'locked_by': '', 'last_error': traceback.format_exc(), 'updated': now}
+        if task.attempts < task.max_attempts:
+            outcome.update(status=Task.QUEUED, run_at=now + retry_delay(task.attempts))
+        else:
+            outcome.update(status=Task.FAILED)
+        Task.objects.filter(pk=task.pk).update(**outcome)
+        return False
+    Task.objects.filter(pk=task.pk).update(
+        status=Task.DONE, locked_at=None, locked_by='', last_error='', updated=timezone.now())
+    return True
+
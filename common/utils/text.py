@@ -1,24 +1,106 @@
 import random
+import secrets
 import string
+import time
+
+from django.db import IntegrityError, router, transaction
 from django.utils.text import slugify
 
-def unique_slug(s, model, num_chars=50):
+SUFFIX_CHARS = string.digits + string.ascii_lowercase
+# Random characters after the time part of a slug suffix.
+SUFFIX_RANDOM_CHARS = 6
+
+
+def slug_suffix():
+    """
+    Return a short suffix that makes slugs unique without a query
+
+    The suffix is the current time in milliseconds in base 36 (8 characters
+    until the year 2059), so slugs of the same base sort by creation, and
+    random characters for inserts within the same millisecond.
+    """
+    value = time.time_ns() // 1_000_000
+    chars = []
+    while value:
+        value, remainder = divmod(value, 36)
+        chars.append(SUFFIX_CHARS[remainder])
+    return ''.join(reversed(chars)) + ''.join(secrets.choice(SUFFIX_CHARS) for i in range(SUFFIX_RANDOM_CHARS))
+
+
+def unique_slug(s, model=None, num_chars=50):
+    """
+    Return slug of num_chars length, unique without reading any table
+
+    `s` is the string to turn into a slug; a `slug_suffix` is appended to
+    it. The unique constraint of the slug column remains the only guard,
+    see `save_with_unique_slug`. `model` is no longer needed and only
+    accepted for the existing callers.
+    """
+    suffix = slug_suffix()
+    slug = slugify(s)[:num_chars - len(suffix) - 1].strip('-')
+    return f"{slug}-{suffix}" if slug else suffix
+
+
+def assign_slugs(instances, value, field='slug', num_chars=50):
+    """
+    Give unique slugs to the `instances` without one, e.g. before bulk_create
+
+    `value` returns the string to slugify for an instance. Slugs are also
+    unique within the batch, which may be created within one millisecond.
+    As a bulk insert cannot retry a single row, the slugs are checked
+    against the table in one query and the taken ones generated again.
+    """
+    assigned = {}
+    for instance in instances:
+        if not getattr(instance, field):
+            slug = unique_slug(value(instance), num_chars=num_chars)
+            while slug in assigned:
+                slug = unique_slug(value(instance), num_chars=num_chars)
+            assigned[slug] = instance
+            setattr(instance, field, slug)
+
+    pending = list(assigned)
+    while pending:
+        model = type(assigned[pending[0]])
+        manager = model._default_manager.using(router.db_for_write(model))
+        taken = set(manager.filter(**{f"{field}__in": pending}).values_list(field, flat=True))
+        pending = []
+        for slug in taken:
+            instance = assigned[slug]
+            while slug in assigned:
+                slug = unique_slug(value(instance), num_chars=num_chars)
+            assigned[slug] = instance
+            setattr(instance, field, slug)
+            pending.append(slug)
+    return instances
+
+
+def save_with_unique_slug(instance, value, save, field='slug', attempts=3):
     """
-    Return slug of num_chars length unique to model
+    Call `save()` after giving `instance` a slug of `value` if it has none
 
-    `s` is the string to turn into a slug
-    `model` is the model we need to use to check for uniqueness
+    Should the generated slug be taken after all, the unique constraint
+    rejects the insert; a new slug is then generated and the save retried.
     """
-    slug = slugify(s)
-    slug = slug[:num_chars].strip('-')
-    while True:
-        dup = model.objects.filter(slug=slug)
-        if not dup:
-            return slug
+    generated = not getattr(instance, field)
+    if generated:
+        setattr(instance, field, unique_slug(value))
+    model = type(instance)
+    using = router.db_for_write(model, instance=instance)
+    for attempt in range(1, attempts + 1):
+        try:
+            with transaction.atomic(using=using):
+                return save()
+        except IntegrityError:
+            # Only collisions of a generated slug are retried; they are rare
+            # enough to afford the query that tells them apart.
+            slug = getattr(instance, field)
+            if (not generated or attempt == attempts
+                    or not model._default_manager.using(using).filter(**{field: slug}).exists()):
+                raise
+            setattr(instance, field, unique_slug(value))
 
-        slug = slug[:39] + '-' + random_string(10)
-        
 
 def random_string(num_chars=10):
     letters = string.ascii_lowercase
-    return ''.join(random.choice(letters) for i in range(num_chars))
\ No newline at end of file
+    return ''.join(random.choice(letters) for i in range(num_chars))
@@ -0,0 +1,84 @@
+"""Version stamps of cached data, shared by every process.
+
+A version is the time in nanoseconds at which it was stamped, stored in
+the shared cache. Anything cached under a version, in its key or next to
+an in-process copy, is stale once the stamp moves. Unlike a counter, a
+stamp that is culled or expires is replaced by a new, larger one instead
+of starting over, so entries of an earlier version never become current
+again.
+
+`VersionedValue` keeps a per-process value (an index, a lookup table)
+built from the database in step with such a version.
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+
+# Seconds a process keeps using a `VersionedValue` before it reads the
+# version again; changes take at most this long to reach every process.
+VERSION_CHECK_INTERVAL = 5
+
+
+def get_version(key, timeout=None):
+    """Current stamp of `key`, starting a new one when there is none."""
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout):
+            # Another process stamped it first; every process agrees on one.
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(key, timeout=None):
+    """Stamp a new version of `key`, making everything cached under it stale."""
+    version = time.time_ns()
+    cache.set(key, version, timeout)
+    return version
+
+
+class VersionedValue:
+    """Per-process value of `build(version)`, rebuilt when the version of `key` moves.
+
+    The version is read from the shared cache at most every `check_interval`
+    seconds (0 reads it on every `get()`); with `max_age` the value is also
+    rebuilt once it is that many seconds old.
+    """
+
+    def __init__(self, key, build, check_interval=VERSION_CHECK_INTERVAL, max_age=None):
+        self.key = key
+        self.build = build
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.value = None
+        self.version = None
+        self.built = self.checked = None
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<VersionedValue {self.key}>"
+
+    def _fresh(self, now):
+        return self.built is not None and (self.max_age is None or now - self.built < self.max_age)
+
+    def get(self):
+        now = time.monotonic()
+        if self._fresh(now) and now - self.checked < self.check_interval:
+            return self.value
+        with self.lock:
+            version = get_version(self.key)
+            now = time.monotonic()
+            if not self._fresh(now) or version != self.version:
+                self.value = self.build(version)
+                self.version = version
+                self.built = time.monotonic()
+            self.checked = now
+            return self.value
+
+    def invalidate(self):
+        """Make every process rebuild the value."""
+        bump_version(self.key)
+        with self.lock:
+            self.built = None
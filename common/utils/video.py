@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+
+
+def video_duration(file):
+    """
+    Return the duration of a video file in seconds, None when unreadable
+
+    `file` is an upload or a file opened from a storage. ffmpeg only reads
+    the container header, the video is not decoded. Files without a local
+    path are copied to a temporary file first.
+    """
+    # moviepy is slow to import and only needed when a video is uploaded.
+    from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+    def probe(path):
+        try:
+            return ffmpeg_parse_infos(path).get('duration')
+        except (OSError, KeyError, ValueError):
+            return None
+
+    if hasattr(file, 'temporary_file_path'):
+        return probe(file.temporary_file_path())
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(file.name)[1]) as temporary_file:
+        file.seek(0)
+        shutil.copyfileobj(file, temporary_file)
+        temporary_file.flush()
+        file.seek(0)
+        return probe(temporary_file.name)
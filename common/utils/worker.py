@@ -0,0 +1,31 @@
+"""Entry points of the `run_worker` pool processes.
+
+Spawned processes unpickle these functions before Django is set up, so this
+module must not import models at import time.
+"""
+
+import signal
+
+import django
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules
+
+
+def init_process():
+    """Prepare a freshly spawned pool process to run tasks."""
+    # Ctrl+C reaches the whole process group; only the parent stops the
+    # worker, the pool processes finish the tasks they are running.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+    autodiscover_modules('tasks')
+
+
+def execute(task_id):
+    """Run a claimed task on a healthy database connection."""
+    from common.utils.tasks import run_task
+
+    close_old_connections()
+    try:
+        return run_task(task_id)
+    finally:
+        close_old_connections()
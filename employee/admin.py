@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from common.utils.text import unique_slug
+from common.utils.text import save_with_unique_slug
 from .models import (
     BankAccount, Education, Background_Check,CertificationLicense,CheckByEmail,EWallet, 
     Experience, Military, Profile, Policies, RidePreference,SafetyTestResult, SchoolName, TaxDocumentSetting, TypeOfSchool,UserAcceptedPolicies,
@@ -313,9 +313,8 @@ class CardAdmin(admin.ModelAdmin):
     readonly_fields = ['created', 'updated']
 
     def save_model(self, request, obj, form, change):
-        if not obj.slug:
-            obj.slug = unique_slug(f"{obj.user.username}-{obj.method_type}")
-        super().save_model(request, obj, form, change)
+        save_with_unique_slug(obj, f"{obj.user.username}-{obj.method_type}",
+                              lambda: super(CardAdmin, self).save_model(request, obj, form, change))
 
 @admin.register(BankAccount)
 class BankAccountAdmin(admin.ModelAdmin):
@@ -326,9 +325,8 @@ class BankAccountAdmin(admin.ModelAdmin):
     
     def save_model(self, request, obj, form, change):
         # Automatically generate slug based on the user's username
-        if not obj.slug:
-            obj.slug = unique_slug(f"{obj.method_type} {obj.user.username}")
-        super().save_model(request, obj, form, change)
+        save_with_unique_slug(obj, f"{obj.method_type} {obj.user.username}",
+                              lambda: super(BankAccountAdmin, self).save_model(request, obj, form, change))
 
 #RidePreference
 @admin.register(RidePreference)
@@ -0,0 +1,236 @@
+"""Type-ahead over positions, skills and school names.
+
+Each taxonomy is held per process in an `AutocompleteIndex`: the
+normalised name of every entry, and every suffix of it starting at a word,
+in one sorted list. A prefix query is then two binary searches, and the
+matches are ranked by how the query matched (start of the name before
+start of a later word) and how often the entry is used by employees and
+job requisitions. The best matches of every one- and two-letter prefix are
+ranked up front, as those ranges cover most of the taxonomy.
+
+When a query has too few prefix matches, prefixes one edit away from it
+(a deleted, inserted, replaced or swapped letter) are looked up too, so
+typos still find their entry.
+
+Indexes are rebuilt when the taxonomy changes (the signals in
+`employee.signals` stamp a new generation, which every process reads at
+most every few seconds) and at least every `INDEX_MAX_AGE` seconds to
+refresh the usage counts.
+"""
+
+import bisect
+import heapq
+import unicodedata
+from collections import Counter
+
+from django.db.models import Count
+
+from common.utils.versions import VersionedValue, bump_version
+from employee.models import EmployeePreferences, Education, Position, SchoolName, Skill
+from employer.models import JobRequisition
+
+AUTOCOMPLETE_GENERATION_KEY = 'employee:autocomplete_generation'
+INDEX_MAX_AGE = 60 * 60
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Best matches kept for every one- and two-letter prefix.
+TOP_PREFIX_LENGTH = 2
+TOP_SIZE = MAX_LIMIT
+# Fuzzy matching starts at this query length and inspects at most this
+# many keys per edited prefix.
+FUZZY_MIN_LENGTH = 3
+FUZZY_SCAN_LIMIT = 200
+
+# Ranks of the ways a query can match; lower is better.
+NAME_PREFIX, WORD_PREFIX, FUZZY = range(3)
+
+
+def normalize(text):
+    """Lower-case `text` without accents and punctuation, single spaced."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char if char.isalnum() else ' ' for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+class AutocompleteIndex:
+    """Prefix and fuzzy search over (id, name, usage, parent ids) entries.
+
+    Results are dicts of the entry id and its name under `label`, the key
+    the existing dropdown endpoints use.
+    """
+
+    def __init__(self, entries, label):
+        self.label = label
+        self.ids = []
+        self.names = []
+        self.usage = []
+        self.parents = []
+        keys = []
+        for entry, (pk, name, usage, parents) in enumerate(entries):
+            self.ids.append(pk)
+            self.names.append(name)
+            self.usage.append(usage)
+            self.parents.append(frozenset(parents))
+            words = normalize(name).split()
+            for start in range(len(words)):
+                keys.append((' '.join(words[start:]), entry, NAME_PREFIX if start == 0 else WORD_PREFIX))
+        keys.sort()
+        self.keys = [key for key, entry, kind in keys]
+        self.entries = [entry for key, entry, kind in keys]
+        self.kinds = [kind for key, entry, kind in keys]
+        self.alphabet = sorted({char for key in self.keys for char in key})
+
+        self.top = {}
+        for key in set(key[:length] for key in self.keys for length in range(1, TOP_PREFIX_LENGTH + 1)):
+            self.top[key] = self._rank(self._prefix_matches(key, None), TOP_SIZE)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _range(self, prefix):
+        return bisect.bisect_left(self.keys, prefix), bisect.bisect_left(self.keys, prefix + '\uffff')
+
+    def _prefix_matches(self, prefix, parent):
+        """{entry: match rank} of the keys starting with `prefix`."""
+        low, high = self._range(prefix)
+        matches = {}
+        for position in range(low, high):
+            entry = self.entries[position]
+            if parent is not None and parent not in self.parents[entry]:
+                continue
+            rank = self.kinds[position]
+            if rank < matches.get(entry, FUZZY):
+                matches[entry] = rank
+        return matches
+
+    def _rank(self, matches, limit):
+        return heapq.nsmallest(
+            limit, matches, key=lambda entry: (matches[entry], -self.usage[entry], self.names[entry].lower()))
+
+    def _edits(self, text):
+        """Strings one deletion, swap, replacement or insertion away from `text`.
+
+        Letters appended at the end are left out: the prefix `text` already
+        covers everything they would match.
+        """
+        splits = [(text[:i], text[i:]) for i in range(len(text) + 1)]
+        deletes = [left + right[1:] for left, right in splits if right]
+        swaps = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
+        replaces = [left + char + right[1:] for left, right in splits if right for char in self.alphabet]
+        inserts = [left + char + right for left, right in splits if right for char in self.alphabet]
+        return set(deletes + swaps + replaces + inserts) - {text}
+
+    def _fuzzy_matches(self, query, parent, matches):
+        # Most edited prefixes match nothing, so each costs a single binary
+        # search and one startswith() check.
+        keys, entries, parents = self.keys, self.entries, self.parents
+        bisect_left = bisect.bisect_left
+        for variant in self._edits(query):
+            position = bisect_left(keys, variant)
+            end = min(position + FUZZY_SCAN_LIMIT, len(keys))
+            while position < end and keys[position].startswith(variant):
+                entry = entries[position]
+                if parent is None or parent in parents[entry]:
+                    matches.setdefault(entry, FUZZY)
+                position += 1
+
+    def search(self, query, limit=DEFAULT_LIMIT, parent=None, fuzzy=True):
+        query = normalize(query)
+        if not query:
+            return []
+        if parent is None and query in self.top and limit <= TOP_SIZE:
+            ranked = self.top[query][:limit]
+        else:
+            matches = self._prefix_matches(query, parent)
+            if fuzzy and len(matches) < limit and len(query) >= FUZZY_MIN_LENGTH:
+                self._fuzzy_matches(query, parent, matches)
+            ranked = self._rank(matches, limit)
+        return [{'id': self.ids[entry], self.label: self.names[entry]} for entry in ranked]
+
+
+def _usage(*columns):
+    """Number of rows of the (through model, column) pairs per column value."""
+    usage = Counter()
+    for model, column in columns:
+        usage.update(dict(model.objects.order_by().values_list(column).annotate(uses=Count('id'))))
+    return usage
+
+
+def _parents(pairs):
+    parents = {}
+    for pk, parent in pairs:
+        parents.setdefault(pk, []).append(parent)
+    return parents
+
+
+def build_positions_index():
+    usage = _usage(
+        (EmployeePreferences.desired_positions.through, 'position_id'),
+        (JobRequisition.job_title.through, 'position_id'),
+    )
+    return AutocompleteIndex(
+        [(pk, name, usage[pk], [category_id])
+         for pk, name, category_id in Position.objects.values_list('id', 'position', 'category_id')],
+        label='position',
+    )
+
+
+def build_skills_index():
+    usage = _usage(
+        (EmployeePreferences.skills.through, 'skill_id'),
+        (JobRequisition.required_skills.through, 'skill_id'),
+    )
+    parents = _parents(Skill.position.through.objects.values_list('skill_id', 'position_id'))
+    return AutocompleteIndex(
+        [(pk, name, usage[pk], parents.get(pk, [])) for pk, name in Skill.objects.values_list('id', 'skill')],
+        label='skill',
+    )
+
+
+def build_school_names_index():
+    usage = _usage((Education.school_name.through, 'schoolname_id'))
+    return AutocompleteIndex(
+        [(pk, name, usage[pk], [type_of_school_id])
+         for pk, name, type_of_school_id in SchoolName.objects.values_list('id', 'name', 'type_of_school_id')],
+        label='name',
+    )
+
+
+BUILDERS = {
+    'positions': build_positions_index,
+    'skills': build_skills_index,
+    'school_names': build_school_names_index,
+}
+
+_indexes = {
+    kind: VersionedValue(AUTOCOMPLETE_GENERATION_KEY, lambda version, build=build: build(), max_age=INDEX_MAX_AGE)
+    for kind, build in BUILDERS.items()
+}
+
+
+def bump_autocomplete_generation():
+    """Invalidate the autocomplete indexes of every process."""
+    bump_version(AUTOCOMPLETE_GENERATION_KEY)
+
+
+def get_index(kind):
+    """Return the process-wide index of `kind`, rebuilding it when outdated."""
+    return _indexes[kind].get()
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def autocomplete(kind, query, parent=None, limit=None):
+    """Best matches of `query` among the entries of `kind`, optionally under `parent`.
+
+    `parent` and `limit` may be the raw query string values; invalid ones
+    are ignored.
+    """
+    limit = min(max(_to_int(limit) or DEFAULT_LIMIT, 1), MAX_LIMIT)
+    return get_index(kind).search(query, limit=limit, parent=_to_int(parent))
@@ -3,9 +3,8 @@ from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 from datetime import datetime
-import os
-import moviepy.editor as mp
 
 from .models import (
     Background_Check, BankAccount, Card, Category, CertificationLicense, CheckByEmail, EWallet, 
@@ -17,6 +16,7 @@ from .models import (
 )
 from django.utils.safestring import mark_safe
 from common.utils.chooseConstant import DISCHARGE_YEAR_CHOICES
+from common.utils.video import video_duration
 from .models import UserAcceptedPolicies
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
@@ -264,50 +264,24 @@ class VideoResumeForm(forms.ModelForm):
             'tell_about_you': forms.Textarea(attrs={'rows': 4,'class': 'textinput form-control form-control-sm'}),
         }
 
-    def clean_video1(self):
-        video = self.cleaned_data.get('video')
-        if video:
-            if not video.name.lower().endswith(tuple(settings.ALLOWED_VIDEO_EXTENSIONS)):
-                raise ValidationError(_('Invalid video format. Supported formats are: {}').format(', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)))
-
-            duration = self.get_video_duration(video)
-            if duration > settings.MAX_VIDEO_DURATION:
-                raise ValidationError(_('Maximum video duration exceeded. Please upload a video with a maximum duration of 1 minutes.'))
-        
-        return video
-    
     def clean_video(self):
         video = self.cleaned_data.get('video')
-        duration = self.cleaned_data.get('duration')
-
-        if video and duration is not None and duration > 2:
-            # Trim the video duration to 1 minutes
-            # Add your logic here to trim the video duration to the desired length
-            if not video.name.lower().endswith(tuple(settings.ALLOWED_VIDEO_EXTENSIONS)):
-                raise ValidationError(_('Invalid video format. Supported formats are: {}').format(', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)))
+        if video and not video.name.lower().endswith(tuple(settings.ALLOWED_VIDEO_EXTENSIONS)):
+            raise ValidationError(_('Invalid video format. Supported formats are: {}').format(', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)))
 
-            duration = self.get_video_duration(video)
-            if duration > settings.MAX_VIDEO_DURATION:
+        # New uploads are probed from their header, which is quick; those
+        # ffmpeg cannot read are checked by check_video_resume_duration once
+        # the resume is saved, see needs_duration_check.
+        self.video_duration = None
+        if isinstance(video, UploadedFile):
+            self.video_duration = video_duration(video)
+            if self.video_duration is not None and self.video_duration > settings.MAX_VIDEO_DURATION:
                 raise ValidationError(_('Maximum video duration exceeded. Please upload a video with a maximum duration of 1 minutes.'))
         return video
 
-    def get_video_duration(self, video_file):
-        try:
-            # Get the temporary file path
-            temp_file_path = video_file.temporary_file_path()
-
-            # Use moviepy to get the video duration
-            video = mp.VideoFileClip(temp_file_path)
-            duration = video.duration
-
-            # Clean up the temporary file
-            os.remove(temp_file_path)
-
-            return duration
-        except Exception as e:
-            # Handle any exceptions
-            print(f"Error retrieving video duration: {str(e)}")
-            return None
+    @property
+    def needs_duration_check(self):
+        return 'video' in self.changed_data and getattr(self, 'video_duration', None) is None
 
 #BackgroundCheckForm
 class BackgroundCheckForm(forms.ModelForm):
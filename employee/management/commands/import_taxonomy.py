@@ -0,0 +1,207 @@
+import csv
+import os
+import time
+
+import openpyxl
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from common.utils.text import assign_slugs
+from employee.autocomplete import bump_autocomplete_generation
+from employee.models import Category, Position, Skill
+from employee.taxonomy import bump_taxonomy_version
+from employer.models import SocCode
+
+COLUMNS = ('category', 'position', 'skill_test_link', 'soc_code', 'skill')
+REQUIRED_COLUMNS = ('category', 'position')
+# Cells of the soc_code and skill columns may hold several values.
+SEPARATOR = ';'
+MAX_WARNINGS = 20
+
+
+def _key(name):
+    """Rows match existing entries by name, ignoring case and spacing."""
+    return ' '.join(name.split()).casefold()
+
+
+def _clean(value):
+    return ' '.join(str(value).split()) if value is not None else ''
+
+
+def read_rows(path, sheet=None):
+    """Yield (line number, row dict) of a CSV or XLSX file, streamed."""
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xlsm'):
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+            header = [_clean(cell).lower().replace(' ', '_') for cell in next(rows, ())]
+            _check_header(header)
+            for line, values in enumerate(rows, start=2):
+                yield line, dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = [_clean(cell).lower().replace(' ', '_') for cell in next(reader, ())]
+            _check_header(header)
+            for line, values in enumerate(reader, start=2):
+                yield line, dict(zip(header, values))
+
+
+def _check_header(header):
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise CommandError(f"Missing column(s): {', '.join(missing)}. Expected: {', '.join(COLUMNS)}.")
+
+
+class Command(BaseCommand):
+    help = (
+        'Create and update categories, positions, skills and SOC codes from a CSV or XLSX file '
+        f"with the columns {', '.join(COLUMNS)}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file to import.')
+        parser.add_argument('--sheet', help='Worksheet of an XLSX file (default: the active one).')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows written per INSERT/UPDATE statement (default: 1000).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report the changes without saving them.')
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['path']):
+            raise CommandError(f"No such file: {options['path']}")
+        self.batch_size = max(options['batch_size'], 1)
+        started = time.monotonic()
+
+        self.read(options['path'], options['sheet'])
+        self.stdout.write(
+            f"Read {self.rows} rows: {len(self.categories)} categories, {len(self.positions)} positions, "
+            f"{len(self.skills)} skills, {len(self.links)} position skills, {len(self.soc_codes)} SOC codes."
+        )
+        with transaction.atomic():
+            counts = self.apply()
+            if options['dry_run']:
+                transaction.set_rollback(True)
+        if not options['dry_run'] and any(counts.values()):
+            # Bulk writes send no signals, so the taxonomy and autocomplete
+            # caches are invalidated here.
+            bump_taxonomy_version()
+            bump_autocomplete_generation()
+
+        summary = ', '.join(f"{count} {name}" for name, count in counts.items())
+        message = f"{'Would apply' if options['dry_run'] else 'Applied'} {summary} in {time.monotonic() - started:.1f}s."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def read(self, path, sheet):
+        """Collect the distinct entries of the file, keyed by normalised name."""
+        self.rows = 0
+        self.categories = {}
+        self.positions = {}
+        self.skills = {}
+        self.links = set()
+        self.soc_codes = set()
+        warnings = 0
+        max_length = {field: model._meta.get_field(field).max_length
+                      for model, field in ((Category, 'category'), (Position, 'position'), (Skill, 'skill'))}
+
+        for line, row in read_rows(path, sheet):
+            self.rows += 1
+            category, position = _clean(row.get('category')), _clean(row.get('position'))
+            skills = [_clean(skill) for skill in _clean(row.get('skill')).split(SEPARATOR) if _clean(skill)]
+            problem = None
+            if not category or not position:
+                problem = 'category and position are required'
+            elif len(category) > max_length['category'] or len(position) > max_length['position']:
+                problem = 'category or position name too long'
+            elif any(len(skill) > max_length['skill'] for skill in skills):
+                problem = 'skill name too long'
+            if problem:
+                warnings += 1
+                if warnings <= MAX_WARNINGS:
+                    self.stderr.write(f"Line {line} skipped: {problem}.")
+                continue
+
+            position_key = (_key(category), _key(position))
+            self.categories.setdefault(position_key[0], category)
+            entry = self.positions.setdefault(position_key, {'position': position, 'skill_test_link': ''})
+            link = _clean(row.get('skill_test_link'))
+            if link:
+                entry['skill_test_link'] = link
+            for skill in skills:
+                self.skills.setdefault(_key(skill), skill)
+                self.links.add((_key(skill), position_key))
+            for soc_code in _clean(row.get('soc_code')).split(SEPARATOR):
+                if soc_code.strip():
+                    self.soc_codes.add((position_key, soc_code.strip()))
+
+        if warnings > MAX_WARNINGS:
+            self.stderr.write(f"... {warnings - MAX_WARNINGS} more rows skipped.")
+
+    def apply(self):
+        """Write what is missing or changed; return the number of rows per change."""
+        counts = {}
+        now = timezone.now()
+
+        category_ids = {}
+        for pk, name in Category.objects.order_by('id').values_list('id', 'category'):
+            category_ids.setdefault(_key(name), pk)
+        new_categories = [Category(category=name) for key, name in self.categories.items() if key not in category_ids]
+        Category.objects.bulk_create(new_categories, batch_size=self.batch_size)
+        category_ids.update((_key(category.category), category.pk) for category in new_categories)
+        counts['categories created'] = len(new_categories)
+
+        positions = {}
+        for position in Position.objects.order_by('id').only('id', 'category_id', 'position', 'skill_test_link'):
+            positions.setdefault((position.category_id, _key(position.position)), position)
+        new_positions, changed_positions = [], []
+        for (category_key, position_key), entry in self.positions.items():
+            key = (category_ids[category_key], position_key)
+            position = positions.get(key)
+            if position is None:
+                position = positions[key] = Position(
+                    category_id=key[0], position=entry['position'], skill_test_link=entry['skill_test_link'])
+                new_positions.append(position)
+            elif entry['skill_test_link'] and entry['skill_test_link'] != position.skill_test_link:
+                position.skill_test_link = entry['skill_test_link']
+                position.updated = now
+                changed_positions.append(position)
+        assign_slugs(new_positions, lambda position: position.position)
+        Position.objects.bulk_create(new_positions, batch_size=self.batch_size)
+        Position.objects.bulk_update(changed_positions, ['skill_test_link', 'updated'], batch_size=self.batch_size)
+        counts['positions created'] = len(new_positions)
+        counts['positions updated'] = len(changed_positions)
+
+        def position_id(position_key):
+            return positions[(category_ids[position_key[0]], position_key[1])].pk
+
+        skill_ids = {}
+        for pk, name in Skill.objects.order_by('id').values_list('id', 'skill'):
+            skill_ids.setdefault(_key(name), pk)
+        new_skills = [Skill(skill=name) for key, name in self.skills.items() if key not in skill_ids]
+        Skill.objects.bulk_create(new_skills, batch_size=self.batch_size)
+        skill_ids.update((_key(skill.skill), skill.pk) for skill in new_skills)
+        counts['skills created'] = len(new_skills)
+
+        PositionSkill = Skill.position.through
+        existing_links = set(PositionSkill.objects.values_list('skill_id', 'position_id'))
+        new_links = {(skill_ids[skill_key], position_id(position_key)) for skill_key, position_key in self.links}
+        new_links -= existing_links
+        PositionSkill.objects.bulk_create(
+            [PositionSkill(skill_id=skill, position_id=position) for skill, position in new_links],
+            batch_size=self.batch_size,
+        )
+        counts['position skills linked'] = len(new_links)
+
+        existing_soc_codes = set(SocCode.objects.values_list('position_id', 'soc_code'))
+        new_soc_codes = {(position_id(position_key), soc_code) for position_key, soc_code in self.soc_codes}
+        new_soc_codes -= existing_soc_codes
+        SocCode.objects.bulk_create(
+            [SocCode(position_id=position, soc_code=soc_code) for position, soc_code in new_soc_codes],
+            batch_size=self.batch_size,
+        )
+        counts['SOC codes created'] = len(new_soc_codes)
+        return counts
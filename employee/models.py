@@ -6,7 +6,6 @@ from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.db.models.signals import post_save
 from django.contrib.auth.models import Group
-from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 from django.core.exceptions import ValidationError
@@ -14,7 +13,7 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
-from common.utils.text import unique_slug
+from common.models import SlugModel
 from localflavor.us.models import USStateField 
 from localflavor.us.us_states import STATE_CHOICES
 from datetime import datetime, timedelta
@@ -81,7 +80,7 @@ class Policies(models.Model):
         return self.title 
 
 #UserAcceptedPolicies  
-class UserAcceptedPolicies(models.Model):
+class UserAcceptedPolicies(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     policies = models.ForeignKey(Policies, on_delete=models.CASCADE)
     accepted = models.BooleanField(default=False)
@@ -91,15 +90,9 @@ class UserAcceptedPolicies(models.Model):
 
     def __str__(self):
         return str(f'{self.policies}-{self.accepted}')
-
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = str(self)
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
         
 #BASIC INFORMATION MODELS   
-class BasicInformation(models.Model):
+class BasicInformation(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     address = models.CharField(max_length=200)
     apartment = models.CharField(max_length=50, null=True, blank=True)
@@ -116,12 +109,6 @@ class BasicInformation(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = str(self)
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return f"{self.email} {self.zip_code}"
     
@@ -159,7 +146,7 @@ def validate_social_security_number(ssn):
     return True
 
 #PERSONAL INFORMATION MODELS 
-class Personal(models.Model):
+class Personal(SlugModel):
     GENDER_CHOICES = (('M', 'Male'),('F', 'Female'),('O', 'Other'),)
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -175,17 +162,14 @@ class Personal(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.nickname} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.nickname} {self.user.username}"
 
     def __str__(self):
         return f"{self.nickname} ({self.user.username})"
     
 #Military
-class Military(models.Model):
+class Military(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     branch = models.CharField(max_length=50, choices=BRANCH)
     rank = models.CharField(max_length=100, choices=RANK_CHOICES)
@@ -208,11 +192,8 @@ class Military(models.Model):
 
         return super().form_valid(form)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.branch} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.branch} {self.user.username}"
            
     def __str__(self):
         return f"{self.user.username}'s Military Information"
@@ -230,7 +211,7 @@ class SchoolName(models.Model):
     def __str__(self):
         return self.name   
     
-class Education(models.Model):
+class Education(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     type_of_school = models.ForeignKey(TypeOfSchool, on_delete=models.CASCADE,default=1)
     school_name = models.ManyToManyField(SchoolName, related_name='school_name')
@@ -247,17 +228,14 @@ class Education(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.degree_type} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.degree_type} {self.user.username}"
 
     def __str__(self):
         return f"{self.user.username}'s Education: {self.degree_type} from {self.custem_school_name}"  
 
 #CertificationLicense
-class CertificationLicense(models.Model):
+class CertificationLicense(SlugModel):
     education = models.ForeignKey(Education, on_delete=models.CASCADE)
     document_type = models.CharField(max_length=100,choices=CERTIFICATION_LICENSES, default='certification')
     document_name = models.CharField(max_length=100)
@@ -266,16 +244,13 @@ class CertificationLicense(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.document_name} {self.education.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.document_name} {self.education.user.username}"
 
     def __str__(self):
         return self.document_name
 
-class Experience(models.Model):
+class Experience(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     company_name = models.CharField(max_length=100)
     company_phone = models.CharField(max_length=20)
@@ -288,11 +263,8 @@ class Experience(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.job_title} {self.user.username}"
-            self.slug = unique_slug(value,type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.job_title} {self.user.username}"
 
     def __str__(self):
         return f"{self.user.username}'s Experience: {self.job_title} at {self.company_name}"
@@ -303,7 +275,7 @@ class Category(models.Model):
     def __str__(self):
         return self.category
 
-class Position(models.Model):
+class Position(SlugModel):
     position = models.CharField(max_length=200)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='positions')
     skill_test_link = models.URLField()
@@ -311,11 +283,8 @@ class Position(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.position}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.position}"
 
     def __str__(self):
         return self.position
@@ -327,7 +296,9 @@ class Skill(models.Model):
     def __str__(self):
         return self.skill
 
-class EmployeePreferences(models.Model):
+
+
+class EmployeePreferences(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     desired_positions = models.ManyToManyField(Position, related_name='employee_preferences')
@@ -345,12 +316,8 @@ class EmployeePreferences(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.job_type} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-
-        super().save(*args, **kwargs)  # Save the object
+    def slug_source(self):
+        return f"{self.job_type} {self.user.username}"
         
     def __str__(self):
         return f"{self.user.username}'s Preferences"
@@ -358,30 +325,18 @@ class EmployeePreferences(models.Model):
     def get_absolute_url(self):
         return reverse('employee:employee-preferences-detail', kwargs={'slug': self.slug})
 
-    @property
-    def positions_cache_key(self):
-        return f"employee_positions_{self.category_id}"
-
-    @property
-    def skills_cache_key(self):
-        return f"employee_skills_{self.desired_positions.values_list('id', flat=True)}"
-
     def get_positions(self):
-        positions = cache.get(self.positions_cache_key)
-        if not positions:
-            positions = Position.objects.filter(category=self.category)
-            cache.set(self.positions_cache_key, positions)
-        return positions
+        from employee.taxonomy import get_taxonomy
+        return Position.objects.filter(id__in=get_taxonomy().position_ids([self.category_id]))
 
     def get_skills(self):
-        skills = cache.get(self.skills_cache_key)
-        if not skills:
-            skills = Skill.objects.filter(position__in=self.desired_positions.all())
-            cache.set(self.skills_cache_key, skills)
-        return skills
+        from employee.taxonomy import get_taxonomy
+        # Read through .all() so prefetched desired positions are reused.
+        return Skill.objects.filter(
+            id__in=get_taxonomy().skill_ids(position.pk for position in self.desired_positions.all()))
 
 #SkillSetTestResult
-class SkillSetTestResult(models.Model):
+class SkillSetTestResult(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     position = models.ForeignKey(Position, on_delete=models.CASCADE)
     skill_test = models.CharField(max_length=200)
@@ -400,16 +355,13 @@ class SkillSetTestResult(models.Model):
         return random_conformation
         
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username} {self.position}"
-            self.slug = unique_slug(value, type(self))
-            
+    def slug_source(self):
+        return f"{self.user.username} {self.position}"
+
+    def prepare(self):
          # Call the generate_conformation_id function to set the conformation field
         if not self.conformation:
             self.conformation = self.generate_conformation_id()
-
-        super().save(*args, **kwargs)
         
     def __str__(self):
         return f"{self.user.username}'s Skill Set Test Result"
@@ -431,7 +383,7 @@ class Safety_Video_and_Test(models.Model):
        # return reverse("employee:Safety_Video", kwargs={"pk": self.pk})
     
 #SafetyTestResult
-class SafetyTestResult(models.Model):
+class SafetyTestResult(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     safety_result = models.CharField(max_length=50)
     states = models.CharField(max_length=20, default='success')
@@ -439,17 +391,14 @@ class SafetyTestResult(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username} {self.states}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.user.username} {self.states}"
         
     def __str__(self):
         return f"Test Result for {self.user.username}"
 
 #VideoResume_completed
-class VideoResume(models.Model):
+class VideoResume(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     video = models.FileField(upload_to='videoResumes/%Y/%m/%d')
     tell_about_you=models.TextField(max_length=600, null=True)
@@ -459,11 +408,8 @@ class VideoResume(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username}-videoResumes-{self.viewCount}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.user.username}-videoResumes-{self.viewCount}"
 
     def __str__(self):
         return f"video Resumes for {self.user.username}"
@@ -472,7 +418,7 @@ class VideoResume(models.Model):
        # return reverse('employee:video_resume_list', kwargs={'slug': self.slug})
    
 #RettingCommenting 
-class RettingCommenting(models.Model):  
+class RettingCommenting(SlugModel):  
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     retting = models.SmallIntegerField(default=1, validators=[MinValueValidator(1), MaxValueValidator(5)])
     tag = models.CharField(max_length=50, choices=TAG_CHOOSES)
@@ -481,17 +427,14 @@ class RettingCommenting(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username}-retting-{self.retting}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.user.username}-retting-{self.retting}"
     
     def __str__(self):
         return f" retting and tagging for {self.user.username}"
 
 #Background_Check
-class Background_Check(models.Model):
+class Background_Check(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     certification_file = models.FileField(upload_to='certificationsBackground/', blank=True, null=True)
     expiration_date = models.DateTimeField(blank=True, null=True)
@@ -501,11 +444,10 @@ class Background_Check(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username}-BackgroundCheck"
-            self.slug = unique_slug(value, type(self))
-              
+    def slug_source(self):
+        return f"{self.user.username}-BackgroundCheck"
+
+    def prepare(self):
         # Set the `created` field only during the first save
         if not self.id:
             self.created = timezone.now()
@@ -515,14 +457,13 @@ class Background_Check(models.Model):
         elif self.expiration_date and self.expiration_date <= timezone.now():
             self.expiration_states = 'expired'
         elif self.created != self.updated and self.expiration_states == 'expired' and not self.expiration_date:
-            self.expiration_date = self.updated + timezone.timedelta(days=180)      
-        super().save(*args, **kwargs)
+            self.expiration_date = self.updated + timezone.timedelta(days=180)
     
     def __str__(self):
         return f" BackgroundCheck for {self.user.username}"
 
 #BankAccount
-class BankAccount(models.Model):
+class BankAccount(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     method_type = models.CharField(max_length=50, unique=True, default='bankAccount')  
     account_number = models.CharField(max_length=20, help_text='Enter valid account number to avoid delay.')
@@ -532,17 +473,14 @@ class BankAccount(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.method_type} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs) 
+    def slug_source(self):
+        return f"{self.method_type} {self.user.username}"
         
     def __str__(self):
         return f"{self.user.username} - {self.method_type}"
 
 #card
-class Card(models.Model):
+class Card(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     method_type = models.CharField(max_length=50, unique=True, default='Card')
     card_type = models.CharField(max_length=50, choices=CARD_TYPE_CHOOSE)
@@ -555,17 +493,14 @@ class Card(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.method_type} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.method_type} {self.user.username}"
 
     def __str__(self):
         return f"{self.user.username}-{self.method_type}"
 
 #EWallet
-class EWallet(models.Model):
+class EWallet(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     method_type = models.CharField(max_length=50, unique=True, default='EWallet')
     e_wallet_name = models.CharField(max_length=100)
@@ -575,17 +510,14 @@ class EWallet(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.account_email} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.account_email} {self.user.username}"
     
     def __str__(self):
         return f"{self.user.username}-{self.method_type}"
    
 #checkByEmail 
-class CheckByEmail(models.Model):
+class CheckByEmail(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     method_type = models.CharField(max_length=50, unique=True, default='checkEmail')
     poBox = models.CharField(max_length=200,null=True , blank=True)
@@ -595,17 +527,14 @@ class CheckByEmail(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.method_type} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.method_type} {self.user.username}"
     
     def __str__(self):
         return f"{self.user.username}-{self.method_type}"
 
 #RidePreference
-class RidePreference(models.Model):
+class RidePreference(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     ride_preference = models.CharField(max_length=255, choices=RIDE_CHOOSE)
     slug = models.SlugField(unique=True)
@@ -613,17 +542,14 @@ class RidePreference(models.Model):
     updated = models.DateTimeField(auto_now=True)
     
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.ride_preference} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.ride_preference} {self.user.username}"
 
     def __str__(self):
         return f"{self.user}-{self.ride_preference}"
 
 #TaxDocumentSetting
-class TaxDocumentSetting(models.Model):
+class TaxDocumentSetting(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     taxUserType = models.CharField(max_length=20, choices=TAX_USER_TYPE_CHOICES)
     formType = models.CharField(max_length=5, choices=FORM_TYPE_CHOICES)
@@ -633,11 +559,8 @@ class TaxDocumentSetting(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.taxUserType} {self.formType} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.taxUserType} {self.formType} {self.user.username}"
 
     def __str__(self):
         return f"{self.user.username} - {self.taxUserType} - {self.formType}"
@@ -0,0 +1,205 @@
+"""Everything the profile building wizard shows for one employee.
+
+`get_onboarding` gathers the progress flags, policies, skill tests, safety
+videos and certifications of a user in five queries into an
+`OnboardingSnapshot` of plain values, and caches it per user under the
+user's `profile_generation`. The signals in `employee.signals` stamp a new
+one when one of their onboarding rows is saved or deleted, so a snapshot
+built from the rows before the change is stored under a key nobody reads
+any more; changes to the policies or safety videos, which every user sees,
+bump a generation instead.
+
+Only the forms of the step the user is on are rendered with the wizard
+page; the others are fetched when their modal opens. Unbound forms look
+the same for every user, so `render_step_form` caches their HTML.
+
+The dashboards cache the sections that show a user's profile with
+`{% cache %}`, keyed by the same `profile_generation`.
+"""
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db.models import Exists, OuterRef, Subquery
+from django.template.loader import render_to_string
+
+from common.utils.versions import bump_version, get_version
+from employee.models import (
+    CertificationLicense, Education, EmployeePreferences, Policies, Profile,
+    Safety_Video_and_Test, SkillSetTestResult, UserAcceptedPolicies,
+)
+from employee.forms import (
+    BackgroundCheckForm, BankAccountForm, BasicInformationForm, CardForm, CertificationLicenseForm,
+    CheckByEmailForm, EducationForm, EmployeePreferencesForm, EWalletForm, ExperienceForm, MilitaryForm,
+    PersonalForm, SafetyTestResultForm, VideoResumeForm,
+)
+from employee.taxonomy import taxonomy_version
+
+ONBOARDING_GENERATION_KEY = 'employee:onboarding_generation'
+SNAPSHOT_TIMEOUT = 60 * 60
+PROFILE_GENERATION_TIMEOUT = 60 * 60 * 24
+
+# Profile flags of the wizard steps, in order; the progress is the share
+# of them that are set.
+STEP_FIELDS = (
+    'account_created',
+    'companyPolices_completed',
+    'basic_information_completed',
+    'personal_information_completed',
+    'Military_completed',
+    'Education_completed',
+    'Experience_completed',
+    'Preferences_completed',
+    'SkillSetTest_completed',
+    'Safety_Video_and_Test_completed',
+    'VideoResume_completed',
+    'Background_Check_completed',
+    'Treat_Box_completed',
+    'Select_Ride_completed',
+)
+PROFILE_FIELDS = STEP_FIELDS + (
+    'OnProgressSkillTest_completed',
+    'Skipped_completed',
+    'cardBtn_completed',
+    'eWalletBtn_completed',
+    'bankAccountBtn_completed',
+    'CheckByMailBtn_completed',
+)
+
+# Forms of the wizard: form class, template and the step flag they complete.
+STEP_FORMS = {
+    'basic_information': (BasicInformationForm, 'employee/onboarding/form.html', 'basic_information_completed'),
+    'personal': (PersonalForm, 'employee/onboarding/form.html', 'personal_information_completed'),
+    'military': (MilitaryForm, 'employee/onboarding/form.html', 'Military_completed'),
+    'education': (EducationForm, 'employee/onboarding/form.html', 'Education_completed'),
+    'certification_license': (CertificationLicenseForm, 'employee/onboarding/form.html', 'Education_completed'),
+    'experience': (ExperienceForm, 'employee/onboarding/form.html', 'Experience_completed'),
+    'preferences': (EmployeePreferencesForm, 'employee/onboarding/preferences.html', 'Preferences_completed'),
+    'safety_test': (SafetyTestResultForm, 'employee/onboarding/form.html', 'Safety_Video_and_Test_completed'),
+    'video_resume': (VideoResumeForm, 'employee/onboarding/form.html', 'VideoResume_completed'),
+    'background_check': (BackgroundCheckForm, 'employee/onboarding/form.html', 'Background_Check_completed'),
+    'card': (CardForm, 'employee/onboarding/form.html', 'Treat_Box_completed'),
+    'e_wallet': (EWalletForm, 'employee/onboarding/form.html', 'Treat_Box_completed'),
+    'bank_account': (BankAccountForm, 'employee/onboarding/form.html', 'Treat_Box_completed'),
+    'check_by_email': (CheckByEmailForm, 'employee/onboarding/form.html', 'Treat_Box_completed'),
+}
+# Form HTML is cached per taxonomy version, as the preferences form lists
+# the categories; other choices (languages, school types) refresh with
+# the timeout.
+STEP_FORM_TIMEOUT = 60 * 10
+
+
+class OnboardingSnapshot:
+    """Read-only onboarding state of a user.
+
+    Rows are tuples of dicts with the keys the wizard template reads, so
+    the snapshot pickles small and renders without further queries.
+    """
+
+    def __init__(self, profile, policies, accepted_policy_ids, tests, safety_videos, certifications):
+        self.profile = profile
+        self.policies = policies
+        self.accepted_policy_ids = accepted_policy_ids
+        self.tests = tests
+        self.safety_videos = safety_videos
+        self.certifications = certifications
+
+    @property
+    def preference_category_id(self):
+        return self.profile['preference_category_id']
+
+    @property
+    def has_documented_education(self):
+        return self.profile['documented_education']
+
+    @property
+    def all_policies_accepted(self):
+        return len(self.accepted_policy_ids) == len(self.policies)
+
+    @property
+    def active_step(self):
+        """Flag of the first step the user has not completed, None when done."""
+        return next((field for field in STEP_FIELDS if not self.profile[field]), None)
+
+    @property
+    def progress_percentage(self):
+        return int(sum(bool(self.profile[field]) for field in STEP_FIELDS) / len(STEP_FIELDS) * 100)
+
+
+def _snapshot_key(user_id):
+    return f"employee:onboarding:{get_version(ONBOARDING_GENERATION_KEY)}:{user_id}:{profile_generation(user_id)}"
+
+
+def build_onboarding(user_id):
+    """Query the snapshot of `user_id`; None when the user has no profile."""
+    profile = Profile.objects.filter(user_id=user_id).annotate(
+        documented_education=Exists(Education.objects.filter(user_id=user_id, documentation=True)),
+        preference_category_id=Subquery(
+            EmployeePreferences.objects.filter(user_id=user_id).order_by('id').values('category_id')[:1]),
+    ).values(*PROFILE_FIELDS, 'documented_education', 'preference_category_id').first()
+    if profile is None:
+        return None
+
+    policies = tuple(Policies.objects.annotate(
+        accepted=Exists(UserAcceptedPolicies.objects.filter(user_id=user_id, policies=OuterRef('pk'))),
+    ).order_by('id').values('id', 'title', 'description', 'accepted'))
+    tests = []
+    for row in SkillSetTestResult.objects.filter(user_id=user_id).order_by('id').values(
+            'position__position', 'skill_test', 'states', 'result', 'slug', 'created', 'updated'):
+        row['position'] = row.pop('position__position')
+        tests.append(row)
+    safety_videos = tuple(Safety_Video_and_Test.objects.order_by('id').values('id', 'title', 'video_url', 'description'))
+    certifications = tuple(
+        {'document_name': document_name, 'url': default_storage.url(name) if name else ''}
+        for document_name, name in CertificationLicense.objects.filter(
+            education__user_id=user_id).order_by('id').values_list('document_name', 'certification_file')
+    )
+    return OnboardingSnapshot(
+        profile=profile,
+        policies=policies,
+        accepted_policy_ids=frozenset(policy['id'] for policy in policies if policy['accepted']),
+        tests=tuple(tests),
+        safety_videos=safety_videos,
+        certifications=certifications,
+    )
+
+
+def get_onboarding(user_id):
+    """Return the cached snapshot of `user_id`, building it when missing."""
+    key = _snapshot_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_onboarding(user_id)
+        if snapshot is not None:
+            cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def invalidate_onboarding(user_id):
+    """Invalidate the snapshot of `user_id`, e.g. after a bulk write or update()."""
+    bump_profile_generation(user_id)
+
+
+def bump_onboarding_generation():
+    """Invalidate the snapshots of every user."""
+    bump_version(ONBOARDING_GENERATION_KEY)
+
+
+def profile_generation(user_id):
+    """Stamp of the current profile of `user_id`, for fragment cache keys."""
+    return get_version(f"employee:profile_generation:{user_id}", PROFILE_GENERATION_TIMEOUT)
+
+
+def bump_profile_generation(user_id):
+    """Invalidate the cached dashboard fragments of `user_id`."""
+    bump_version(f"employee:profile_generation:{user_id}", PROFILE_GENERATION_TIMEOUT)
+
+
+def render_step_form(name):
+    """HTML of the unbound form `name` of `STEP_FORMS`, from the cache when possible."""
+    form_class, template_name, step = STEP_FORMS[name]
+    key = f"employee:onboarding_form:{taxonomy_version()}:{name}"
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, {'form': form_class()})
+        cache.set(key, html, STEP_FORM_TIMEOUT)
+    return html
@@ -1,8 +1,14 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from employee.models import EmployeePreferences, SkillSetTestResult
-from employer.models import JobRequisition
+from employee.autocomplete import bump_autocomplete_generation
+from employee.taxonomy import bump_taxonomy_version
+from employee.models import (
+    Background_Check, Category, CertificationLicense, Education, EmployeePreferences, Policies, Position,
+    Profile, Safety_Video_and_Test, SchoolName, Skill, SkillSetTestResult, UserAcceptedPolicies, VideoResume,
+)
+from employee.onboarding import bump_onboarding_generation, bump_profile_generation, invalidate_onboarding
+from employer.models import JobRequisition, SocCode
 from recommendedByAI.models import RecommendedJobs
 
 @receiver(post_save, sender=EmployeePreferences)
@@ -55,3 +61,70 @@ def generate_recommended_jobs(sender, instance, created, **kwargs):
                 employee_preferences=instance,
                 job_requisition=job
             )"""
+
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=SchoolName)
+@receiver(post_delete, sender=SchoolName)
+@receiver(m2m_changed, sender=Skill.position.through)
+def invalidate_autocomplete(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_autocomplete_generation()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=SocCode)
+@receiver(post_delete, sender=SocCode)
+@receiver(m2m_changed, sender=Skill.position.through)
+def invalidate_taxonomy(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        bump_taxonomy_version()
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+@receiver(post_save, sender=UserAcceptedPolicies)
+@receiver(post_delete, sender=UserAcceptedPolicies)
+@receiver(post_save, sender=Education)
+@receiver(post_delete, sender=Education)
+@receiver(post_save, sender=EmployeePreferences)
+@receiver(post_delete, sender=EmployeePreferences)
+@receiver(post_save, sender=SkillSetTestResult)
+@receiver(post_delete, sender=SkillSetTestResult)
+def invalidate_user_onboarding(sender, instance, **kwargs):
+    invalidate_onboarding(instance.user_id)
+
+
+@receiver(post_save, sender=VideoResume)
+@receiver(post_delete, sender=VideoResume)
+@receiver(post_save, sender=Background_Check)
+@receiver(post_delete, sender=Background_Check)
+def invalidate_profile_fragments(sender, instance, **kwargs):
+    # Not part of the snapshot, but shown in the cached profile preview.
+    bump_profile_generation(instance.user_id)
+
+
+@receiver(post_save, sender=CertificationLicense)
+@receiver(post_delete, sender=CertificationLicense)
+def invalidate_certification_onboarding(sender, instance, **kwargs):
+    # The education is gone when it is deleted with it, in which case its
+    # own signal has invalidated the snapshot already.
+    user_id = Education.objects.filter(pk=instance.education_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate_onboarding(user_id)
+
+
+@receiver(post_save, sender=Policies)
+@receiver(post_delete, sender=Policies)
+@receiver(post_save, sender=Safety_Video_and_Test)
+@receiver(post_delete, sender=Safety_Video_and_Test)
+def invalidate_all_onboarding(sender, **kwargs):
+    bump_onboarding_generation()
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from common.tasks import send_mail_task
+from common.utils.tasks import task
+from common.utils.video import video_duration
+from employee.models import Profile, VideoResume
+from employee.onboarding import invalidate_onboarding
+
+
+@task
+def check_video_resume_duration(video_resume_id):
+    """Remove a video resume longer than MAX_VIDEO_DURATION.
+
+    Queued for uploads whose header VideoResumeForm could not read. The file
+    is read through the default storage, which the worker must share with
+    the web process (a remote storage rather than a local MEDIA_ROOT).
+    """
+    video_resume = VideoResume.objects.select_related('user').filter(pk=video_resume_id).first()
+    if video_resume is None or not video_resume.video:
+        return
+    with default_storage.open(video_resume.video.name) as video:
+        duration = video_duration(video)
+
+    if duration is not None and duration > settings.MAX_VIDEO_DURATION:
+        video_resume.video.delete(save=False)
+        video_resume.delete()
+        Profile.objects.filter(user_id=video_resume.user_id).update(VideoResume_completed=False)
+        invalidate_onboarding(video_resume.user_id)
+        if video_resume.user.email:
+            send_mail_task.delay(
+                subject='Your video resume was removed',
+                message=(
+                    f"Your video resume is longer than the maximum of {settings.MAX_VIDEO_DURATION} seconds "
+                    "and has been removed. Please upload a shorter video to complete your profile."
+                ),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                recipient_list=[video_resume.user.email],
+            )
@@ -0,0 +1,123 @@
+"""In-process cache of the Category -> Position -> Skill taxonomy.
+
+The whole tree (with the SOC codes of the positions) is loaded in five
+queries into tuples keyed by parent id, so the dropdown endpoints answer
+without touching the database. The bundle of a category, every position
+with its skills and SOC codes, is serialised to JSON once per version.
+
+Every change to a category, position, skill or SOC code (see
+`employee.signals`) stamps a new version in the shared cache; processes
+reload their copy when they see it, see `common.utils.versions`.
+
+The version also serves as the ETag of the dropdown responses, so browsers
+revalidate them with `If-None-Match` and get a 304 while nothing changed.
+"""
+
+import json
+
+from common.utils.versions import VersionedValue, get_version
+from employee.models import Category, Position, Skill
+from employer.models import SocCode
+
+TAXONOMY_VERSION_KEY = 'employee:taxonomy_version'
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Taxonomy:
+    def __init__(self, version):
+        self.version = version
+        self.categories = tuple(Category.objects.order_by('id').values_list('id', 'category'))
+
+        positions = {}
+        for pk, name, category_id in Position.objects.order_by('id').values_list('id', 'position', 'category_id'):
+            positions.setdefault(category_id, []).append((pk, name))
+        self.positions_by_category = {key: tuple(value) for key, value in positions.items()}
+
+        skill_names = dict(Skill.objects.values_list('id', 'skill'))
+        skills = {}
+        for position_id, skill_id in Skill.position.through.objects.order_by('skill_id').values_list(
+                'position_id', 'skill_id'):
+            skills.setdefault(position_id, []).append((skill_id, skill_names[skill_id]))
+        self.skills_by_position = {key: tuple(value) for key, value in skills.items()}
+
+        soc_codes = {}
+        for position_id, soc_code in SocCode.objects.order_by('id').values_list('position_id', 'soc_code'):
+            soc_codes.setdefault(position_id, []).append(soc_code)
+        self.soc_codes_by_position = {key: tuple(value) for key, value in soc_codes.items()}
+        self.bundles = {}
+
+    @property
+    def etag(self):
+        return f'"taxonomy-{self.version}"'
+
+    def positions(self, category_id):
+        """Positions of `category_id` as the dropdown endpoints return them."""
+        return [{'id': pk, 'position': name}
+                for pk, name in self.positions_by_category.get(_to_int(category_id), ())]
+
+    def skills(self, position_id):
+        return [{'id': pk, 'skill': name}
+                for pk, name in self.skills_by_position.get(_to_int(position_id), ())]
+
+    def position_ids(self, category_ids):
+        """Ids of the positions of any of `category_ids`."""
+        return sorted({pk for category_id in category_ids
+                       for pk, name in self.positions_by_category.get(category_id, ())})
+
+    def skill_ids(self, position_ids):
+        """Ids of the skills of any of `position_ids`."""
+        return sorted({pk for position_id in position_ids
+                       for pk, name in self.skills_by_position.get(position_id, ())})
+
+    def category_bundle(self, category_id):
+        """JSON document of a category with all its positions, their skills
+        and SOC codes; None for an unknown category.
+        """
+        category_id = _to_int(category_id)
+        if category_id not in self.bundles:
+            name = dict(self.categories).get(category_id)
+            if name is None:
+                return None
+            self.bundles[category_id] = json.dumps({
+                'category': {'id': category_id, 'category': name},
+                'positions': [
+                    {
+                        'id': pk,
+                        'position': position,
+                        'soc_codes': list(self.soc_codes_by_position.get(pk, ())),
+                        'skills': self.skills(pk),
+                    }
+                    for pk, position in self.positions_by_category.get(category_id, ())
+                ],
+            }, separators=(',', ':')).encode()
+        return self.bundles[category_id]
+
+
+_taxonomy = VersionedValue(TAXONOMY_VERSION_KEY, Taxonomy)
+
+
+def taxonomy_version():
+    return get_version(TAXONOMY_VERSION_KEY)
+
+
+def bump_taxonomy_version():
+    """Make every process reload the taxonomy."""
+    _taxonomy.invalidate()
+
+
+def get_taxonomy():
+    """Return the process-wide taxonomy, reloading it when its version moved."""
+    return _taxonomy.get()
+
+
+def taxonomy_etag(request, *args, **kwargs):
+    """ETag of the dropdown endpoints; autocomplete queries (`?q=`) have none."""
+    if request.GET.get('q'):
+        return None
+    return get_taxonomy().etag
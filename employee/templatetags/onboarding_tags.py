@@ -0,0 +1,23 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from employee.onboarding import STEP_FORMS, render_step_form
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def onboarding_form(context, name):
+    """Render the wizard form `name` if it belongs to the active step.
+
+    Forms of other steps are left as a placeholder that the wizard page
+    loads when its modal opens.
+    """
+    if STEP_FORMS[name][2] == context.get('active_step'):
+        return mark_safe(render_step_form(name))
+    return format_html(
+        '<div data-onboarding-form="{}"><div class="spinner-border spinner-border-sm text-secondary" role="status"></div></div>',
+        reverse('employee:onboarding-form', args=[name]),
+    )
@@ -1,3 +1,222 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from employee.models import Background_Check, Category, EmployeePreferences, Position, Profile, Skill
+from employee.onboarding import STEP_FORMS, invalidate_onboarding
+from employee.taxonomy import bump_taxonomy_version, get_taxonomy
+from employer.models import SocCode
+
+User = get_user_model()
+
+
+class TaxonomyData(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tech = Category.objects.create(category='Tech')
+        cls.developer = Position.objects.create(
+            position='Developer', category=cls.tech, skill_test_link='https://example.com/developer')
+        cls.tester = Position.objects.create(
+            position='Tester', category=cls.tech, skill_test_link='https://example.com/tester')
+        cls.python = Skill.objects.create(skill='Python')
+        cls.python.position.set([cls.developer, cls.tester])
+        cls.selenium = Skill.objects.create(skill='Selenium')
+        cls.selenium.position.set([cls.tester])
+
+    def setUp(self):
+        # Rows of earlier tests are rolled back without a signal.
+        bump_taxonomy_version()
+
+
+class TaxonomyTests(TaxonomyData):
+    def test_ids_of_several_parents(self):
+        taxonomy = get_taxonomy()
+        self.assertEqual(taxonomy.position_ids([self.tech.pk, self.tech.pk]), [self.developer.pk, self.tester.pk])
+        self.assertEqual(taxonomy.skill_ids([self.tester.pk, self.developer.pk]), [self.python.pk, self.selenium.pk])
+        self.assertEqual(taxonomy.skill_ids([]), [])
+
+    def test_preference_lookups_follow_the_taxonomy(self):
+        user = User.objects.create_user('candidate', 'candidate@example.com')
+        preference = EmployeePreferences.objects.create(
+            user=user, category=self.tech, minimum_salary=Decimal('60000'), salary_type='annual',
+            job_type='Permanent', can_relocation='Yes', years_of_experience=3,
+        )
+        preference.desired_positions.set([self.developer])
+        self.assertEqual(list(preference.get_skills()), [self.python])
+
+        rust = Skill.objects.create(skill='Rust')
+        rust.position.add(self.developer)
+        self.assertEqual(set(preference.get_skills()), {self.python, rust})
+        self.assertEqual(set(preference.get_positions()), {self.developer, self.tester})
+
+
+TAXONOMY_CSV = """Category,Position,Skill test link,SOC code,Skill
+Tech,Developer,https://example.com/developer,15-1252,Python; SQL
+Tech,Developer,,15-1253,Git
+Tech,Analyst,https://example.com/analyst,,SQL
+Food,Cook,,35-2014,
+"""
+
+
+class ImportTaxonomyTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'taxonomy.csv')
+
+    def import_csv(self, content, *args):
+        with open(self.path, 'w', newline='') as f:
+            f.write(content)
+        out = StringIO()
+        call_command('import_taxonomy', self.path, *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def snapshot(self):
+        return (
+            sorted(Category.objects.values_list('category', flat=True)),
+            sorted(Position.objects.values_list('category__category', 'position', 'skill_test_link', 'slug')),
+            sorted(Skill.objects.values_list('skill', flat=True)),
+            sorted(Skill.position.through.objects.values_list('position__position', 'skill__skill')),
+            sorted(SocCode.objects.values_list('position__position', 'soc_code')),
+        )
+
+    def test_creates_the_taxonomy(self):
+        self.import_csv(TAXONOMY_CSV)
+        categories, positions, skills, links, soc_codes = self.snapshot()
+        self.assertEqual(categories, ['Food', 'Tech'])
+        self.assertEqual([position[:3] for position in positions], [
+            ('Food', 'Cook', ''),
+            ('Tech', 'Analyst', 'https://example.com/analyst'),
+            ('Tech', 'Developer', 'https://example.com/developer'),
+        ])
+        self.assertEqual(len({position[3] for position in positions}), 3)
+        self.assertEqual(skills, ['Git', 'Python', 'SQL'])
+        self.assertEqual(links, [
+            ('Analyst', 'SQL'), ('Developer', 'Git'), ('Developer', 'Python'), ('Developer', 'SQL'),
+        ])
+        self.assertEqual(soc_codes, [('Cook', '35-2014'), ('Developer', '15-1252'), ('Developer', '15-1253')])
+
+    def test_reimport_without_changes_writes_nothing(self):
+        self.import_csv(TAXONOMY_CSV)
+        before = self.snapshot()
+        with CaptureQueriesContext(connection) as queries:
+            self.import_csv(TAXONOMY_CSV)
+        writes = [query['sql'] for query in queries
+                  if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        self.assertEqual(writes, [])
+        self.assertEqual(self.snapshot(), before)
+
+    def test_updates_the_skill_test_link(self):
+        self.import_csv(TAXONOMY_CSV)
+        output = self.import_csv('category,position,skill_test_link\nTech,Developer,https://example.com/new\n')
+        self.assertIn('1 positions updated', output)
+        self.assertEqual(Position.objects.get(position='Developer').skill_test_link, 'https://example.com/new')
+        # An empty cell keeps the link.
+        self.import_csv('category,position,skill_test_link\nTech,Developer,\n')
+        self.assertEqual(Position.objects.get(position='Developer').skill_test_link, 'https://example.com/new')
+
+    def test_names_match_ignoring_case_and_spacing(self):
+        self.import_csv(TAXONOMY_CSV)
+        before = self.snapshot()
+        self.import_csv('category,position,skill\n  TECH ,developer,"  python ;sql  "\nfood,  COOK  ,\n')
+        self.assertEqual(self.snapshot(), before)
+
+    def test_dry_run_saves_nothing(self):
+        output = self.import_csv(TAXONOMY_CSV, '--dry-run')
+        self.assertIn('Would apply 2 categories created, 3 positions created', output)
+        self.assertEqual(self.snapshot(), ([], [], [], [], []))
+
+
+class OnboardingProgressTests(TestCase):
+    url = reverse('employee:profile_building_progress')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('candidate', 'candidate@example.com', user_type='employee')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def progress(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f"{response.context['progress_percentage']} %")
+        return response.context['progress_percentage']
+
+    def test_saving_the_profile_updates_the_progress(self):
+        self.assertEqual(self.progress(), 7)
+        profile = Profile.objects.get(user=self.user)
+        profile.companyPolices_completed = True
+        profile.save()
+        self.assertEqual(self.progress(), 14)
+
+    def test_update_needs_an_explicit_invalidation(self):
+        self.assertEqual(self.progress(), 7)
+        Profile.objects.filter(user=self.user).update(companyPolices_completed=True)
+        self.assertEqual(self.progress(), 7)
+        invalidate_onboarding(self.user.pk)
+        self.assertEqual(self.progress(), 14)
+
+
+class ProfilePreviewTests(TestCase):
+    url = reverse('employee:profile_preview')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('candidate', 'candidate@example.com', user_type='employee')
+        cls.background_check = Background_Check.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_cached_preview_is_replaced_after_a_change(self):
+        self.assertContains(self.client.get(self.url), '>pending<')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertContains(self.client.get(self.url), '>pending<')
+        self.assertFalse([query for query in queries if 'background_check' in query['sql']])
+
+        self.background_check.states = 'approved'
+        self.background_check.save()
+        self.assertContains(self.client.get(self.url), '>approved<')
+
+
+class OnboardingFormTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('candidate', 'candidate@example.com', user_type='employee')
+        Profile.objects.filter(user=cls.user).update(companyPolices_completed=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def placeholder(self, name):
+        return f'data-onboarding-form="{reverse("employee:onboarding-form", args=[name])}"'
+
+    def field(self, name):
+        return f'name="{next(iter(STEP_FORMS[name][0].base_fields))}"'
+
+    def test_only_the_forms_of_the_active_step_are_rendered(self):
+        response = self.client.get(reverse('employee:profile_building_progress'))
+        self.assertEqual(response.context['active_step'], 'basic_information_completed')
+        self.assertNotContains(response, self.placeholder('basic_information'))
+        self.assertContains(response, self.field('basic_information'))
+        self.assertContains(response, self.placeholder('personal'))
+        self.assertNotContains(response, self.field('personal'))
 
-# Create your tests here.
+    def test_forms_of_other_steps_are_loaded_on_demand(self):
+        response = self.client.get(reverse('employee:onboarding-form', args=['personal']))
+        self.assertContains(response, self.field('personal'))
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('employee:onboarding-form', args=['unknown'])).status_code, 404)
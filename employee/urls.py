@@ -6,6 +6,8 @@ from .views import (
     #RidePreference
    
     Get_school_names,
+    AutocompleteView,
+    CategoryTaxonomyView,
     RidePreferenceCreateView,
     RidePreferenceDetailView,
     RidePreferenceListView,
@@ -26,6 +28,7 @@ from .views import (
     DashboardInformation,
     ProfilePreview,
     ProfileBuildingProgress,
+    OnboardingFormView,
     
     #--BasicInformation----
     BasicInformationListView,
@@ -134,6 +137,7 @@ urlpatterns = [
     path('dashboardInformation/employee', DashboardInformation.as_view(), name='dashboard_information_employee'),
     path('profilePreview/', ProfilePreview.as_view(), name='profile_preview'),
     path('profileBuildingProgress/', ProfileBuildingProgress.as_view(), name='profile_building_progress'),
+    path('profileBuildingProgress/forms/<str:name>/', OnboardingFormView.as_view(), name='onboarding-form'),
     
     #skip Military
     path('skipMilitary/', SkipMilitaryView.as_view(), name='skip_military'),
@@ -142,6 +146,8 @@ urlpatterns = [
     #Positions
     path('positions/', PositionsView.as_view(), name='positions'),
     path('skills/', SkillsView.as_view(), name='skills'),
+    path('autocomplete/<str:kind>/', AutocompleteView.as_view(), name='autocomplete'),
+    path('taxonomy/<int:category_id>/', CategoryTaxonomyView.as_view(), name='category-taxonomy'),
     path('testComingSoon/', SkillsTestComingSoon.as_view(), name='testComingSoon'),
     #-----policies-----------
     path('policies/list/', PolicyListView.as_view(), name='policies_list'),
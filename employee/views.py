@@ -1,19 +1,29 @@
 from typing import Any
+from django.db import transaction
 from django.db.models import Q
-from django.http import HttpRequest, HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse_lazy, reverse
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django import forms
 from django.shortcuts import get_object_or_404, render, redirect
-from common.utils.text import unique_slug
 from employee.templatetags.mask_ssn import mask_ssn
 from django.views import View
 import logging
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from recommendedByAI.models import AppliedJobHistory, RecommendedJobs
+from recommendedByAI.tasks import refresh_recommended_jobs
+from employee.tasks import check_video_resume_duration
+from employee.autocomplete import BUILDERS, autocomplete
+from employee.onboarding import (
+    STEP_FORM_TIMEOUT, STEP_FORMS, get_onboarding, invalidate_onboarding, render_step_form,
+)
+from employee.taxonomy import get_taxonomy, taxonomy_etag
+from users.roles import has_role
+from django.utils.decorators import method_decorator
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.http import condition
+from django.utils.cache import patch_cache_control
 from django.views.generic.edit import CreateView
 from employer.models import JobRequisition, SocCode
 from django.core.paginator import Paginator
@@ -58,10 +68,10 @@ class DashboardInformation(LoginRequiredMixin, View):
     template_name = 'employee/dashboardInfo.html'
 
     def get(self, request):
-        # Get the user's profile
-        profiles = Profile.objects.filter(user=request.user).first()
+        # The flags of the user's profile, from the cached snapshot
+        onboarding = get_onboarding(request.user.id)
         context = {
-            'paymentPref': profiles,
+            'paymentPref': onboarding.profile if onboarding is not None else None,
         }
         return render(request, self.template_name, context)
     
@@ -69,13 +79,15 @@ class ProfilePreview(LoginRequiredMixin, View):
     template_name = 'employee/profile_preview.html'
     
     def get(self, request):
-        # Get the user's profile
-        profiles = Profile.objects.filter(user=request.user).first()
-        video_introduction = VideoResume.objects.filter(user=request.user).first()
+        # Only queried when the cached preview fragment is missing, see
+        # profile_preview.html.
+        user = request.user
+        profiles = SimpleLazyObject(lambda: Profile.objects.filter(user=user).first())
+        video_introduction = SimpleLazyObject(lambda: VideoResume.objects.filter(user=user).first())
         # Background_Check states
-        background= Background_Check.objects.filter(user=request.user).first()
+        background = SimpleLazyObject(lambda: Background_Check.objects.filter(user=user).first())
         # SkillSetTestResult result
-        skillSetTestResult= SkillSetTestResult.objects.filter(user=request.user).first()
+        skillSetTestResult = SimpleLazyObject(lambda: SkillSetTestResult.objects.filter(user=user).first())
         # EmployeePreferences desired_positions, skills
         # Experience job_title,
         # CertificationLicense
@@ -98,104 +110,35 @@ class ProfilePreview(LoginRequiredMixin, View):
 class ProfileBuildingProgress(LoginRequiredMixin, View):
     template_name = 'employee/profileBuildingProgress.html'
     
-    def get_progress_percentage(self, profile):
-        total_steps = 14  # Total number of steps in the profile
-        completed_steps = sum(
-            [
-                profile.account_created,
-                profile.companyPolices_completed,
-                profile.basic_information_completed,
-                profile.personal_information_completed,
-                profile.Military_completed,
-                profile.Education_completed,
-                profile.Experience_completed,
-                profile.Preferences_completed,
-                profile.SkillSetTest_completed,
-                profile.Safety_Video_and_Test_completed,
-                profile.VideoResume_completed,
-                profile.Background_Check_completed,
-                profile.Treat_Box_completed,
-                profile.Select_Ride_completed,
-            ]
-        )
-        progress_percentage = (completed_steps / total_steps) * 100
-        return int(progress_percentage)
-    
     def get(self, request):
-        
-        #progress_percentage = 50.0  # Replace this with the actual progress_percentage value you want to display
-        policies = Policies.objects.all()
-        accepted_policies = UserAcceptedPolicies.objects.filter(user=request.user)
-        accepted_policies_ids = [policy.policies_id for policy in accepted_policies]
-        total_policies_count = policies.count()
-        accepted_policies_count = len(accepted_policies_ids)
-        all_policies_accepted = accepted_policies_count == total_policies_count
-        basic_information_form = BasicInformationForm()
-        personal_form = PersonalForm()
-        military_form = MilitaryForm()
-        education_form = EducationForm()
-        experienceForm_form = ExperienceForm()
-        CertificationLicense_form = CertificationLicenseForm()
-        # Retrieve all Certification License objects related to the user's Education
-        certification_licenses = CertificationLicense.objects.filter(education__user=request.user)
-        employee_preferences_form = EmployeePreferencesForm()
-        safetyVideo_form = SafetyTestResultForm()
-        videoResume_form = VideoResumeForm()
-        BackgroundCheck_form= BackgroundCheckForm()
-        BankAccount_form = BankAccountForm()
-        Card_form =CardForm()
-        EWallet_form= EWalletForm()
-        CheckByEmail_form=CheckByEmailForm()
-        RidePreference_form = RidePreferenceForm()
-        progress = Profile.objects.filter(user=request.user)
-        profile = get_object_or_404(Profile, user=request.user)
-        profiles = Profile.objects.filter(user=request.user).first()
-        progress_percentage = self.get_progress_percentage(profile)
-        categories = Category.objects.all()
-        positions = Position.objects.all()
-        skills = Skill.objects.all()
-        safetyVideo = Safety_Video_and_Test.objects.all()
-        testList = SkillSetTestResult.objects.filter(user=self.request.user)
-        education = Education.objects.filter(Q(user=self.request.user) & Q(documentation=True)).distinct().first()
+        onboarding = get_onboarding(request.user.id)
+        if onboarding is None:
+            raise Http404('No Profile matches the given query.')
+        taxonomy = get_taxonomy()
 
         # Filter positions based on the logged-in user's preferences
-        employee_preferences = EmployeePreferences.objects.filter(user=self.request.user).first()
-        if employee_preferences:
-            user_positions = Position.objects.filter(category=employee_preferences.category)
+        if onboarding.preference_category_id is not None:
+            user_positions = taxonomy.positions(onboarding.preference_category_id)
         else: 
             user_positions = []
         context = {
-            'basic_information_form': basic_information_form,
-            'personal_form': personal_form,
-            'military_form':military_form,
-            'education_form': education_form,
-            'CertificationLicense_form':CertificationLicense_form,
-            'experienceForm_form':experienceForm_form,
-            'employee_preferences_form':employee_preferences_form,
-            'safetyVideo_form':safetyVideo_form,
-            'progress':progress,
-            'paymentPref': profiles,
-            'progress_percentage': progress_percentage,
-            'policies': policies,
-            'accepted_policies_ids': accepted_policies_ids,
-            'all_policies_accepted': all_policies_accepted,
-            'educations':education,
-            'certification_licenses':certification_licenses,
+            # Only the forms of this step are rendered, see onboarding_tags.
+            'active_step': onboarding.active_step,
+            'progress': [onboarding.profile],
+            'paymentPref': onboarding.profile,
+            'progress_percentage': onboarding.progress_percentage,
+            'policies': onboarding.policies,
+            'accepted_policies_ids': onboarding.accepted_policy_ids,
+            'all_policies_accepted': onboarding.all_policies_accepted,
+            'documented_education': onboarding.has_documented_education,
+            'certification_licenses': onboarding.certifications,
             'documents_uploaded': True,  # Set the flag to True if there are uploaded documents
-            'categories': categories,
-            'positions': positions,
-            'skills': skills,
+            'categories': taxonomy.categories,
+            'positions': taxonomy.positions_by_category,
+            'skills': taxonomy.skills_by_position,
             'user_positions':user_positions,
-            'testList':testList,
-            'safetyVideo':safetyVideo,
-            'videoResume_form' :videoResume_form,
-            'BackgroundCheck_form':BackgroundCheck_form,
-            'BankAccount_form':BankAccount_form,
-            'Card_form':Card_form,
-            'EWallet_form':EWallet_form,
-            'CheckByEmail_form':CheckByEmail_form,
-            'RidePreference_form':RidePreference_form,
-            
+            'testList': onboarding.tests,
+            'safetyVideo': onboarding.safety_videos,
         }
            
         return render(request, self.template_name, context)
@@ -213,6 +156,8 @@ class ProfileBuildingProgress(LoginRequiredMixin, View):
                     accepted_policies.append(UserAcceptedPolicies(user=request.user, policies=policy, accepted=True))
 
             UserAcceptedPolicies.objects.bulk_create(accepted_policies)
+            # bulk_create sends no post_save, so the snapshot is dropped here.
+            invalidate_onboarding(request.user.id)
         
             # Retrieve the user's profile
             
@@ -371,6 +316,7 @@ class ProfileBuildingProgress(LoginRequiredMixin, View):
                     employee_preferences.skills.clear()
                     employee_preferences.desired_positions.set(desired_positions)
                     employee_preferences.skills.set(skills)
+                    refresh_recommended_jobs.delay(employee_preferences.pk)
                     
                     profile.Preferences_completed = True
                     profile.save()
@@ -399,6 +345,8 @@ class ProfileBuildingProgress(LoginRequiredMixin, View):
                 VideoResume = VideoResumeSubmited_form.save(commit=False)
                 VideoResume.user = request.user
                 VideoResume.save()
+                if VideoResumeSubmited_form.needs_duration_check:
+                    transaction.on_commit(lambda: check_video_resume_duration.delay(VideoResume.pk))
                 # Update the profile building process states
                 profile.VideoResume_completed = True
                 profile.save()
@@ -505,41 +453,19 @@ class ProfileBuildingProgress(LoginRequiredMixin, View):
                
         else:
             pass   
-        # If neither form was submitted or form validation failed, render the template again with the forms
-        basic_information_form = BasicInformationForm()
-        personal_form = PersonalForm()
-        military_form = MilitaryForm()
-        education_form = EducationForm()
-        CertificationLicense_form = CertificationLicenseForm()
-        experienceForm_form = ExperienceForm()
-        employee_preferences_form = EmployeePreferencesForm()
-        safetyVideo_form = SafetyTestResultForm()
-        videoResume_form = VideoResumeForm()
-        BackgroundCheck_form= BackgroundCheckForm()
-        BankAccount_form = BankAccountForm()
-        Card_form =CardForm()
-        EWallet_form= EWalletForm()
-        CheckByEmail_form=CheckByEmailForm()
-        RidePreference_form = RidePreferenceForm()
-        context = {
-            'basic_information_form': basic_information_form,
-            'personal_form': personal_form,
-            'military_form':military_form,
-            'education_form':education_form,
-            'CertificationLicense_form':CertificationLicense_form,
-            'experienceForm_form':experienceForm_form,
-            'employee_preferences_form': employee_preferences_form,
-            'safetyVideo_form':safetyVideo_form,
-            'videoResume_form':videoResume_form,
-            'BackgroundCheck_form':BackgroundCheck_form,
-            'BankAccount_form':BankAccount_form,
-            'Card_form':Card_form,
-            'EWallet_form':EWallet_form,
-            'CheckByEmail_form':CheckByEmail_form,
-            'RidePreference_form':RidePreference_form,
-        }
-        return render(request, self.template_name, context)
+        # If neither form was submitted or form validation failed, render the wizard again
+        return self.get(request)
     
+class OnboardingFormView(LoginRequiredMixin, View):
+    """HTML of a wizard form, loaded when the modal of its step opens."""
+
+    def get(self, request, name):
+        if name not in STEP_FORMS:
+            raise Http404('Unknown form.')
+        response = HttpResponse(render_step_form(name))
+        patch_cache_control(response, private=True, max_age=STEP_FORM_TIMEOUT)
+        return response
+
 #skip military 
 class SkipMilitaryView(LoginRequiredMixin, View):
     def post(self, request):
@@ -602,20 +528,46 @@ class GenerateSkillTestView(View):
         return redirect('employee:profile_building_progress')
 
 #Positions View and Dynamic dropdown views
+class AutocompleteView(View):
+    """Type-ahead over a taxonomy: `?q=` and optional `?parent=` and `?limit=`."""
+    def get(self, request, kind):
+        if kind not in BUILDERS:
+            return JsonResponse({'error': f"Unknown list '{kind}'."}, status=404)
+        results = autocomplete(kind, request.GET.get('q', ''), parent=request.GET.get('parent'),
+                               limit=request.GET.get('limit'))
+        return JsonResponse({'results': results})
+
+@method_decorator(condition(etag_func=taxonomy_etag), name='get')
 class PositionsView(View):
     def get(self, request):
         category_id = request.GET.get('category_id')
-        positions = Position.objects.filter(category_id=category_id).values('id', 'position')
-        return JsonResponse({'positions': list(positions)})
+        if request.GET.get('q'):
+            return JsonResponse({'positions': autocomplete(
+                'positions', request.GET['q'], parent=category_id, limit=request.GET.get('limit'))})
+        return JsonResponse({'positions': get_taxonomy().positions(category_id)})
     
 #Skills View
+@method_decorator(condition(etag_func=taxonomy_etag), name='get')
 class SkillsView(View):
     def get(self, request):
         position_id = request.GET.get('position_id')
-        skills = Skill.objects.filter(position__id=position_id)
-        skills_data = [{'id': skill.id, 'skill': skill.skill} for skill in skills]
-      
-        return JsonResponse({'skills': skills_data})
+        if request.GET.get('q'):
+            return JsonResponse({'skills': autocomplete(
+                'skills', request.GET['q'], parent=position_id, limit=request.GET.get('limit'))})
+        return JsonResponse({'skills': get_taxonomy().skills(position_id)})
+
+@method_decorator(condition(etag_func=taxonomy_etag), name='get')
+class CategoryTaxonomyView(View):
+    """Positions of a category with their skills and SOC codes, in one document
+    the cascading dropdowns use without further requests.
+    """
+    def get(self, request, category_id):
+        bundle = get_taxonomy().category_bundle(category_id)
+        if bundle is None:
+            raise Http404("Category not found.")
+        response = HttpResponse(bundle, content_type='application/json')
+        patch_cache_control(response, public=True, max_age=300)
+        return response
 
 #testComingSoon
 class SkillsTestComingSoon(TemplateView):
@@ -653,6 +605,7 @@ class PolicyListView(LoginRequiredMixin, View):
                 accepted_policies.append(UserAcceptedPolicies(user=request.user, policies=policy, accepted=True))
 
         UserAcceptedPolicies.objects.bulk_create(accepted_policies)
+        invalidate_onboarding(request.user.id)
         
         # Retrieve the user's profile
         
@@ -730,7 +683,7 @@ class PoliciesDetailView(DetailView):
     
 class PoliciesAdminRequiredMixin(UserPassesTestMixin):
     def test_func(self):
-        return self.request.user.groups.filter(name='admin').exists()
+        return has_role(self.request.user, 'admin')
 
 class PoliciesCreateView(PoliciesAdminRequiredMixin, CreateView):
     model = Policies
@@ -992,6 +945,9 @@ class MilitaryDeleteView(LoginRequiredMixin, DeleteView):
 class Get_school_names(View):
     def get(self, request):
         type_of_school_id = request.GET.get('type_of_school_id')
+        if request.GET.get('q'):
+            return JsonResponse({'school_names': autocomplete(
+                'school_names', request.GET['q'], parent=type_of_school_id, limit=request.GET.get('limit'))})
         school_names = SchoolName.objects.filter(type_of_school_id=type_of_school_id).values('id', 'name')
         return JsonResponse({'school_names': list(school_names)})
 
@@ -1321,42 +1277,8 @@ class EmployeePreferencesCreateView(LoginRequiredMixin, CreateView):
         return response
     
     def generate_recommended_jobs(self):
-        positions = self.object.get_positions()
-        skills = self.object.get_skills()
-
-        # Get relevant job requisitions based on positions and skills
-        relevant_jobs = JobRequisition.objects.filter(
-            job_title__in=positions,
-            required_skills__in=skills
-        ).distinct()
-
-        # Save the relevant jobs to RecommendedJobs
-        for job in relevant_jobs:
-            RecommendedJobs.objects.create(
-                employee_preferences=self.object,
-                job_requisition=job
-            )
-
-# Signal for generating recommended jobs
-@receiver(post_save, sender=EmployeePreferences)
-def generate_recommended_jobs(sender, instance, created, **kwargs):
-    if created:
-        positions = instance.get_positions()
-        skills = instance.get_skills()
-
-        # Get relevant job requisitions based on positions and skills
-        relevant_jobs = JobRequisition.objects.filter(
-            job_title__in=positions,
-            required_skills__in=skills
-        ).distinct()
-
-        # Save the relevant jobs to RecommendedJobs
-        for job in relevant_jobs:
-            RecommendedJobs.objects.create(
-                employee_preferences=instance,
-                job_requisition=job
-            )
-
+        # Scoring against all open jobs runs on the task worker, off the request thread
+        refresh_recommended_jobs.delay(self.object.pk)
 
 class EmployeePreferencesUpdateView(LoginRequiredMixin, UpdateView):
     model = EmployeePreferences
@@ -1386,6 +1308,7 @@ class EmployeePreferencesUpdateView(LoginRequiredMixin, UpdateView):
                 employee_preferences.skills.clear()
                 employee_preferences.desired_positions.set(desired_positions)
                 employee_preferences.skills.set(skills)
+                refresh_recommended_jobs.delay(employee_preferences.pk)
                 
                 return redirect('employee:employee-preferences-list')
 
@@ -1542,7 +1465,10 @@ class VideoResumeCreateView(LoginRequiredMixin,CreateView):
     
     def form_valid(self, form):
         form.instance.user = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if form.needs_duration_check:
+            transaction.on_commit(lambda: check_video_resume_duration.delay(self.object.pk))
+        return response
     
     def dispatch(self, request, *args, **kwargs):
         try:
@@ -1563,6 +1489,12 @@ class VideoResumeUpdateView(LoginRequiredMixin, UpdateView):
     form_class = VideoResumeForm
     template_name = 'employee/videoResume/video_resume_update.html'
     success_url = reverse_lazy('employee:video_resume_list')
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if form.needs_duration_check:
+            transaction.on_commit(lambda: check_video_resume_duration.delay(self.object.pk))
+        return response
    
 class VideoResumeDeleteView(LoginRequiredMixin, DeleteView):
     model = VideoResume
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from common.utils.text import unique_slug
+from common.utils.text import save_with_unique_slug
 from .models import CompanyProfile, EmployerAcceptedPolicies, EmployerPoliciesAndTerms, HiredEmployeeList, JobRequisition, ProfileBuildingController, SocCode
 
 from django.contrib import admin
@@ -22,9 +22,8 @@ class ProfileBuildingControllerAdmin(admin.ModelAdmin):
     
 
     def save_model(self, request, obj, form, change):
-        if not obj.slug:
-            obj.slug = unique_slug(f"{obj.user.username}", ProfileBuildingController)
-        super().save_model(request, obj, form, change)
+        save_with_unique_slug(obj, f"{obj.user.username}",
+                              lambda: super(ProfileBuildingControllerAdmin, self).save_model(request, obj, form, change))
 
 
 
@@ -50,9 +49,8 @@ class CompanyProfileAdmin(admin.ModelAdmin):
     )
 
     def save_model(self, request, obj, form, change):
-        if not obj.slug:
-            obj.slug = unique_slug(f"{obj.company_name} {obj.user.username}", CompanyProfile)
-        super().save_model(request, obj, form, change)
+        save_with_unique_slug(obj, f"{obj.company_name} {obj.user.username}",
+                              lambda: super(CompanyProfileAdmin, self).save_model(request, obj, form, change))
 
 
 @admin.register(EmployerPoliciesAndTerms)
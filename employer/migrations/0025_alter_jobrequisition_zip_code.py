@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employer', '0024_hiredemployeelist'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobrequisition',
+            name='zip_code',
+            field=models.CharField(db_index=True, max_length=10),
+        ),
+    ]
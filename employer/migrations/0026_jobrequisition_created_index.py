@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employer', '0025_alter_jobrequisition_zip_code'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobrequisition',
+            index=models.Index(fields=['created', 'id'], name='employer_job_created_id'),
+        ),
+    ]
@@ -2,7 +2,7 @@ from audioop import reverse
 from datetime import timezone
 import random
 from django.db import models
-from django.core.cache import cache
+from django.db.models import Min
 from django.utils.timezone import datetime
 from django.conf import settings
 from common.utils.chooseConstant import (
@@ -10,13 +10,13 @@ from common.utils.chooseConstant import (
     JOB_TYPES, RELOCATION, SALARY_TYPES, 
     WORK_ARRANGEMENT_CHOICES
 )
-from common.utils.text import unique_slug
+from common.models import SlugModel
 from localflavor.us.models import USStateField
 
-from employee.models import Category, Position, Skill 
+from employee.models import Category, Position, Skill
 
 # Create your models here.
-class ProfileBuildingController(models.Model):
+class ProfileBuildingController(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     is_account_created = models.BooleanField(default=True)
     is_company_profile_created = models.BooleanField(default=False)
@@ -29,17 +29,14 @@ class ProfileBuildingController(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.user.username}"
 
     def __str__(self):
         return f"{self.user.username} Profile Building Controller"
     
 
-class CompanyProfile(models.Model):
+class CompanyProfile(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     company_name = models.CharField(max_length=100)
     logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
@@ -70,15 +67,23 @@ class CompanyProfile(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.company_name} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.company_name} {self.user.username}"
 
     def __str__(self):
         return self.company_name
 
+    @classmethod
+    def first_profiles(cls, user_ids):
+        """{user_id: CompanyProfile} of the first profile of each employer, in one query.
+
+        An employer's jobs are listed, exported and searched under this
+        profile, like `CompanyProfile.objects.filter(user=...).first()`.
+        """
+        first_ids = cls.objects.filter(user_id__in=user_ids).order_by().values('user_id').annotate(
+            first_id=Min('id')).values('first_id')
+        return {profile.user_id: profile for profile in cls.objects.filter(id__in=first_ids)}
+
 #EmployerPolicies
 class EmployerPoliciesAndTerms(models.Model):
     title = models.CharField(max_length=255)
@@ -91,7 +96,7 @@ class EmployerPoliciesAndTerms(models.Model):
         return self.title 
 
 #EmployerAcceptedPolicies  
-class EmployerAcceptedPolicies(models.Model):
+class EmployerAcceptedPolicies(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     policies = models.ForeignKey(EmployerPoliciesAndTerms, on_delete=models.CASCADE)
     accepted = models.BooleanField(default=False)
@@ -101,12 +106,6 @@ class EmployerAcceptedPolicies(models.Model):
 
     def __str__(self):
         return str(f'{self.policies}-{self.accepted}')
-
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = str(self)
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)    
         
 class SocCode(models.Model):
     soc_code = models.CharField(max_length=200)
@@ -115,7 +114,7 @@ class SocCode(models.Model):
     def __str__(self):
         return f'{self.soc_code}'
      
-class JobRequisition(models.Model):
+class JobRequisition(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     industry = models.ForeignKey(Category, on_delete=models.CASCADE)
     job_title= models.ManyToManyField(Position, related_name='jobTitle') 
@@ -135,7 +134,7 @@ class JobRequisition(models.Model):
     relocatable = models.CharField(max_length=10, choices=RELOCATION)
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=2)
-    zip_code = models.CharField(max_length=10)
+    zip_code = models.CharField(max_length=10, db_index=True)
     address1 = models.CharField(max_length=255)
     certifications_required = models.TextField(blank=True)
     star_rating = models.PositiveIntegerField()
@@ -153,14 +152,14 @@ class JobRequisition(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-
-
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.job_type} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
-
-        super().save(*args, **kwargs)  # Save the object
+    class Meta:
+        indexes = [
+            # Keyset pagination of job lists, newest first
+            models.Index(fields=['created', 'id'], name='employer_job_created_id'),
+        ]
+
+    def slug_source(self):
+        return f"{self.job_type} {self.user.username}"
     
     def get_absolute_url(self):
         return reverse('employer:job_requisition_detail', kwargs={'slug': self.slug})
@@ -169,29 +168,13 @@ class JobRequisition(models.Model):
         return f"{self.user.username}-Job Requisition {self.pk}"
     
     
-    @property
-    def job_title_cache_key(self):
-        return f"employer_job_title_{self.industry_id}"
-
-    @property
-    def required_skills_cache_key(self):
-        return f"employer_required_skills_{self.job_title.values_list('id', flat=True)}"
-    
-    
     def get_job_title(self):
-        positions = cache.get(self.job_title_cache_key)
-        if not positions:
-            positions = Position.objects.filter(category=self.industry)
-            cache.set(self.job_title_cache_key, positions)
-        return positions
+        from employee.taxonomy import get_taxonomy
+        return Position.objects.filter(id__in=get_taxonomy().position_ids([self.industry_id]))
 
     def get_skills(self):
-        skills = cache.get(self.required_skills_cache_key)
-        if not skills:
-            skills = Skill.objects.filter(position__in=self.job_title.all())
-            cache.set(self.required_skills_cache_key, skills)
-            print(skills)
-        return skills
+        from employee.taxonomy import get_taxonomy
+        return Skill.objects.filter(id__in=get_taxonomy().skill_ids(position.pk for position in self.job_title.all()))
     
 #generate_employee_id
 def generate_employee_id(username):
@@ -199,7 +182,7 @@ def generate_employee_id(username):
         random_part = str(random.randint(100, 999))
         return f"{username_part}{random_part}"
     
-class HiredEmployeeList(models.Model):
+class HiredEmployeeList(SlugModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     employee_name = models.CharField(max_length=100)
     employee_ID = models.CharField(max_length=6, unique=True)
@@ -209,15 +192,12 @@ class HiredEmployeeList(models.Model):
     updated = models.DateTimeField(auto_now=True)
     
   
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.employee_name} {self.user.username}"
-            self.slug = unique_slug(value, type(self))
+    def slug_source(self):
+        return f"{self.employee_name} {self.user.username}"
 
+    def prepare(self):
         if not self.employee_ID:
             self.employee_ID = generate_employee_id(self.user.username)
-
-        super().save(*args, **kwargs)  # Save the object
     
     def __str__(self):
         return f"employer: {self.user.username}-employee:{self.employee_name}"
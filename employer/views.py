@@ -13,7 +13,12 @@ from django.conf import settings
 import stripe
 import paypalrestsdk
 from common.utils.email import send_email
-from django.core.mail import send_mail
+from common.tasks import send_mail_task
+from common.utils.pagination import CursorPaginationMixin
+from employee.autocomplete import autocomplete
+from employee.taxonomy import get_taxonomy, taxonomy_etag
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 import uuid
 from employee.models import Position, Skill
 from employer.forms import CompanyProfileCreateForm, JobRequisitionForm 
@@ -48,12 +53,11 @@ class BeEmployerRequestView(LoginRequiredMixin, View):
         activation_link = request.build_absolute_uri(reverse('employer:activate_employer')) 
 
         message = f"Click the following link to activate your employer account:\n{activation_link}"
-        send_mail(
+        send_mail_task.delay(
             subject='Activate Your Employer Account',
             message=message,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[request.user.email],
-            fail_silently=False,
         )
         return redirect('employer:vilificationSandMassage')
          
@@ -236,28 +240,35 @@ class EmployerPolicyListView(LoginRequiredMixin, View):
 
 
 #job_title View and Dynamic dropdown views
+@method_decorator(condition(etag_func=taxonomy_etag), name='get')
 class JobTitleView(View):
     def get(self, request):
         industry_id = request.GET.get('industry_Id')
-        #print(industry_id)
-        job_titles = Position.objects.filter(category_id=industry_id).values('id', 'position')
-        #print(list(job_titles))
-        return JsonResponse({'job_titles': list(job_titles)})
+        if request.GET.get('q'):
+            return JsonResponse({'job_titles': autocomplete(
+                'positions', request.GET['q'], parent=industry_id, limit=request.GET.get('limit'))})
+        return JsonResponse({'job_titles': get_taxonomy().positions(industry_id)})
     
 #requiredSkills View
+@method_decorator(condition(etag_func=taxonomy_etag), name='get')
 class RequiredSkillsView(View):
     def get(self, request):
         position_id = request.GET.get('positionId')
-        skills = Skill.objects.filter(position__id=position_id)
-        skills_data = [{'id': skill.id, 'skill': skill.skill} for skill in skills]
-        return JsonResponse({'skills': skills_data})
+        if request.GET.get('q'):
+            return JsonResponse({'skills': autocomplete(
+                'skills', request.GET['q'], parent=position_id, limit=request.GET.get('limit'))})
+        return JsonResponse({'skills': get_taxonomy().skills(position_id)})
     
 
 #JobRequisition
-class JobRequisitionListView(LoginRequiredMixin, ListView):
+class JobRequisitionListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     model = JobRequisition
     template_name = 'employer/jobRequisition/job_requisition_list.html'
     context_object_name = 'job_requisitions'
+    paginate_by = 30
+
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related('job_title')
 
 class JobRequisitionDetailView(LoginRequiredMixin, DetailView):
     model = JobRequisition
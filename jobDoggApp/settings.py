@@ -70,6 +70,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -111,6 +112,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'users.context_processors.roles',
             ],
         },
     },
@@ -131,6 +133,29 @@ DATABASES = {
     }
 }
 
+# Cache Configuration
+# Shared by the web and task worker processes, so cache-based invalidation
+# (e.g. the recommendation engine generations) reaches every process. Redis
+# answers from memory and evicts the least recently used keys by itself
+# (run it with `maxmemory-policy allkeys-lru`). Without REDIS_URL, e.g. on a
+# single-process development server, each process keeps its own cache.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'jobdogg',
+            'OPTIONS': {'MAX_ENTRIES': 20000},
+        }
+    }
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.sendgrid.net'
@@ -194,6 +219,16 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
 ALLOWED_VIDEO_EXTENSIONS = ['.mp4', '.mpg', '.avi', '.mov', '.mkv', '.wmv', '.ogv', '.webm', '.flv']
 MAX_VIDEO_DURATION = 60  # 1 minutes in seconds
 
+# Number of jobs kept per employee preference by the recommendation engine
+RECOMMENDED_JOBS_TOP_K = 50
+
+# Jobs recommended to preferences choosing proximity to home must lie within
+# this many miles of the candidate's ZIP code
+RECOMMENDATION_RADIUS_MILES = 50
+
+# Run background tasks inline instead of queueing them for `manage.py run_worker`
+TASKS_ALWAYS_EAGER = config('TASKS_ALWAYS_EAGER', default=False, cast=bool)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
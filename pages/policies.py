@@ -0,0 +1,27 @@
+"""Last change to the employee and employer policies, as shown on the
+terms page; it versions the cached page and is its Last-Modified date.
+"""
+
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+from employee.models import Policies
+from employer.models import EmployerPoliciesAndTerms
+
+POLICIES_UPDATED_KEY = 'pages:policies_updated'
+
+
+def policies_updated():
+    updated = cache.get(POLICIES_UPDATED_KEY)
+    if updated is None:
+        latest = [model.objects.aggregate(latest=Max('updated'))['latest']
+                  for model in (Policies, EmployerPoliciesAndTerms)]
+        cache.add(POLICIES_UPDATED_KEY, max(filter(None, latest), default=timezone.now()), None)
+        updated = cache.get(POLICIES_UPDATED_KEY)
+    return updated
+
+
+def touch_policies():
+    """Record a change; deletions do not show in the `updated` columns."""
+    cache.set(POLICIES_UPDATED_KEY, timezone.now(), None)
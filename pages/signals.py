@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from employee.models import Policies
+from employer.models import EmployerPoliciesAndTerms
+from pages.policies import touch_policies
+
+
+@receiver(post_save, sender=Policies)
+@receiver(post_delete, sender=Policies)
+@receiver(post_save, sender=EmployerPoliciesAndTerms)
+@receiver(post_delete, sender=EmployerPoliciesAndTerms)
+def invalidate_terms_page(sender, **kwargs):
+    touch_policies()
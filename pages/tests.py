@@ -1,3 +1,62 @@
-from django.test import TestCase
+import hashlib
+import re
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+TOKEN_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]*)"')
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def token(self, response):
+        return TOKEN_RE.search(response.content.decode()).group(1)
+
+    def test_cached_form_gets_a_fresh_token(self):
+        url = reverse('pages:homepage')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+
+        client = Client(enforce_csrf_checks=True)
+        cached = client.get(url)
+        token = self.token(cached)
+        self.assertNotEqual(token, self.token(first))
+        self.assertNotIn(b'__page_cache_csrf_token__', cached.content)
+        self.assertIn('private', cached['Cache-Control'])
+        # The token works with the cookie it came with.
+        response = client.post(url, {'subscribe': '', 'email': 'not an email', 'csrfmiddlewaretoken': token})
+        self.assertEqual(response.status_code, 200)
+
+    def test_matching_etag_is_not_modified(self):
+        url = reverse('pages:about-us')
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_etag_of_a_form_page_follows_the_csrf_cookie(self):
+        url = reverse('pages:homepage')
+        response = self.client.get(url)
+        self.assertIn(settings.CSRF_COOKIE_NAME, self.client.cookies)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        # Without the cookie, the tokens of the page held are useless.
+        self.assertEqual(Client().get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_logged_in_users_never_get_the_cached_page(self):
+        url = reverse('pages:about-us')
+        self.client.get(url)
+        key = f"pages:page::{hashlib.sha1(url.encode()).hexdigest()}"
+        cache.set(key, {**cache.get(key), 'content': b'cached page'})
+        self.assertEqual(self.client.get(url).content, b'cached page')
+
+        self.client.force_login(User.objects.create_user('member', 'member@example.com'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.content, b'cached page')
+        self.assertFalse(response.has_header('ETag'))
@@ -9,9 +9,11 @@ from django.contrib.auth.decorators import login_required
 from django.urls import reverse_lazy
 from .models import Subscriber
 from .forms import SubscribeForm
+from .policies import policies_updated
+from common.utils.pagecache import AnonymousPageCacheMixin
 import logging
 
-class HomePageView(TemplateView):
+class HomePageView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/home.html'
     
     def get(self, request):
@@ -32,36 +34,34 @@ class HomePageView(TemplateView):
         context={ 'form':SubscribeForm() }
         return render(request, self.template_name, context)
 
-class AboutUsView(TemplateView):
+class AboutUsView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/about_us.html'
-
-    def get(self, request, *args, **kwargs):
-        messages.debug(request, 'Debug message.')
-        messages.info(request, 'Info message.')
-        messages.success(request, 'Success message.')
-        messages.warning(request, 'Warning message.')
-        messages.error(request, 'Error message.')
-        return super().get(request, args, kwargs)
     
 class ContactUsView(TemplateView):
     template_name = 'pages/contact_us.html'  
     
-class ExecutiveTeam(TemplateView):
+class ExecutiveTeam(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/executive_team.html'
 
-class HowItWoksForEmployee(TemplateView):
+class HowItWoksForEmployee(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/HowItWoks-ForEmployee.html'
-class HowItWoksForEmployer(TemplateView):
+class HowItWoksForEmployer(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/HowItWoks-ForEmployer.html'   
 
-class EmployeeFAQ(TemplateView):
+class EmployeeFAQ(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/employee_FAQ.html' 
 
-class EmployerFAQ(TemplateView):
+class EmployerFAQ(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/employer_FAQ.html'
     
-class TermsAndPolicy(TemplateView):
+class TermsAndPolicy(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/termsAndPolicy.html'
+
+    def page_version(self):
+        return policies_updated().timestamp()
+
+    def page_last_modified(self):
+        return policies_updated()
    
     def get(self, request):
         policiesEmployee = Policies.objects.all()
@@ -72,19 +72,19 @@ class TermsAndPolicy(TemplateView):
     def post(self, request):
         pass
    
-class BlogView(TemplateView):
+class BlogView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/blog.html'
     
 #OurDoggsView, 
-class OurDoggsView(TemplateView):
+class OurDoggsView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/ourDoggs.html'
     
 #GetStaffView, 
-class GetStaffView(TemplateView):
+class GetStaffView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/getStaff.html'
     
 #GetWorkView
-class GetWorkView(TemplateView):
+class GetWorkView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'pages/getWork.html'
     
 
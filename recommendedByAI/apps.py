@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RecommendedbyaiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recommendedByAI'
+
+    def ready(self):
+        import recommendedByAI.signals  # Import the signals module
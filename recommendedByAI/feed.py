@@ -0,0 +1,151 @@
+"""Cached recommendation feeds of employee preferences.
+
+A feed holds everything the recommended jobs list renders for one
+preference (its open recommendations and the applications made on them)
+as plain dicts, so a warm page costs a single cache read.
+
+Each feed is stored together with the version stamp it was built at. Any
+change to the preference, its skills/positions, its recommendations, their
+applications or a recommended job stamps a new version, and a feed whose
+stamp differs from the current one is rebuilt on the next read.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db.models import F
+
+from common.utils.versions import get_version
+from employer.models import JobRequisition
+from recommendedByAI.models import AppliedJobHistory, RecommendedJobs
+
+FEED_KEY = 'recommendedByAI:feed:v2:{}'
+FEED_VERSION_KEY = 'recommendedByAI:feed_version:{}'
+FEED_TIMEOUT = 60 * 60 * 24
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def defer_feed_bumps():
+    """Gather the feed invalidations made inside the block into one cache write.
+
+    Bulk operations that fire a signal per row (e.g. deleting many
+    RecommendedJobs) would otherwise write a version per row.
+    """
+    if getattr(_deferred, 'preference_ids', None) is not None:
+        yield
+        return
+    _deferred.preference_ids = set()
+    try:
+        yield
+    finally:
+        preference_ids, _deferred.preference_ids = _deferred.preference_ids, None
+        if preference_ids:
+            bump_feed_versions(preference_ids)
+
+
+def bump_feed_versions(preference_ids):
+    """Invalidate the cached feeds of `preference_ids`."""
+    pending = getattr(_deferred, 'preference_ids', None)
+    if pending is not None:
+        pending.update(preference_ids)
+        return
+    # A time-based stamp can be set for many preferences in one call, unlike
+    # an incremented counter, and never repeats an earlier version.
+    version = time.time_ns()
+    cache.set_many({FEED_VERSION_KEY.format(pk): version for pk in set(preference_ids)}, None)
+
+
+def bump_job_feed_versions(job_id):
+    """Invalidate the feeds of every preference `job_id` is recommended to."""
+    bump_feed_versions(
+        RecommendedJobs.objects.filter(job_requisition_id=job_id)
+        .values_list('employee_preferences_id', flat=True)
+    )
+
+
+def build_feed(preference_id):
+    """Load the feed of `preference_id` from the database in three queries."""
+    recommended = list(
+        RecommendedJobs.objects.filter(
+            employee_preferences_id=preference_id, job_requisition__status=True,
+        ).order_by('id').values(
+            'id', 'slug', 'created', 'job_requisition_id',
+            'employee_preferences__category__category',
+            'job_requisition__custom_job_title', 'job_requisition__city', 'job_requisition__state',
+        )
+    )
+    titles = {}
+    for job_id, position in JobRequisition.job_title.through.objects.filter(
+        jobrequisition_id__in=[row['job_requisition_id'] for row in recommended],
+    ).order_by('id').values_list('jobrequisition_id', 'position__position'):
+        titles.setdefault(job_id, []).append(position)
+
+    applications = list(
+        AppliedJobHistory.objects.filter(
+            job__employee_preferences_id=preference_id,
+            user_id=F('job__employee_preferences__user_id'),
+        ).order_by('id').values(
+            'job_id', 'status',
+            'job__employee_preferences__category__category', 'job__employee_preferences__created',
+        )
+    )
+    applied = {row['job_id'] for row in applications if row['status'] == 'applied'}
+
+    return {
+        'recommended_jobs': [
+            {
+                'id': row['id'],
+                'created': row['created'],
+                'slug': row['slug'],
+                'category': row['employee_preferences__category__category'],
+                'job_title': ', '.join(titles.get(row['job_requisition_id'], []))
+                or row['job_requisition__custom_job_title'] or '',
+                'city': row['job_requisition__city'],
+                'state': row['job_requisition__state'],
+                'applied': row['id'] in applied,
+            }
+            for row in recommended
+        ],
+        'applied_jobs': [
+            {
+                'status': row['status'],
+                'category': row['job__employee_preferences__category__category'],
+                'preference_created': row['job__employee_preferences__created'],
+            }
+            for row in applications
+        ],
+    }
+
+
+def get_feeds(preference_ids):
+    """Return the feeds of `preference_ids`, rebuilding only the outdated ones.
+
+    Versions and feeds of all preferences are fetched in one cache read.
+    """
+    keys = {pk: (FEED_VERSION_KEY.format(pk), FEED_KEY.format(pk)) for pk in preference_ids}
+    cached = cache.get_many([key for pair in keys.values() for key in pair])
+
+    feeds = {}
+    rebuilt = {}
+    for pk, (version_key, feed_key) in keys.items():
+        version = cached.get(version_key)
+        if version is None:
+            # Never bumped, or culled: stamp a version now, so a feed stored
+            # without one is not taken for current after a later cull.
+            version = get_version(version_key)
+        entry = cached.get(feed_key)
+        if entry is not None and entry[0] == version:
+            feeds[pk] = entry[1]
+        else:
+            # Stored with the version read above: a bump while building
+            # leaves the entry outdated instead of hiding the change.
+            feeds[pk] = build_feed(pk)
+            rebuilt[feed_key] = (version, feeds[pk])
+    if rebuilt:
+        cache.set_many(rebuilt, FEED_TIMEOUT)
+    return [feeds[pk] for pk in preference_ids]
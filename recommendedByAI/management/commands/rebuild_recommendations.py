@@ -0,0 +1,155 @@
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from employee.models import EmployeePreferences
+from recommendedByAI.matching import JobMatrix, rebuild_recommended_jobs
+
+DEFAULT_CHECKPOINT = os.path.join(tempfile.gettempdir(), 'rebuild_recommendations.json')
+
+# Job matrix of the pool processes, inherited from the parent when forking.
+_matrix = None
+
+
+def _init_process(matrix):
+    global _matrix
+    _matrix = matrix
+    # Ctrl+C is handled by the parent, which lets running shards finish.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _rebuild_shard(preference_ids, k, prune):
+    stored, pruned = rebuild_recommended_jobs(preference_ids, _matrix, k=k, prune=prune)
+    return len(preference_ids), stored, pruned
+
+
+class Command(BaseCommand):
+    help = 'Re-score every employee preference and rewrite its recommended jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (default: number of CPUs).')
+        parser.add_argument('--shard-size', type=int, default=500,
+                            help='Preferences scored and written per shard (default: 500).')
+        parser.add_argument('--top-k', type=int, default=None,
+                            help='Jobs kept per preference (default: RECOMMENDED_JOBS_TOP_K).')
+        parser.add_argument('--prune', action='store_true',
+                            help='Delete recommendations that are no longer ranked and were not applied to.')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT,
+                            help=f'File recording the finished shards (default: {DEFAULT_CHECKPOINT}).')
+        parser.add_argument('--resume', action='store_true',
+                            help='Skip the preferences finished by an interrupted run.')
+
+    def handle(self, *args, **options):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('rebuild_recommendations needs a platform that can fork processes.')
+        self.checkpoint_path = options['checkpoint']
+        self.checkpoint = self.load_checkpoint() if options['resume'] else {'started': timezone.now().isoformat(), 'done': []}
+
+        preference_ids = np.array(
+            EmployeePreferences.objects.order_by('id').values_list('id', flat=True), dtype=np.int64)
+        remaining = preference_ids[~self.finished(preference_ids)]
+        shard_size = max(options['shard_size'], 1)
+        shards = [remaining[i:i + shard_size].tolist() for i in range(0, len(remaining), shard_size)]
+        self.stdout.write(
+            f"{len(preference_ids)} preferences, {len(preference_ids) - len(remaining)} already done, "
+            f"{len(remaining)} in {len(shards)} shards."
+        )
+        if not shards:
+            self.finish()
+            return
+
+        started = time.monotonic()
+        matrix = JobMatrix.build()
+        self.stdout.write(f"Job matrix of {len(matrix)} open jobs built in {time.monotonic() - started:.1f}s.")
+
+        # Forked processes share the matrix copy-on-write; they must not
+        # inherit open database connections, so these are closed first.
+        connections.close_all()
+        pool = ProcessPoolExecutor(
+            max_workers=max(options['processes'], 1),
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_process,
+            initargs=(matrix,),
+        )
+        futures = {pool.submit(_rebuild_shard, shard, options['top_k'], options['prune']): shard
+                   for shard in shards}
+        self.totals = {'preferences': 0, 'stored': 0, 'pruned': 0}
+        self.started = time.monotonic()
+        recorded = set()
+        try:
+            for future in as_completed(futures):
+                self.record(futures[future], future.result(), len(remaining))
+                recorded.add(future)
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted, waiting for the running shards...')
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future, shard in futures.items():
+                if future not in recorded and future.done() and not future.cancelled() and not future.exception():
+                    self.record(shard, future.result(), len(remaining))
+            raise CommandError(f"Stopped; run again with --resume to continue from {self.checkpoint_path}.")
+        pool.shutdown()
+        self.finish()
+
+    def record(self, shard, result, total):
+        preferences, stored, pruned = result
+        self.totals['preferences'] += preferences
+        self.totals['stored'] += stored
+        self.totals['pruned'] += pruned
+        self.checkpoint['done'].append([shard[0], shard[-1]])
+        self.save_checkpoint()
+
+        elapsed = time.monotonic() - self.started
+        rate = self.totals['preferences'] / elapsed if elapsed else 0
+        eta = (total - self.totals['preferences']) / rate if rate else 0
+        self.stdout.write(
+            f"{self.totals['preferences']}/{total} preferences "
+            f"({self.totals['preferences'] * 100 // total}%), {rate:.0f}/s, ETA {eta:.0f}s"
+        )
+
+    def finish(self):
+        totals = getattr(self, 'totals', None)
+        if totals:
+            elapsed = time.monotonic() - self.started
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {totals['preferences']} preferences in {elapsed:.1f}s "
+                f"({totals['preferences'] / elapsed if elapsed else 0:.0f}/s): "
+                f"{totals['stored']} recommendations stored, {totals['pruned']} pruned."
+            ))
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def finished(self, preference_ids):
+        """Mask of `preference_ids` inside the id ranges of finished shards."""
+        done = np.array(self.checkpoint['done'], dtype=np.int64).reshape(-1, 2)
+        done = done[np.argsort(done[:, 0])]
+        positions = np.searchsorted(done[:, 0], preference_ids, side='right') - 1
+        inside = positions >= 0
+        inside[inside] = preference_ids[inside] <= done[positions[inside], 1]
+        return inside
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f"No checkpoint found at {self.checkpoint_path}.")
+        self.stdout.write(f"Resuming the run started at {checkpoint['started']}.")
+        return checkpoint
+
+    def save_checkpoint(self):
+        # Written to a temporary file first so an interruption never leaves
+        # a truncated checkpoint behind.
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(self.checkpoint, f)
+        os.replace(temporary_path, self.checkpoint_path)
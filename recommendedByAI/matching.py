@@ -0,0 +1,514 @@
+"""Vectorised matching of employee preferences against open job requisitions.
+
+The skill and position sets of every open ``JobRequisition`` are packed into
+bit matrices (one row per job, one bit per skill/position id) so a preference
+can be scored against all jobs in a single NumPy pass instead of a
+``job_title__in``/``required_skills__in`` join per request.
+
+The reverse direction (a new or edited job pushed to existing candidates)
+goes through an inverted index from skill/position ids to preference ids,
+so only the candidates sharing a skill or title with the job get scored.
+
+Preferences asking for proximity to home only match jobs within
+RECOMMENDATION_RADIUS_MILES of the candidate's ZIP code; job locations come
+from the bundled ZIP centroid index (`common.utils.geo`).
+"""
+
+import numpy as np
+from django.conf import settings
+
+from common.utils.geo import get_zip_index, haversine_miles, within_radius, zip_to_int
+from common.utils.versions import VersionedValue
+from employee.models import BasicInformation, EmployeePreferences
+from employer.models import JobRequisition
+from recommendedByAI.feed import bump_feed_versions, defer_feed_bumps
+from recommendedByAI.models import RecommendedJobs
+
+# Weights of the individual fit components; they sum up to 1.
+SKILL_WEIGHT = 0.5
+POSITION_WEIGHT = 0.25
+SALARY_WEIGHT = 0.15
+EXPERIENCE_WEIGHT = 0.1
+
+# Multipliers used to compare salaries of different periods on a yearly basis.
+# Commission, bonus, profit sharing and other pay types have no fixed period.
+ANNUAL_SALARY_FACTORS = {
+    'annual': 1,
+    'monthly': 12,
+    'twoWeeks': 26,
+    'weekly': 52,
+    'daily': 260,
+    'hourly': 2080,
+}
+
+BULK_BATCH_SIZE = 1000
+
+JOB_MATRIX_GENERATION_KEY = 'recommendedByAI:job_matrix_generation'
+PREFERENCE_INDEX_GENERATION_KEY = 'recommendedByAI:preference_index_generation'
+
+# popcount of every possible byte, used to count set bits in packed rows
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+
+def annual_salary(amount, salary_type):
+    """Return `amount` expressed per year, or NaN when the period is unknown."""
+    factor = ANNUAL_SALARY_FACTORS.get(salary_type)
+    if amount is None or factor is None:
+        return np.nan
+    return float(amount) * factor
+
+
+def popcount(matrix):
+    """Number of set bits per row of a packed bit matrix."""
+    return _POPCOUNT[matrix].sum(axis=1, dtype=np.int32)
+
+
+def _pairs_array(pairs):
+    return np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+
+
+def _members(sorted_ids, ids):
+    """Positions of `ids` in `sorted_ids` and a mask of the ids found there."""
+    positions = np.searchsorted(sorted_ids, ids)
+    found = positions < len(sorted_ids)
+    found[found] = sorted_ids[positions[found]] == ids[found]
+    return positions, found
+
+
+class BitSets:
+    """One id set per row, packed as a bit matrix over a sorted id vocabulary."""
+
+    def __init__(self, row_ids, pairs):
+        """`row_ids` is the sorted array of row keys, `pairs` (row key, id) links."""
+        pairs = _pairs_array(pairs)
+        # Links of rows that are not part of the snapshot are dropped.
+        rows, found = _members(row_ids, pairs[:, 0])
+        rows, ids = rows[found], pairs[found, 1]
+
+        self.vocabulary = np.unique(ids)
+        self.bits = np.zeros((len(row_ids), (len(self.vocabulary) + 7) // 8), dtype=np.uint8)
+        if len(ids):
+            columns = np.searchsorted(self.vocabulary, ids)
+            masks = np.left_shift(1, 7 - (columns & 7)).astype(np.uint8)
+            np.bitwise_or.at(self.bits, (rows, columns >> 3), masks)
+        self.counts = popcount(self.bits)
+
+    def intersections(self, ids):
+        """Size of the set of `ids` and its intersection with every row."""
+        ids = np.unique(np.asarray(list(ids), dtype=np.int64))
+        columns, found = _members(self.vocabulary, ids)
+        columns = columns[found]
+        if not len(columns):
+            return len(ids), np.zeros(len(self.bits), dtype=np.int32)
+
+        # Only the few bytes touched by the query matter for the intersection.
+        query_bytes, inverse = np.unique(columns >> 3, return_inverse=True)
+        query = np.zeros(len(query_bytes), dtype=np.uint8)
+        np.bitwise_or.at(query, inverse, np.left_shift(1, 7 - (columns & 7)).astype(np.uint8))
+        return len(ids), popcount(self.bits[:, query_bytes] & query)
+
+
+def combine_scores(skill_overlap, skill_union, title_match, same_category,
+                   max_salary, min_salary, years_of_experience, min_experience):
+    """Weighted fit of job/candidate pairs; all arguments broadcast element-wise.
+
+    Pairs that share neither a skill nor a job title score 0.
+    """
+    skill_overlap, skill_union = np.broadcast_arrays(skill_overlap, skill_union)
+    jaccard = np.divide(skill_overlap, skill_union, out=np.zeros(skill_overlap.shape),
+                        where=skill_union > 0)
+    position_fit = np.where(title_match, 1.0, np.where(same_category, 0.5, 0.0))
+
+    # Unknown pay periods get a neutral salary fit.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        salary_fit = np.clip(np.divide(max_salary, min_salary), 0.0, 1.0)
+    salary_fit = np.where(np.isnan(salary_fit), 0.5, salary_fit)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        experience_fit = np.clip(np.divide(years_of_experience, min_experience), 0.0, 1.0)
+    experience_fit = np.where(np.asarray(min_experience) > 0, experience_fit, 1.0)
+
+    scores = (
+        SKILL_WEIGHT * jaccard
+        + POSITION_WEIGHT * position_fit
+        + SALARY_WEIGHT * salary_fit
+        + EXPERIENCE_WEIGHT * experience_fit
+    )
+    return np.where((skill_overlap > 0) | title_match, scores, 0.0)
+
+
+class JobMatrix:
+    """Compact, read-only snapshot of the open job requisitions."""
+
+    def __init__(self, job_ids, industry_ids, max_salary, min_experience, skills, positions,
+                 latitudes=None, longitudes=None):
+        self.job_ids = job_ids
+        self.industry_ids = industry_ids
+        self.max_salary = max_salary
+        self.min_experience = min_experience
+        self.skills = skills
+        self.positions = positions
+        if latitudes is None:
+            latitudes = longitudes = np.full(len(job_ids), np.nan)
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @classmethod
+    def build(cls, queryset=None):
+        """Load the matrix with three queries: jobs, job skills and job titles."""
+        if queryset is None:
+            queryset = JobRequisition.objects.filter(status=True)
+
+        rows = list(
+            queryset.order_by('id').values_list(
+                'id', 'industry_id', 'max_salary_amount', 'salary_type', 'min_experience', 'zip_code',
+            )
+        )
+        job_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        industry_ids = np.array([row[1] for row in rows], dtype=np.int64)
+        max_salary = np.array([annual_salary(row[2], row[3]) for row in rows], dtype=np.float64)
+        min_experience = np.array([row[4] for row in rows], dtype=np.float64)
+        latitudes, longitudes = get_zip_index().locate([zip_to_int(row[5]) for row in rows])
+
+        job_filter = {'jobrequisition_id__in': queryset.values('id')}
+        skills = BitSets(job_ids, JobRequisition.required_skills.through.objects.filter(
+            **job_filter).values_list('jobrequisition_id', 'skill_id'))
+        positions = BitSets(job_ids, JobRequisition.job_title.through.objects.filter(
+            **job_filter).values_list('jobrequisition_id', 'position_id'))
+
+        return cls(job_ids, industry_ids, max_salary, min_experience, skills, positions,
+                   latitudes, longitudes)
+
+    def score(self, skill_ids, position_ids, category_id=None, min_salary=np.nan,
+              years_of_experience=0, home=None):
+        """Score every job for one candidate; non matching jobs score 0.
+
+        A job is a candidate when it shares at least one skill or job title
+        with the preference. The score combines Jaccard skill overlap,
+        position match, salary fit and experience fit. With `home` given as
+        (latitude, longitude, miles) jobs outside that radius score 0.
+        """
+        n_skills, skill_overlap = self.skills.intersections(skill_ids)
+        _, title_overlap = self.positions.intersections(position_ids)
+        scores = combine_scores(
+            skill_overlap, self.skills.counts + n_skills - skill_overlap,
+            title_overlap > 0, self.industry_ids == category_id,
+            self.max_salary, min_salary if min_salary > 0 else np.nan,
+            years_of_experience, self.min_experience,
+        )
+        if home is not None:
+            scores = np.where(within_radius(*home, self.latitudes, self.longitudes), scores, 0.0)
+        return scores
+
+    def top_k(self, scores, k):
+        """Return [(job_id, score), ...] of the `k` best positive scores.
+
+        Equal scores are ranked by job id, so ties at the cut-off always
+        keep the same (oldest) jobs.
+        """
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            # argpartition picks arbitrary members of a tie; keep the first.
+            threshold = np.partition(scores[candidates], -k)[-k]
+            above = candidates[scores[candidates] > threshold]
+            tied = candidates[scores[candidates] == threshold][:k - len(above)]
+            candidates = np.sort(np.concatenate([above, tied]))
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(self.job_ids[i]), float(scores[i])) for i in ranked]
+
+
+class PreferenceIndex:
+    """Inverted index from skill and position ids to EmployeePreferences ids."""
+
+    def __init__(self, skill_pairs, position_pairs):
+        self.skills = self._invert(skill_pairs)
+        self.positions = self._invert(position_pairs)
+
+    @classmethod
+    def build(cls):
+        """Load the index with two queries over the preference M2M tables."""
+        return cls(
+            EmployeePreferences.skills.through.objects.values_list('skill_id', 'employeepreferences_id'),
+            EmployeePreferences.desired_positions.through.objects.values_list(
+                'position_id', 'employeepreferences_id'),
+        )
+
+    @staticmethod
+    def _invert(pairs):
+        """CSR layout: sorted keys, offsets into the posting array and postings."""
+        pairs = _pairs_array(pairs)
+        pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+        keys, starts = np.unique(pairs[:, 0], return_index=True)
+        offsets = np.append(starts, len(pairs))
+        return keys, offsets, pairs[:, 1]
+
+    @staticmethod
+    def _lookup(inverted, ids):
+        keys, offsets, postings = inverted
+        positions, found = _members(keys, np.asarray(list(ids), dtype=np.int64))
+        positions = positions[found]
+        if not len(positions):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([postings[offsets[i]:offsets[i + 1]] for i in positions])
+
+    def candidates(self, skill_ids, position_ids):
+        """Sorted ids of the preferences sharing a skill or a position."""
+        return np.unique(np.concatenate([
+            self._lookup(self.skills, skill_ids),
+            self._lookup(self.positions, position_ids),
+        ]))
+
+
+# Workers match right after a job or preference changed, so the versions
+# are read on every call instead of every few seconds.
+_job_matrix = VersionedValue(JOB_MATRIX_GENERATION_KEY, lambda version: JobMatrix.build(), check_interval=0)
+_preference_index = VersionedValue(
+    PREFERENCE_INDEX_GENERATION_KEY, lambda version: PreferenceIndex.build(), check_interval=0)
+
+
+def bump_job_matrix_generation():
+    """Invalidate cached job matrices of every process."""
+    _job_matrix.invalidate()
+
+
+def bump_preference_index_generation():
+    """Invalidate cached preference indexes of every process."""
+    _preference_index.invalidate()
+
+
+def get_job_matrix():
+    """Return the process-wide job matrix, rebuilding it when jobs changed."""
+    return _job_matrix.get()
+
+
+def get_preference_index():
+    """Return the process-wide preference index, rebuilding it when preferences changed."""
+    return _preference_index.get()
+
+
+def wants_proximity(location):
+    # Preferences created with the model default store 'HOME_PROXIMITY'.
+    return (location or '').lower() == 'home_proximity'
+
+
+def home_zip_codes(user_ids):
+    """ZIP code of the latest BasicInformation of each of `user_ids`."""
+    return dict(
+        BasicInformation.objects.filter(user_id__in=user_ids).order_by('id').values_list('user_id', 'zip_code')
+    )
+
+
+def home_radius(zip_code):
+    """(latitude, longitude, miles) around `zip_code`, None when it is unknown."""
+    coordinates = get_zip_index().coordinates(zip_code)
+    if coordinates is None:
+        return None
+    return (*coordinates, settings.RECOMMENDATION_RADIUS_MILES)
+
+
+def preference_home(preference):
+    """(latitude, longitude, miles) limiting the jobs of `preference`, or None."""
+    if not wants_proximity(preference.location):
+        return None
+    return home_radius(home_zip_codes([preference.user_id]).get(preference.user_id))
+
+
+def preference_profile(preference):
+    """Arguments of `JobMatrix.score` for an EmployeePreferences instance."""
+    skill_ids = list(preference.skills.values_list('id', flat=True))
+    position_ids = list(preference.desired_positions.values_list('id', flat=True))
+    return {
+        'skill_ids': skill_ids,
+        'position_ids': position_ids,
+        'category_id': preference.category_id,
+        'min_salary': annual_salary(preference.minimum_salary, preference.salary_type),
+        'years_of_experience': preference.years_of_experience or 0,
+        'home': preference_home(preference),
+    }
+
+
+def recommend_jobs(preference, k=None, matrix=None):
+    """Rank open jobs for `preference` and return the top `k` (job_id, score) pairs."""
+    if k is None:
+        k = settings.RECOMMENDED_JOBS_TOP_K
+    if matrix is None:
+        matrix = get_job_matrix()
+    if not len(matrix):
+        return []
+    scores = matrix.score(**preference_profile(preference))
+    return matrix.top_k(scores, k)
+
+
+def match_job_to_candidates(job):
+    """Score `job` against the preferences sharing a skill or title with it.
+
+    Returns [(preference_id, score), ...] of the matching candidates, best
+    first. Only candidates found through the inverted index are loaded.
+    """
+    if not job.status:
+        return []
+    skill_ids = list(job.required_skills.values_list('id', flat=True))
+    position_ids = list(job.job_title.values_list('id', flat=True))
+    candidate_ids = get_preference_index().candidates(skill_ids, position_ids)
+    if not len(candidate_ids):
+        return []
+
+    rows = list(
+        EmployeePreferences.objects.filter(id__in=candidate_ids.tolist()).order_by('id').values_list(
+            'id', 'category_id', 'minimum_salary', 'salary_type', 'years_of_experience',
+            'location', 'user_id',
+        )
+    )
+    preference_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    preference_filter = {'employeepreferences_id__in': preference_ids.tolist()}
+    skills = BitSets(preference_ids, EmployeePreferences.skills.through.objects.filter(
+        **preference_filter).values_list('employeepreferences_id', 'skill_id'))
+    positions = BitSets(preference_ids, EmployeePreferences.desired_positions.through.objects.filter(
+        **preference_filter).values_list('employeepreferences_id', 'position_id'))
+
+    n_skills, skill_overlap = skills.intersections(skill_ids)
+    _, title_overlap = positions.intersections(position_ids)
+    min_salary = np.array([annual_salary(row[2], row[3]) for row in rows], dtype=np.float64)
+    min_salary[min_salary <= 0] = np.nan
+    scores = combine_scores(
+        skill_overlap, skills.counts + n_skills - skill_overlap,
+        title_overlap > 0, np.array([row[1] for row in rows]) == job.industry_id,
+        annual_salary(job.max_salary_amount, job.salary_type), min_salary,
+        np.array([row[4] or 0 for row in rows], dtype=np.float64), job.min_experience,
+    )
+
+    proximity = np.array([wants_proximity(row[5]) for row in rows])
+    if proximity.any():
+        homes = home_zip_codes([row[6] for row, near in zip(rows, proximity) if near])
+        index = get_zip_index()
+        home_latitudes, home_longitudes = index.locate([zip_to_int(homes.get(row[6])) for row in rows])
+        job_latitudes, job_longitudes = index.locate([zip_to_int(job.zip_code)])
+        distances = haversine_miles(job_latitudes[0], job_longitudes[0], home_latitudes, home_longitudes)
+        # Candidates without a known home ZIP code are not limited; a job of
+        # unknown location is out of reach of everyone else asking for proximity.
+        too_far = proximity & ~np.isnan(home_latitudes) & ~(distances <= settings.RECOMMENDATION_RADIUS_MILES)
+        scores = np.where(too_far, 0.0, scores)
+    ranked = np.argsort(-scores, kind='stable')
+    return [(int(preference_ids[i]), float(scores[i])) for i in ranked if scores[i] > 0]
+
+
+def save_recommended_jobs(pairs, usernames):
+    """Insert RecommendedJobs for (preference_id, job_id) pairs in one batched upsert.
+
+    Pairs that are already stored are skipped by the database through the
+    unique (employee_preferences, job_requisition) constraint, and slugs are
+    derived from the pair, so re-running costs no per-row queries.
+    """
+    recommended = [
+        RecommendedJobs(
+            employee_preferences_id=preference_id,
+            job_requisition_id=job_id,
+            slug=RecommendedJobs.build_slug(usernames[preference_id], preference_id, job_id),
+        )
+        for preference_id, job_id in pairs
+    ]
+    if not recommended:
+        return []
+    created = RecommendedJobs.objects.bulk_create(
+        recommended, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+    # bulk_create sends no post_save, so the cached feeds are invalidated here.
+    bump_feed_versions(preference_id for preference_id, _ in pairs)
+    return created
+
+
+def generate_recommended_jobs(preference, k=None):
+    """Store the top `k` jobs of `preference` as RecommendedJobs."""
+    ranked = recommend_jobs(preference, k)
+    return save_recommended_jobs(
+        [(preference.id, job_id) for job_id, _ in ranked],
+        {preference.id: preference.user.username},
+    )
+
+
+def push_job_to_candidates(job):
+    """Store `job` as a RecommendedJobs row of every matching candidate.
+
+    Stored recommendations of the job that no longer match after an edit
+    (or once it is closed) are deleted, unless they were applied to.
+    """
+    matches = match_job_to_candidates(job)
+    preference_ids = [preference_id for preference_id, _ in matches]
+    with defer_feed_bumps():
+        RecommendedJobs.objects.filter(job_requisition=job, appliedjobhistory__isnull=True).exclude(
+            employee_preferences_id__in=preference_ids).delete()
+        if not matches:
+            return []
+        usernames = dict(
+            EmployeePreferences.objects.filter(id__in=preference_ids).values_list('id', 'user__username')
+        )
+        return save_recommended_jobs([(preference_id, job.id) for preference_id in preference_ids], usernames)
+
+
+def preference_profiles(preference_ids):
+    """`preference_profile` and username of many preferences, in at most four queries."""
+    rows = list(
+        EmployeePreferences.objects.filter(id__in=preference_ids).values_list(
+            'id', 'category_id', 'minimum_salary', 'salary_type', 'years_of_experience',
+            'location', 'user_id', 'user__username',
+        )
+    )
+    preference_filter = {'employeepreferences_id__in': [row[0] for row in rows]}
+    skills = {}
+    for preference_id, skill_id in EmployeePreferences.skills.through.objects.filter(
+            **preference_filter).values_list('employeepreferences_id', 'skill_id'):
+        skills.setdefault(preference_id, []).append(skill_id)
+    positions = {}
+    for preference_id, position_id in EmployeePreferences.desired_positions.through.objects.filter(
+            **preference_filter).values_list('employeepreferences_id', 'position_id'):
+        positions.setdefault(preference_id, []).append(position_id)
+    homes = home_zip_codes([row[6] for row in rows if wants_proximity(row[5])])
+
+    profiles = {}
+    usernames = {}
+    for pk, category_id, minimum_salary, salary_type, years, location, user_id, username in rows:
+        profiles[pk] = {
+            'skill_ids': skills.get(pk, []),
+            'position_ids': positions.get(pk, []),
+            'category_id': category_id,
+            'min_salary': annual_salary(minimum_salary, salary_type),
+            'years_of_experience': years or 0,
+            'home': home_radius(homes.get(user_id)) if wants_proximity(location) else None,
+        }
+        usernames[pk] = username
+    return profiles, usernames
+
+
+def rebuild_recommended_jobs(preference_ids, matrix, k=None, prune=False):
+    """Re-score `preference_ids` against `matrix` and store their top `k` jobs.
+
+    With `prune`, stored recommendations that are no longer in the top `k`
+    and were not applied to are deleted. Returns the number of stored and
+    pruned recommendations.
+    """
+    if k is None:
+        k = settings.RECOMMENDED_JOBS_TOP_K
+    profiles, usernames = preference_profiles(preference_ids)
+    pairs = []
+    if len(matrix):
+        for preference_id, profile in profiles.items():
+            ranked = matrix.top_k(matrix.score(**profile), k)
+            pairs.extend((preference_id, job_id) for job_id, _ in ranked)
+
+    stale = []
+    with defer_feed_bumps():
+        if prune:
+            keep = set(pairs)
+            stale = [
+                pk for pk, preference_id, job_id in RecommendedJobs.objects.filter(
+                    employee_preferences_id__in=list(profiles), appliedjobhistory__isnull=True,
+                ).values_list('id', 'employee_preferences_id', 'job_requisition_id')
+                if (preference_id, job_id) not in keep
+            ]
+            if stale:
+                RecommendedJobs.objects.filter(id__in=stale).delete()
+        save_recommended_jobs(pairs, usernames)
+    return len(pairs), len(stale)
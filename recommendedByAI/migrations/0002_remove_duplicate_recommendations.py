@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-17 20:51
+
+from django.db import migrations
+
+
+def remove_duplicate_recommendations(apps, schema_editor):
+    """Keep the oldest RecommendedJobs row of every (preference, job) pair.
+
+    Applications made against a duplicate are moved to the row that is kept.
+    """
+    RecommendedJobs = apps.get_model('recommendedByAI', 'RecommendedJobs')
+    AppliedJobHistory = apps.get_model('recommendedByAI', 'AppliedJobHistory')
+
+    kept = {}
+    duplicates = {}
+    rows = RecommendedJobs.objects.order_by('id').values_list(
+        'id', 'employee_preferences_id', 'job_requisition_id')
+    for pk, preference_id, job_id in rows.iterator():
+        kept_pk = kept.setdefault((preference_id, job_id), pk)
+        if kept_pk != pk:
+            duplicates[pk] = kept_pk
+
+    for duplicate_pk, kept_pk in duplicates.items():
+        AppliedJobHistory.objects.filter(job_id=duplicate_pk).update(job_id=kept_pk)
+    RecommendedJobs.objects.filter(id__in=list(duplicates)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendedByAI', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_recommendations, migrations.RunPython.noop),
+    ]
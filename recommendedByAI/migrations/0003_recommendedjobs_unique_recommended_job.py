@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from the clean-up in 0002: PostgreSQL refuses to ALTER a
+    # table with pending deferred FK trigger events in the same transaction.
+
+    dependencies = [
+        ('recommendedByAI', '0002_remove_duplicate_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='recommendedjobs',
+            constraint=models.UniqueConstraint(fields=('employee_preferences', 'job_requisition'), name='unique_recommended_job'),
+        ),
+    ]
@@ -1,31 +1,52 @@
 from django.db import models
+from django.utils.text import slugify
 from common.utils.chooseConstant import STATUS_CHOICES
-from common.utils.text import unique_slug
+from common.models import SlugModel
 from employee.models import EmployeePreferences
 from employer.models import JobRequisition
 from jobDoggApp import settings
 
 #RecommendedJobs employee
-class RecommendedJobs(models.Model):
+class RecommendedJobs(SlugModel):
     employee_preferences = models.ForeignKey(EmployeePreferences, on_delete=models.CASCADE)
     job_requisition = models.ForeignKey(JobRequisition, on_delete=models.CASCADE)
     slug = models.SlugField(unique=True)
     created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['employee_preferences', 'job_requisition'],
+                name='unique_recommended_job',
+            ),
+        ]
     
     @property
     def user(self):
         return self.employee_preferences.user
 
-    def save(self, *args, **kwargs):
+    @staticmethod
+    def build_slug(username, employee_preferences_id, job_requisition_id):
+        """Slug unique per (preference, job) pair, so it needs no uniqueness query.
+
+        The two trailing ids identify the pair, which the unique constraint
+        allows only once.
+        """
+        prefix = slugify(username)[:25].strip('-')
+        return f"{prefix}-{employee_preferences_id}-{job_requisition_id}"
+
+    def prepare(self):
         if not self.slug:
-            value = f"{self.employee_preferences.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+            self.slug = self.build_slug(
+                self.employee_preferences.user.username,
+                self.employee_preferences_id,
+                self.job_requisition_id,
+            )
 
     def __str__(self):
         return f"{self.employee_preferences.user.username}"
 #AppliedJobHistory
-class AppliedJobHistory(models.Model):
+class AppliedJobHistory(SlugModel):
     
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     job = models.ForeignKey(RecommendedJobs, on_delete=models.CASCADE)
@@ -37,11 +58,8 @@ class AppliedJobHistory(models.Model):
     updated = models.DateTimeField(auto_now=True)
     
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.user.username}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.user.username}"
 
     def __str__(self):
         return f"{self.user.username} - {self.job}"
\ No newline at end of file
@@ -0,0 +1,81 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from employee.models import BasicInformation, EmployeePreferences
+from employer.models import JobRequisition
+from recommendedByAI.feed import bump_feed_versions, bump_job_feed_versions
+from recommendedByAI.matching import (
+    bump_job_matrix_generation,
+    bump_preference_index_generation,
+    wants_proximity,
+)
+from recommendedByAI.models import AppliedJobHistory, RecommendedJobs
+from recommendedByAI.tasks import push_job_recommendations, refresh_recommended_jobs
+
+
+@receiver(post_save, sender=JobRequisition)
+@receiver(post_delete, sender=JobRequisition)
+def invalidate_job_matrix(sender, instance, **kwargs):
+    bump_job_matrix_generation()
+    bump_job_feed_versions(instance.pk)
+
+
+@receiver(m2m_changed, sender=JobRequisition.job_title.through)
+@receiver(m2m_changed, sender=JobRequisition.required_skills.through)
+def job_requisition_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    bump_job_matrix_generation()
+    if not reverse:
+        bump_job_feed_versions(instance.pk)
+        # New titles or skills (set right after the requisition is created)
+        # can match candidates that already exist, removed ones can end a
+        # match; push the job to its candidates again.
+        push_job_recommendations.delay(instance.pk)
+
+
+@receiver(post_save, sender=JobRequisition)
+def push_saved_job(sender, instance, created, **kwargs):
+    # The titles and skills of a new requisition are set after it is saved,
+    # see job_requisition_m2m_changed; edits of its salary, experience,
+    # location or status can change who it matches.
+    if not created:
+        push_job_recommendations.delay(instance.pk)
+
+
+@receiver(post_save, sender=EmployeePreferences)
+@receiver(post_delete, sender=EmployeePreferences)
+def invalidate_preference_index(sender, instance, **kwargs):
+    bump_preference_index_generation()
+    bump_feed_versions([instance.pk])
+
+
+@receiver(m2m_changed, sender=EmployeePreferences.desired_positions.through)
+@receiver(m2m_changed, sender=EmployeePreferences.skills.through)
+def invalidate_preference_index_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_preference_index_generation()
+        bump_feed_versions((pk_set or []) if reverse else [instance.pk])
+
+
+@receiver(post_save, sender=RecommendedJobs)
+@receiver(post_delete, sender=RecommendedJobs)
+def invalidate_feed_on_recommendation_change(sender, instance, **kwargs):
+    bump_feed_versions([instance.employee_preferences_id])
+
+
+@receiver(post_save, sender=AppliedJobHistory)
+@receiver(post_delete, sender=AppliedJobHistory)
+def invalidate_feed_on_application_change(sender, instance, **kwargs):
+    bump_feed_versions(
+        RecommendedJobs.objects.filter(pk=instance.job_id).values_list('employee_preferences_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=BasicInformation)
+def refresh_nearby_recommendations(sender, instance, **kwargs):
+    # Preferences asking for proximity to home are matched against this ZIP code.
+    for preference_id, location in EmployeePreferences.objects.filter(
+            user_id=instance.user_id).values_list('id', 'location'):
+        if wants_proximity(location):
+            refresh_recommended_jobs.delay(preference_id)
@@ -0,0 +1,18 @@
+from common.utils.tasks import task
+from employee.models import EmployeePreferences
+from employer.models import JobRequisition
+from recommendedByAI.matching import generate_recommended_jobs, push_job_to_candidates
+
+
+@task(unique=True)
+def refresh_recommended_jobs(preference_id):
+    preference = EmployeePreferences.objects.select_related('user').filter(pk=preference_id).first()
+    if preference is not None:
+        generate_recommended_jobs(preference)
+
+
+@task(unique=True)
+def push_job_recommendations(job_id):
+    job = JobRequisition.objects.filter(pk=job_id).first()
+    if job is not None:
+        push_job_to_candidates(job)
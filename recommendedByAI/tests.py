@@ -1,3 +1,279 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from employee.models import BasicInformation, Category, EmployeePreferences, Position, Skill
+from employer.models import JobRequisition
+from recommendedByAI.feed import FEED_VERSION_KEY
+from recommendedByAI.matching import (
+    BitSets, JobMatrix, annual_salary, combine_scores, recommend_jobs, save_recommended_jobs,
+)
+from recommendedByAI.models import AppliedJobHistory, RecommendedJobs
+
+User = get_user_model()
+
+
+def make_job(user, industry, titles, skills, **fields):
+    job = JobRequisition.objects.create(**{
+        'user': user, 'industry': industry, 'department': 'Engineering', 'min_experience': 0,
+        'min_degree_requirements': 'bachelor_of_science', 'job_type': 'Permanent', 'salary_type': 'annual',
+        'min_salary_amount': Decimal('10000'), 'max_salary_amount': Decimal('90000'), 'relocatable': 'Yes',
+        'city': 'Austin', 'state': 'TX', 'zip_code': '73301', 'address1': '1 Main St', 'star_rating': 3,
+        'contact_person': 'Jane', 'contact_email': 'jane@example.com',
+        'from_date': datetime.date(2024, 1, 1), 'to_date': datetime.date(2024, 12, 31),
+        'start_time': datetime.time(9), 'end_time': datetime.time(17), 'job_description': 'A job',
+        **fields,
+    })
+    job.job_title.set(titles)
+    job.required_skills.set(skills)
+    return job
+
+
+def make_preference(user, category, positions, skills, **fields):
+    preference = EmployeePreferences.objects.create(**{
+        'user': user, 'category': category, 'minimum_salary': Decimal('60000'), 'salary_type': 'annual',
+        'job_type': 'Permanent', 'location': 'job_opportunity', 'can_relocation': 'Yes',
+        'years_of_experience': 3, **fields,
+    })
+    preference.desired_positions.set(positions)
+    preference.skills.set(skills)
+    return preference
+
+
+class MatchingData(TestCase):
+    """Two categories with a few positions and skills, an employer and a candidate."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tech = Category.objects.create(category='Tech')
+        cls.food = Category.objects.create(category='Food')
+        cls.positions = [
+            Position.objects.create(position=f'Position {i}', category=cls.tech if i < 3 else cls.food,
+                                    skill_test_link='https://example.com/test')
+            for i in range(4)
+        ]
+        cls.skills = [Skill.objects.create(skill=f'Skill {i}') for i in range(6)]
+        cls.employer = User.objects.create_user('employer', 'employer@example.com', user_type='employer')
+        cls.candidate = User.objects.create_user('candidate', 'candidate@example.com', user_type='employee')
+
+
+def reference_score(job, preference):
+    """Fit of one job/preference pair, computed row by row with sets."""
+    job_skills = set(job.required_skills.values_list('id', flat=True))
+    preference_skills = set(preference.skills.values_list('id', flat=True))
+    title_match = bool(set(job.job_title.values_list('id', flat=True))
+                       & set(preference.desired_positions.values_list('id', flat=True)))
+    overlap = len(job_skills & preference_skills)
+    if not overlap and not title_match:
+        return 0.0
+    union = len(job_skills | preference_skills)
+    jaccard = overlap / union if union else 0.0
+    position_fit = 1.0 if title_match else 0.5 if job.industry_id == preference.category_id else 0.0
+    max_salary = annual_salary(job.max_salary_amount, job.salary_type)
+    min_salary = annual_salary(preference.minimum_salary, preference.salary_type)
+    salary_fit = 0.5 if np.isnan(max_salary) or not min_salary > 0 else min(max_salary / min_salary, 1.0)
+    experience_fit = min(preference.years_of_experience / job.min_experience, 1.0) if job.min_experience else 1.0
+    return 0.5 * jaccard + 0.25 * position_fit + 0.15 * salary_fit + 0.1 * experience_fit
+
+
+class BitSetsTests(SimpleTestCase):
+    def test_intersections(self):
+        bit_sets = BitSets(np.array([1, 2, 3]), [(1, 10), (1, 11), (2, 11), (3, 12), (9, 10)])
+        # Links of row 9, which is not part of the snapshot, are dropped.
+        self.assertEqual(bit_sets.counts.tolist(), [2, 1, 1])
+        size, overlap = bit_sets.intersections([10, 11, 99, 11])
+        self.assertEqual(size, 3)
+        self.assertEqual(overlap.tolist(), [2, 1, 0])
+
+    def test_ids_beyond_one_byte(self):
+        pairs = [(1, skill_id) for skill_id in range(20)] + [(2, 19)]
+        _, overlap = BitSets(np.array([1, 2]), pairs).intersections([0, 9, 19])
+        self.assertEqual(overlap.tolist(), [3, 1])
+
+    def test_empty(self):
+        bit_sets = BitSets(np.array([], dtype=np.int64), [])
+        size, overlap = bit_sets.intersections([1, 2])
+        self.assertEqual((size, len(overlap)), (2, 0))
+        size, overlap = BitSets(np.array([1]), [(1, 5)]).intersections([])
+        self.assertEqual((size, overlap.tolist()), (0, [0]))
+
+
+class CombineScoresTests(SimpleTestCase):
+    def score(self, **kwargs):
+        arguments = {
+            'skill_overlap': 0, 'skill_union': 0, 'title_match': False, 'same_category': False,
+            'max_salary': np.nan, 'min_salary': np.nan, 'years_of_experience': 0, 'min_experience': 0,
+        }
+        arguments.update(kwargs)
+        return float(combine_scores(**arguments))
+
+    def test_perfect_fit(self):
+        self.assertAlmostEqual(self.score(
+            skill_overlap=2, skill_union=2, title_match=True, max_salary=90000, min_salary=60000,
+            years_of_experience=5, min_experience=2), 1.0)
+
+    def test_weights(self):
+        # Half the skills, same category, half the salary and experience.
+        self.assertAlmostEqual(self.score(
+            skill_overlap=1, skill_union=2, same_category=True, max_salary=30000, min_salary=60000,
+            years_of_experience=1, min_experience=2), 0.5 * 0.5 + 0.25 * 0.5 + 0.15 * 0.5 + 0.1 * 0.5)
+
+    def test_unknown_salary_is_neutral(self):
+        self.assertAlmostEqual(self.score(title_match=True), 0.25 + 0.15 * 0.5 + 0.1)
+
+    def test_no_shared_skill_or_title_scores_zero(self):
+        self.assertEqual(self.score(skill_union=3, same_category=True, max_salary=1, min_salary=1), 0.0)
+
+
+class JobMatrixTests(MatchingData):
+    def test_ranking_matches_row_by_row_scores(self):
+        p, s = self.positions, self.skills
+        jobs = [
+            make_job(self.employer, self.tech, [p[0]], s[0:3], min_experience=2),
+            make_job(self.employer, self.tech, [p[1]], [s[0]], salary_type='hourly',
+                     max_salary_amount=Decimal('30'), min_experience=5),
+            make_job(self.employer, self.food, [p[3]], s[3:5], max_salary_amount=Decimal('50000')),
+            make_job(self.employer, self.tech, [p[2]], [s[5]]),
+            make_job(self.employer, self.tech, [p[0]], s[0:3], min_experience=2),
+        ]
+        make_job(self.employer, self.tech, [p[0]], s[0:3], status=False)
+        preference = make_preference(self.candidate, self.tech, [p[0]], [s[0], s[1], s[3]])
+
+        expected = sorted(
+            ((job.pk, reference_score(job, preference)) for job in jobs),
+            key=lambda pair: (-pair[1], pair[0]),
+        )
+        expected = [pair for pair in expected if pair[1] > 0]
+        ranked = recommend_jobs(preference, k=10, matrix=JobMatrix.build())
+        self.assertEqual([job_id for job_id, _ in ranked], [job_id for job_id, _ in expected])
+        for (_, score), (_, expected_score) in zip(ranked, expected):
+            self.assertAlmostEqual(score, expected_score)
+
+        # Every job the former title-and-skill join found is still recommended.
+        joined = JobRequisition.objects.filter(
+            job_title__in=preference.desired_positions.all(), required_skills__in=preference.skills.all(),
+            status=True,
+        ).values_list('id', flat=True).distinct()
+        self.assertTrue(set(joined) <= {job_id for job_id, _ in ranked})
+
+    def test_top_k_breaks_ties_by_job_id(self):
+        matrix = JobMatrix.build()
+        matrix.job_ids = np.array([5, 6, 7, 8, 9])
+        scores = np.array([0.5, 0.9, 0.5, 0.0, 0.5])
+        self.assertEqual(matrix.top_k(scores, 2), [(6, 0.9), (5, 0.5)])
+        self.assertEqual(matrix.top_k(scores, 3), [(6, 0.9), (5, 0.5), (7, 0.5)])
+        self.assertEqual(matrix.top_k(scores, 10), [(6, 0.9), (5, 0.5), (7, 0.5), (9, 0.5)])
+
+    def test_empty_matrix_and_preference(self):
+        preference = make_preference(self.candidate, self.tech, [], [])
+        self.assertEqual(len(JobMatrix.build()), 0)
+        self.assertEqual(recommend_jobs(preference, matrix=JobMatrix.build()), [])
+
+        make_job(self.employer, self.tech, [self.positions[0]], self.skills[:2])
+        self.assertEqual(recommend_jobs(preference, matrix=JobMatrix.build()), [])
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True)
+class PushJobTests(MatchingData):
+    def make_candidate(self, username, positions, skills, zip_code=None, **fields):
+        user = User.objects.create_user(username, f'{username}@example.com', user_type='employee')
+        if zip_code:
+            BasicInformation.objects.create(
+                user=user, address='1 Main St', city='Austin', state='TX', zip_code=zip_code,
+                cell_phone='5550100', email=user.email, emergency_contact_number='5550101',
+                emergency_contact_name='Joe',
+            )
+        return make_preference(user, self.tech, positions, skills, **fields)
+
+    @staticmethod
+    def recommended(job):
+        return set(RecommendedJobs.objects.filter(job_requisition=job).values_list('employee_preferences_id', flat=True))
+
+    def test_new_job_is_pushed_to_matching_candidates_only(self):
+        p, s = self.positions, self.skills
+        near = self.make_candidate('near', [p[0]], [s[0]], zip_code='78701', location='home_proximity')
+        far = self.make_candidate('far', [p[0]], [s[0]], zip_code='10001', location='home_proximity')
+        anywhere = self.make_candidate('anywhere', [], [s[1]])
+        unrelated = self.make_candidate('unrelated', [p[2]], [s[5]])
+        version = cache.get(FEED_VERSION_KEY.format(near.pk))
+
+        job = make_job(self.employer, self.tech, [p[0]], [s[0], s[1]], zip_code='73301')
+        self.assertEqual(self.recommended(job), {near.pk, anywhere.pk})
+        self.assertNotEqual(cache.get(FEED_VERSION_KEY.format(near.pk)), version)
+        self.assertNotIn(far.pk, self.recommended(job))
+        self.assertNotIn(unrelated.pk, self.recommended(job))
+
+    def test_edited_job_drops_candidates_it_no_longer_matches(self):
+        p, s = self.positions, self.skills
+        first = self.make_candidate('first', [p[0]], [s[0]])
+        second = self.make_candidate('second', [p[1]], [s[1]])
+        third = self.make_candidate('third', [p[2]], [s[5]])
+        job = make_job(self.employer, self.tech, [p[0], p[1]], [s[0], s[1]])
+        self.assertEqual(self.recommended(job), {first.pk, second.pk})
+
+        # The first candidate applied, so their recommendation is kept.
+        AppliedJobHistory.objects.create(
+            user=first.user, job=RecommendedJobs.objects.get(job_requisition=job, employee_preferences=first))
+        job.job_title.set([p[2]])
+        job.required_skills.set([s[5]])
+        self.assertEqual(self.recommended(job), {first.pk, third.pk})
+
+        job.status = False
+        job.save()
+        self.assertEqual(self.recommended(job), {first.pk})
+
+
+class SaveRecommendedJobsTests(MatchingData):
+    def test_saving_twice_keeps_one_row_per_pair(self):
+        p, s = self.positions, self.skills
+        jobs = [make_job(self.employer, self.tech, [p[0]], [s[0]]) for _ in range(2)]
+        preference = make_preference(self.candidate, self.tech, [], [])
+        pairs = [(preference.pk, job.pk) for job in jobs]
+        usernames = {preference.pk: self.candidate.username}
+
+        save_recommended_jobs(pairs, usernames)
+        save_recommended_jobs(pairs + pairs, usernames)
+        self.assertEqual(
+            sorted(RecommendedJobs.objects.values_list('employee_preferences_id', 'job_requisition_id')),
+            sorted(pairs),
+        )
+
+
+class RemoveDuplicateRecommendationsTests(TransactionTestCase):
+    """The 0002 data migration, run on duplicates stored before the constraint existed."""
+    before = [('recommendedByAI', '0001_initial')]
+    after = [('recommendedByAI', '0003_recommendedjobs_unique_recommended_job')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicates_are_merged_into_the_oldest_row(self):
+        self.migrate(self.before)
+        category = Category.objects.create(category='Tech')
+        employer = User.objects.create_user('employer', 'employer@example.com', user_type='employer')
+        candidate = User.objects.create_user('candidate', 'candidate@example.com', user_type='employee')
+        preference = make_preference(candidate, category, [], [])
+        job, other_job = (make_job(employer, category, [], []) for _ in range(2))
+        oldest, duplicate, other = (
+            RecommendedJobs.objects.create(
+                employee_preferences=preference, job_requisition=recommended_job, slug=f'recommended-{i}')
+            for i, recommended_job in enumerate((job, job, other_job))
+        )
+        application = AppliedJobHistory.objects.create(user=candidate, job=duplicate)
+
+        self.migrate(self.after)
+        self.assertEqual(set(RecommendedJobs.objects.values_list('id', flat=True)), {oldest.pk, other.pk})
+        application.refresh_from_db()
+        self.assertEqual(application.job_id, oldest.pk)
@@ -6,20 +6,30 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, D
 from .models import RecommendedJobs
 from django.views import View
 from .models import RecommendedJobs, AppliedJobHistory
-from common.utils.text import unique_slug
+from employee.models import EmployeePreferences
+from .feed import get_feeds
+from common.utils.pagination import CursorPaginationMixin
 
-class RecommendedJobsListView(LoginRequiredMixin, ListView):
+class RecommendedJobsListView(LoginRequiredMixin, CursorPaginationMixin, ListView):
     model = RecommendedJobs
     template_name = 'AIrecommended/recommended_jobs_list.html'
     context_object_name = 'recommended_jobs'
+    paginate_by = 24
+    
+    def get_queryset(self):
+        # One query for the user's preferences, then their feeds in one cache read
+        preference_ids = list(
+            EmployeePreferences.objects.filter(user=self.request.user).order_by('id').values_list('id', flat=True)
+        )
+        self.feeds = get_feeds(preference_ids)
+        jobs = [job for feed in self.feeds for job in feed['recommended_jobs']]
+        # Newest first across all preferences, as the pagination expects
+        jobs.sort(key=lambda job: (job['created'], job['id']), reverse=True)
+        return jobs
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Fetch AppliedJobHistory entries for the current user
-        applied_jobs = AppliedJobHistory.objects.filter(user=self.request.user)
-        
-        context['applied_jobs'] = applied_jobs
+        context['applied_jobs'] = [job for feed in self.feeds for job in feed['applied_jobs']]
         return context
 
 class RecommendedJobsDetailView(LoginRequiredMixin,DetailView):
@@ -1,10 +1,10 @@
 # subscription/models.py
 from django.db import models
-from common.utils.text import unique_slug
+from common.models import SlugModel
 from jobDoggApp import settings
 
 
-class SubscriptionPlan(models.Model):
+class SubscriptionPlan(SlugModel):
     """
     Represents different subscription plans with their names, prices, and durations.
     """
@@ -15,10 +15,8 @@ class SubscriptionPlan(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = unique_slug(self.name, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return self.name
 
     def __str__(self):
         return self.name
@@ -40,7 +38,7 @@ class Subscription(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.plan.name}"
 
-class PaymentTerm(models.Model):
+class PaymentTerm(SlugModel):
     """
     Represents payment terms for Billing and payment.
     payment term (e.g., "Net 30", "Due on Receipt").
@@ -51,15 +49,13 @@ class PaymentTerm(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = unique_slug(self.name, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return self.name
 
     def __str__(self):
         return self.name
     
-class Billing(models.Model):
+class Billing(SlugModel):
     """
     Represents an invoice issued to a customer.
     Connects to the User model to associate invoices with customers.
@@ -75,15 +71,13 @@ class Billing(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = unique_slug(self.customer, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.customer}"
 
     def __str__(self):
         return f"{self.customer.username} - {self.amount}"
     
-class CustomerBillingInfo(models.Model):
+class CustomerBillingInfo(SlugModel):
     """
     Stores customer's billing information.
     """
@@ -94,10 +88,8 @@ class CustomerBillingInfo(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = unique_slug(self.customer.username, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.customer.username}"
 
     def __str__(self):
         return self.customer.username
@@ -119,7 +111,7 @@ class PaymentStatus(models.Model):
     def __str__(self):
         return self.name
 
-class Payment(models.Model):
+class Payment(SlugModel):
     """
     Represents a payment made by a customer.
     Connects to the Billing model to associate payments with specific invoices.
@@ -135,10 +127,8 @@ class Payment(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = unique_slug(self.invoice.customer, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.invoice.customer}"
 
     def __str__(self):
         return f"{self.invoice.customer.username} - {self.amount}"
@@ -1,12 +1,12 @@
 from django.db import models
 from common.utils.chooseConstant import DATE_ASSIGN, TIME_CARD_STATUS
-from common.utils.text import unique_slug
+from common.models import SlugModel
 from jobDoggApp import settings
 from datetime import datetime
 from django.utils import timezone
 
 
-class TimeAssigned(models.Model):
+class TimeAssigned(SlugModel):
     title = models.CharField(max_length=200, null=True, blank=True)
     start_time = models.TimeField(default=timezone.now)
     end_time = models.TimeField(default=timezone.now)
@@ -20,11 +20,10 @@ class TimeAssigned(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"card-time-{self.start_time}"
-            self.slug = unique_slug(value, type(self))
-        
+    def slug_source(self):
+        return f"card-time-{self.start_time}"
+
+    def prepare(self):
         if self.over_start_time and self.over_end_time:
             start_time = datetime.combine(datetime.today(), self.over_start_time)
             end_time = datetime.combine(datetime.today(), self.over_end_time)
@@ -37,29 +36,24 @@ class TimeAssigned(models.Model):
             total_time = end_datetime - start_datetime
             total_minutes = total_time.total_seconds() // 60  # Convert to minutes
             self.total_hours = total_minutes + self.total_over_time
-        
-        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.title}-start:{self.start_time}-end:{self.end_time}"
   
-class DateAssigned(models.Model):
+class DateAssigned(SlugModel):
     date_assign = models.CharField(choices=DATE_ASSIGN)
     time_assign = models.ForeignKey(TimeAssigned, on_delete=models.CASCADE)
     slug = models.SlugField(unique=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.date_assign}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.date_assign}"
     
     def __str__(self):
         return f"{self.date_assign}-{self.time_assign}"
     
-class TimeCard(models.Model):
+class TimeCard(SlugModel):
     employer=models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     employee = models.CharField(max_length=100, default='Temesgen')
     date_assigned = models.ForeignKey(DateAssigned, on_delete=models.CASCADE)
@@ -74,17 +68,14 @@ class TimeCard(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.employee}-{self.employer}"
-            self.slug = unique_slug(value, type(self))
-        super().save(*args, **kwargs)
+    def slug_source(self):
+        return f"{self.employee}-{self.employer}"
     
     def __str__(self):
         return f"From {self.employer}-to-{self.employee}'s timeCards"
     
     
-class ClockOutClockInManagement(models.Model):
+class ClockOutClockInManagement(SlugModel):
     time_card = models.ForeignKey(TimeCard, on_delete=models.CASCADE)
 
     clock_in = models.BooleanField(default=False)
@@ -117,11 +108,10 @@ class ClockOutClockInManagement(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            value = f"{self.time_card.employee}-{self.time_card.employer}"
-            self.slug = unique_slug(value, type(self))
-        
+    def slug_source(self):
+        return f"{self.time_card.employee}-{self.time_card.employer}"
+
+    def prepare(self):
         if self.clock_in:
             self.clock_in_time = timezone.now()
 
@@ -147,7 +137,5 @@ class ClockOutClockInManagement(models.Model):
         if self.clock_in and self.clock_out and self.break_in and self.break_out:
             self.net_working_hour = (self.clock_out_time - self.clock_in_time) - (self.break_out_time - self.break_in_time)
 
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return f"{self.time_card.employee}-{self.time_card.employer}-clock-out-clock-in-management"
@@ -0,0 +1,3 @@
+def roles(request):
+    """Expose `request.roles` to templates as `user_roles`."""
+    return {'user_roles': getattr(request, 'roles', frozenset())}
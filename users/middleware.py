@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from users.roles import get_roles
+
+
+class RoleMiddleware:
+    """Set `request.roles`, the role names of the user, resolved on first use.
+
+    Must come after `AuthenticationMiddleware`. The roles are kept on
+    `request.user`, so the `user_tags` filters share them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.roles = SimpleLazyObject(lambda: get_roles(request.user))
+        return self.get_response(request)
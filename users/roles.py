@@ -0,0 +1,58 @@
+"""Roles of a user, resolved once per request.
+
+A role is the name of one of the `ROLES` groups a user belongs to.
+`get_roles` reads them in one query, caches them per user in the shared
+cache and keeps them on the user object, so every later check of the same
+request (template filters, views, mixins) is a set lookup.
+
+The cached roles are keyed by a version per user, which `users.signals`
+stamps anew when the user's groups change, like the onboarding snapshot;
+renaming or deleting a group bumps a generation of every user instead.
+"""
+
+from django.core.cache import cache
+
+from common.utils.versions import bump_version, get_version
+
+ROLES = ('admin', 'employee', 'employer')
+ROLES_GENERATION_KEY = 'users:roles_generation'
+ROLES_TIMEOUT = 60 * 60 * 24
+
+
+def _roles_version_key(user_id):
+    return f"users:roles_version:{user_id}"
+
+
+def _roles_key(user_id):
+    version = get_version(_roles_version_key(user_id), ROLES_TIMEOUT)
+    return f"users:roles:{get_version(ROLES_GENERATION_KEY)}:{user_id}:{version}"
+
+
+def get_roles(user):
+    """Frozenset of the role names of `user`; empty for anonymous users."""
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    roles = getattr(user, '_roles', None)
+    if roles is None:
+        key = _roles_key(user.pk)
+        roles = cache.get(key)
+        if roles is None:
+            roles = frozenset(user.groups.filter(name__in=ROLES).values_list('name', flat=True))
+            cache.set(key, roles, ROLES_TIMEOUT)
+        user._roles = roles
+    return roles
+
+
+def has_role(user, role):
+    return role in get_roles(user)
+
+
+def invalidate_roles(*user_ids):
+    """Invalidate the cached roles of `user_ids`, e.g. after changing their groups."""
+    for user_id in user_ids:
+        bump_version(_roles_version_key(user_id), ROLES_TIMEOUT)
+
+
+def bump_roles_generation():
+    """Invalidate the cached roles of every user."""
+    bump_version(ROLES_GENERATION_KEY)
@@ -1,9 +1,10 @@
 from django.contrib.auth.models import Group
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
 from employee.models import Profile
+from users.roles import bump_roles_generation, invalidate_roles
 
 @receiver(post_save, sender=get_user_model())
 def update_user_type(sender, instance, created, **kwargs):
@@ -34,4 +35,27 @@ def update_profile_account_created(sender, instance, created, **kwargs):
     if created:
         profile, _ = Profile.objects.get_or_create(user=instance)
         profile.account_created = True
-        profile.save()
\ No newline at end of file
+        profile.save()
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_user_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.groups.add(...): the roles of this very user object are
+        # memoised too, and may be read again in the same request.
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.__dict__.pop('_roles', None)
+            invalidate_roles(instance.pk)
+    elif action == 'pre_clear':
+        # group.user_set.clear() does not tell which users it removes.
+        instance._cleared_user_ids = list(instance.user_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        invalidate_roles(*instance.__dict__.pop('_cleared_user_ids', ()))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_roles(*pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_all_roles(sender, instance, created=False, **kwargs):
+    if not created:
+        bump_roles_generation()
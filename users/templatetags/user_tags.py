@@ -1,19 +1,23 @@
 from django import template
-from django.contrib.auth.models import Group
+
+from employee.onboarding import profile_generation as get_profile_generation
+from users.roles import has_role
 
 register = template.Library()
 
 @register.filter
 def is_admin(user):
-    employee_group = Group.objects.get(name='admin')
-    return employee_group in user.groups.all()
+    return has_role(user, 'admin')
 
 @register.filter
 def is_employee(user):
-    employee_group = Group.objects.get(name='employee')
-    return employee_group in user.groups.all()
+    return has_role(user, 'employee')
 
 @register.filter
 def is_employer(user):
-    employee_group = Group.objects.get(name='employer')
-    return employee_group in user.groups.all()
\ No newline at end of file
+    return has_role(user, 'employer')
+
+@register.filter
+def profile_generation(user):
+    """Stamp of the user's profile, to key `{% cache %}` fragments by."""
+    return get_profile_generation(user.pk) if user.is_authenticated else None
@@ -1,3 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from users.roles import _roles_key, get_roles
+
+User = get_user_model()
+
+
+class RolesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('candidate', 'candidate@example.com', user_type='employee')
+        cls.employer = Group.objects.create(name='employer')
+
+    def setUp(self):
+        cache.clear()
+
+    def roles(self):
+        return get_roles(User.objects.get(pk=self.user.pk))
+
+    def test_roles_follow_group_changes(self):
+        self.assertEqual(self.roles(), {'employee'})
+        self.user.groups.add(self.employer)
+        self.assertEqual(self.roles(), {'employee', 'employer'})
+        self.employer.user_set.remove(self.user)
+        self.assertEqual(self.roles(), {'employee'})
+        Group.objects.get(name='employee').user_set.clear()
+        self.assertEqual(self.roles(), set())
+
+    def test_roles_read_before_a_change_are_not_served_after_it(self):
+        key = _roles_key(self.user.pk)
+        stale = self.roles()
+        self.user.groups.add(self.employer)
+        # A request that read the groups before the change stores its
+        # roles late, under the version it started with.
+        cache.set(key, stale)
+        self.assertEqual(self.roles(), {'employee', 'employer'})